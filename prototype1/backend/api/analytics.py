@@ -4,11 +4,17 @@ Includes FEX analytics, high school analytics, and role-based data scoping
 """
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 import pandas as pd
 from rbac import Role, Resource, Permission, has_permission
 from datetime import datetime, timedelta
-from config import DATA_WAREHOUSE_CONN_STRING
+from config import GOLD_HISTORY_TABLES
+from db_engines import get_engine
+from response_cache import cached_response
+from gold_aggregates import read_summary
+from gold_lake import query_analytics
+from json_response import frame_json, FRAME_ORIENTS
+from dimension_history import point_in_time_join
 
 analytics_bp = Blueprint('analytics', __name__, url_prefix='/api/analytics')
 
@@ -94,7 +100,7 @@ def build_filter_query(filters, base_query, user_scope):
             params['filter_intake_year'] = filters['intake_year']
         
         if filters.get('semester_id'):
-            where_clauses.append("fg.semester_id = :filter_semester_id")
+            where_clauses.append("fg.semester_key = (SELECT semester_key FROM dim_semester WHERE semester_id = :filter_semester_id)")
             params['filter_semester_id'] = filters['semester_id']
         
         if filters.get('gender'):
@@ -110,8 +116,37 @@ def build_filter_query(filters, base_query, user_scope):
     
     return base_query, params
 
+# Filters agg_exam_outcomes can answer; any other filter needs student-level rows
+SUMMARY_FILTERS = {
+    'faculty_id': "faculty_id = :filter_faculty_id",
+    'program_id': "program_id = :filter_program_id",
+    'course_code': "course_code = :filter_course_code",
+    'semester_id': "semester_key = (SELECT semester_key FROM dim_semester WHERE semester_id = :filter_semester_id)",
+}
+
+def build_summary_filter_query(filters, base_query, user_scope):
+    """Filtered query over the exam outcome summary, or None if the filters need the fact table"""
+    if user_scope['role'] in (Role.STUDENT, Role.HOD):
+        return None
+    ignored = {'drilldown'}
+    if any(value for name, value in (filters or {}).items() if name not in SUMMARY_FILTERS and name not in ignored):
+        return None
+    
+    # Same parameter names as build_filter_query, so both queries share one params dict
+    where_clauses = []
+    if user_scope['role'] == Role.DEAN and user_scope['faculty_id']:
+        where_clauses.append("faculty_id = :faculty_id")
+    for name, clause in SUMMARY_FILTERS.items():
+        if (filters or {}).get(name):
+            where_clauses.append(clause)
+    
+    if where_clauses:
+        base_query += " WHERE " + " AND ".join(where_clauses)
+    return base_query
+
 @analytics_bp.route('/fex', methods=['GET'])
 @jwt_required()
+@cached_response
 def get_fex_analytics():
     """Get FEX analytics with drilldown capabilities"""
     try:
@@ -123,7 +158,13 @@ def get_fex_analytics():
             return jsonify({'error': 'Permission denied'}), 403
         
         filters = request.args.to_dict()
-        engine = create_engine(DATA_WAREHOUSE_CONN_STRING)
+        # orient=columns returns data as {column: [values]} instead of one object per row
+        orient = filters.pop('orient', 'records')
+        if orient not in FRAME_ORIENTS:
+            return jsonify({'error': f"orient must be one of {', '.join(FRAME_ORIENTS)}"}), 400
+        # point_in_time=1 attributes each exam to the student's program/attributes as they were on the exam date
+        point_in_time = filters.pop('point_in_time', '0') == '1'
+        engine = get_engine('warehouse')
         
         # Base query for FEX analytics
         base_query = """
@@ -134,39 +175,71 @@ def get_fex_analytics():
             COUNT(CASE WHEN fg.exam_status = 'Completed' THEN 1 END) as total_completed,
             COUNT(*) as total_exams,
             AVG(CASE WHEN fg.exam_status = 'FEX' THEN fg.grade ELSE NULL END) as avg_fex_score,
-            dc.department,
-            df.faculty_name,
-            dp.program_name,
-            dc.course_code,
-            dc.course_name
+            ANY_VALUE(dc.department) as department,
+            ANY_VALUE(df.faculty_name) as faculty_name,
+            ANY_VALUE(dp.program_name) as program_name,
+            ANY_VALUE(dc.course_code) as course_code,
+            ANY_VALUE(dc.course_name) as course_name
         FROM fact_grade fg
-        JOIN dim_student ds ON fg.student_id = ds.student_id
-        JOIN dim_course dc ON fg.course_code = dc.course_code
+        JOIN dim_student ds ON fg.student_key = ds.student_key
+        JOIN dim_course dc ON fg.course_key = dc.course_key
         LEFT JOIN dim_program dp ON ds.program_id = dp.program_id
         LEFT JOIN dim_department ddept ON dp.department_id = ddept.department_id
         LEFT JOIN dim_faculty df ON ddept.faculty_id = df.faculty_id
         """
+        if point_in_time:
+            base_query = base_query.replace(
+                "JOIN dim_student ds ON fg.student_key = ds.student_key",
+                point_in_time_join('fg', GOLD_HISTORY_TABLES['dim_student'], 'ds'))
         
         query, params = build_filter_query(filters, base_query, user_scope)
         
+        # Pre-aggregated outcomes per course/program/faculty/semester answer the same query
+        summary_query = build_summary_filter_query(filters, """
+        SELECT 
+            CAST(SUM(fex_count) AS SIGNED) as total_fex,
+            CAST(SUM(mex_count) AS SIGNED) as total_mex,
+            CAST(SUM(fcw_count) AS SIGNED) as total_fcw,
+            CAST(SUM(completed_count) AS SIGNED) as total_completed,
+            CAST(SUM(exam_count) AS SIGNED) as total_exams,
+            SUM(fex_grade_sum) / SUM(fex_grade_count) as avg_fex_score,
+            department,
+            faculty_name,
+            program_name,
+            course_code,
+            course_name
+        FROM agg_exam_outcomes
+        """, user_scope)
+        
         # Add grouping based on drilldown level
         drilldown = filters.get('drilldown', 'overall')
         if drilldown == 'faculty':
             query += " GROUP BY df.faculty_id, df.faculty_name"
+            summary_group = " GROUP BY faculty_id, faculty_name"
         elif drilldown == 'department':
             query += " GROUP BY dc.department_id, dc.department"
+            # agg_exam_outcomes has no department_id, so this one stays on the facts
+            summary_query = None
         elif drilldown == 'program':
             query += " GROUP BY dp.program_id, dp.program_name"
+            summary_group = " GROUP BY program_id, program_name"
         elif drilldown == 'course':
             query += " GROUP BY dc.course_code, dc.course_name"
+            summary_group = " GROUP BY course_code, course_name"
         else:
             query += " GROUP BY df.faculty_id, df.faculty_name, dc.department, dp.program_name, dc.course_code, dc.course_name"
-        
-        df = pd.read_sql_query(text(query), engine, params=params)
-        engine.dispose()
-        
+            summary_group = " GROUP BY faculty_id, faculty_name, department, program_name, course_code, course_name"
+        
+        if point_in_time:
+            # agg_exam_outcomes is built from the current dimension rows
+            summary_query = None
+        if summary_query is None:
+            # Drilldowns over the raw facts run on the columnar copy of the warehouse
+            df = query_analytics(engine, query, params)
+        else:
+            df = read_summary(engine, summary_query + summary_group, query, params)
         return jsonify({
-            'data': df.to_dict('records'),
+            'data': frame_json(df, orient),
             'summary': {
                 'total_fex': int(df['total_fex'].sum()) if not df.empty else 0,
                 'total_mex': int(df['total_mex'].sum()) if not df.empty else 0,
@@ -181,6 +254,7 @@ def get_fex_analytics():
 
 @analytics_bp.route('/high-school', methods=['GET'])
 @jwt_required()
+@cached_response
 def get_high_school_analytics():
     """Get high school analytics - enrollment, retention, graduation rates, tuition completion, performance"""
     try:
@@ -191,7 +265,14 @@ def get_high_school_analytics():
             return jsonify({'error': 'Permission denied'}), 403
         
         filters = request.args.to_dict()
-        engine = create_engine(DATA_WAREHOUSE_CONN_STRING)
+        orient = filters.pop('orient', 'records')
+        if orient not in FRAME_ORIENTS:
+            return jsonify({'error': f"orient must be one of {', '.join(FRAME_ORIENTS)}"}), 400
+        # as_of=YYYY-MM-DD reports each student's status and program as they were that day
+        as_of = pd.to_datetime(filters.pop('as_of', None), errors='coerce')
+        if 'as_of' in request.args and pd.isna(as_of):
+            return jsonify({'error': 'as_of must be a date (YYYY-MM-DD)'}), 400
+        engine = get_engine('warehouse')
         
         query = """
         SELECT 
@@ -201,13 +282,13 @@ def get_high_school_analytics():
             COUNT(DISTINCT CASE WHEN ds.status = 'Active' THEN ds.student_id END) as active_students,
             COUNT(DISTINCT CASE WHEN ds.status = 'Graduated' THEN ds.student_id END) as graduated_students,
             COUNT(DISTINCT CASE WHEN ds.status = 'Withdrawn' THEN ds.student_id END) as withdrawn_students,
-            COUNT(DISTINCT fe.student_id) as enrolled_students,
+            COUNT(DISTINCT fe.student_key) as enrolled_students,
             COUNT(DISTINCT dp.program_id) as programs_enrolled,
             -- Performance metrics
             AVG(CASE WHEN fg.exam_status = 'Completed' THEN fg.grade ELSE NULL END) as avg_grade,
             AVG(CASE WHEN fg.exam_status = 'Completed' THEN fg.coursework_score ELSE NULL END) as avg_coursework_score,
             AVG(CASE WHEN fg.exam_status = 'Completed' THEN fg.exam_score ELSE NULL END) as avg_exam_score,
-            STDDEV(CASE WHEN fg.exam_status = 'Completed' THEN fg.grade ELSE NULL END) as grade_stddev,
+            STDDEV_POP(CASE WHEN fg.exam_status = 'Completed' THEN fg.grade ELSE NULL END) as grade_stddev,
             COUNT(CASE WHEN fg.exam_status = 'Completed' AND fg.grade >= 80 THEN 1 END) as grade_a_count,
             COUNT(CASE WHEN fg.exam_status = 'Completed' AND fg.grade >= 75 AND fg.grade < 80 THEN 1 END) as grade_bplus_count,
             COUNT(CASE WHEN fg.exam_status = 'Completed' AND fg.grade < 50 THEN 1 END) as grade_f_count,
@@ -232,20 +313,27 @@ def get_high_school_analytics():
             COUNT(CASE WHEN fg.absence_reason LIKE '%Tuition%' OR fg.absence_reason LIKE '%Financial%' THEN 1 END) as tuition_related_missed_exams,
             COUNT(CASE WHEN fp.status = 'Pending' AND fg.exam_status = 'MEX' THEN 1 END) as missed_exams_with_pending_fees
         FROM dim_student ds
-        LEFT JOIN fact_enrollment fe ON ds.student_id = fe.student_id
-        LEFT JOIN fact_grade fg ON ds.student_id = fg.student_id
-        LEFT JOIN fact_payment fp ON ds.student_id = fp.student_id
-        LEFT JOIN fact_attendance fa ON ds.student_id = fa.student_id
+        LEFT JOIN fact_enrollment fe ON ds.student_key = fe.student_key
+        LEFT JOIN fact_grade fg ON ds.student_key = fg.student_key
+        LEFT JOIN fact_payment fp ON ds.student_key = fp.student_key
+        LEFT JOIN fact_attendance fa ON ds.student_key = fa.student_key
         LEFT JOIN dim_program dp ON ds.program_id = dp.program_id
         """
         
+        if not pd.isna(as_of):
+            query = query.replace("FROM dim_student ds", f"""FROM (
+            SELECT * FROM {GOLD_HISTORY_TABLES['dim_student']}
+            WHERE :as_of_key BETWEEN valid_from_key AND valid_to_key
+        ) ds""")
+        
         query, params = build_filter_query(filters, query, user_scope)
+        if not pd.isna(as_of):
+            params['as_of_key'] = as_of.year * 10000 + as_of.month * 100 + as_of.day
         query += " GROUP BY ds.high_school, ds.high_school_district"
         query += " ORDER BY total_students DESC"
         
-        df = pd.read_sql_query(text(query), engine, params=params)
-        engine.dispose()
-        
+        # Five-way fan-out join: scanned on the columnar copy of the warehouse
+        df = query_analytics(engine, query, params)
         # Calculate rates and relationships
         if not df.empty:
             df['retention_rate'] = (df['active_students'] / df['total_students'] * 100).round(2)
@@ -263,7 +351,7 @@ def get_high_school_analytics():
             )
         
         return jsonify({
-            'data': df.to_dict('records'),
+            'data': frame_json(df, orient),
             'summary': {
                 'total_high_schools': len(df),
                 'total_students': int(df['total_students'].sum()) if not df.empty else 0,
@@ -285,12 +373,13 @@ def get_high_school_analytics():
 
 @analytics_bp.route('/filter-options', methods=['GET'])
 @jwt_required()
+@cached_response
 def get_filter_options():
     """Get available filter options based on user role"""
     try:
         claims = get_jwt()
         user_scope = get_user_scope(claims)
-        engine = create_engine(DATA_WAREHOUSE_CONN_STRING)
+        engine = get_engine('warehouse')
         
         options = {}
         
@@ -346,8 +435,6 @@ def get_filter_options():
         )
         options['intake_years'] = intake_years['year'].tolist()
         
-        engine.dispose()
-        
         return jsonify(options), 200
         
     except Exception as e:
@@ -4,7 +4,7 @@ Handles login, registration, profile management, and Access Number authenticatio
 """
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity, get_jwt
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from sqlalchemy.orm import sessionmaker
 import sys
 from pathlib import Path
@@ -26,13 +26,11 @@ except ImportError:
     Resource = None
     Permission = None
 
-from config import DATA_WAREHOUSE_CONN_STRING
+from config import RBAC_DB_NAME, RBAC_CONN_STRING
+from db_engines import get_engine
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
-# Database connection for RBAC
-RBAC_DB_NAME = "ucu_rbac"
-RBAC_CONN_STRING = DATA_WAREHOUSE_CONN_STRING.replace("UCU_DataWarehouse", RBAC_DB_NAME)
 
 def validate_access_number(access_number: str) -> bool:
     """Validate Access Number format: A##### or B#####"""
@@ -42,10 +40,8 @@ def validate_access_number(access_number: str) -> bool:
 
 def get_db_session():
     """Get database session"""
-    from sqlalchemy import create_engine
     from sqlalchemy.orm import sessionmaker
-    engine = create_engine(RBAC_CONN_STRING)
-    Session = sessionmaker(bind=engine)
+    Session = sessionmaker(bind=get_engine('rbac'))
     return Session()
 
 # Demo users for non-student authentication (replace with database lookup in production)
@@ -76,15 +72,13 @@ def login():
         # Check if it's an Access Number (student login)
         if validate_access_number(identifier):
             # Student login with Access Number - check against student table
-            engine = create_engine(DATA_WAREHOUSE_CONN_STRING)
+            engine = get_engine('warehouse')
             import pandas as pd
             result = pd.read_sql_query(
                 text("SELECT student_id, access_number, reg_no, first_name, last_name FROM dim_student WHERE access_number = :access_number"),
                 engine,
                 params={'access_number': identifier.upper()}
             )
-            engine.dispose()
-            
             if not result.empty:
                 # Password format: {access_number}@ucu
                 expected_password = f"{identifier.upper()}@ucu"
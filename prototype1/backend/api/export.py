@@ -3,7 +3,7 @@ Export API for Excel and PDF generation
 """
 from flask import Blueprint, request, jsonify, send_file
 from flask_jwt_extended import jwt_required, get_jwt
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 import pandas as pd
 import io
 from datetime import datetime
@@ -13,7 +13,7 @@ backend_dir = Path(__file__).parent.parent
 if str(backend_dir) not in sys.path:
     sys.path.insert(0, str(backend_dir))
 
-from config import DATA_WAREHOUSE_CONN_STRING
+from db_engines import get_engine
 from rbac import Role, Resource, Permission, has_permission
 
 def get_user_scope(claims):
@@ -53,7 +53,7 @@ def export_excel():
         filters = request.args.to_dict() if request.method == 'GET' else request.get_json().get('filters', {})
         export_type = request.args.get('type', 'dashboard') if request.method == 'GET' else request.get_json().get('type', 'dashboard')
         
-        engine = create_engine(DATA_WAREHOUSE_CONN_STRING)
+        engine = get_engine('warehouse')
         
         # Build query based on export type
         if export_type == 'dashboard':
@@ -92,9 +92,9 @@ def export_excel():
                 dept_query = """
                 SELECT 
                     dc.department,
-                    COUNT(DISTINCT fe.student_id) as student_count
+                    COUNT(DISTINCT fe.student_key) as student_count
                 FROM fact_enrollment fe
-                JOIN dim_course dc ON fe.course_code = dc.course_code
+                JOIN dim_course dc ON fe.course_key = dc.course_key
                 GROUP BY dc.department
                 ORDER BY student_count DESC
                 """
@@ -114,8 +114,6 @@ def export_excel():
                 grade_df.to_excel(writer, sheet_name='Grade Distribution', index=False)
             
             output.seek(0)
-            engine.dispose()
-            
             return send_file(
                 output,
                 mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
@@ -137,8 +135,8 @@ def export_excel():
                 COUNT(CASE WHEN fg.exam_status = 'Completed' THEN 1 END) as total_completed,
                 COUNT(*) as total_exams
             FROM fact_grade fg
-            JOIN dim_student ds ON fg.student_id = ds.student_id
-            JOIN dim_course dc ON fg.course_code = dc.course_code
+            JOIN dim_student ds ON fg.student_key = ds.student_key
+            JOIN dim_course dc ON fg.course_key = dc.course_key
             LEFT JOIN dim_program dp ON ds.program_id = dp.program_id
             LEFT JOIN dim_department ddept ON dp.department_id = ddept.department_id
             LEFT JOIN dim_faculty df ON ddept.faculty_id = df.faculty_id
@@ -152,8 +150,6 @@ def export_excel():
                 df.to_excel(writer, sheet_name='FEX Analytics', index=False)
             
             output.seek(0)
-            engine.dispose()
-            
             return send_file(
                 output,
                 mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
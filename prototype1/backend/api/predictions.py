@@ -3,7 +3,7 @@ Prediction API with multiple ML models and scenario analysis
 """
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 import pandas as pd
 # Import from parent directory (backend/)
 import sys
@@ -14,7 +14,7 @@ if str(backend_dir) not in sys.path:
 
 from rbac import Role, Resource, Permission, has_permission
 from ml_models import MultiModelPredictor
-from config import DATA_WAREHOUSE_CONN_STRING
+from db_engines import get_engine
 
 predictions_bp = Blueprint('predictions', __name__, url_prefix='/api/predictions')
 
@@ -73,7 +73,7 @@ def predict_student_performance():
         
         # Resolve student_id if access_number or reg_number provided
         if student_id.startswith('A') or student_id.startswith('B'):
-            engine = create_engine(DATA_WAREHOUSE_CONN_STRING)
+            engine = get_engine('warehouse')
             result = pd.read_sql_query(
                 text("SELECT student_id FROM dim_student WHERE access_number = :access_number"),
                 engine,
@@ -81,8 +81,6 @@ def predict_student_performance():
             )
             if not result.empty:
                 student_id = result['student_id'].iloc[0]
-            engine.dispose()
-        
         prediction = predictor.predict(student_id, model_type)
         
         return jsonify({
@@ -118,13 +116,11 @@ def predict_scenario():
         high_school = scenario.get('high_school')
         
         # Get base student data
-        engine = create_engine(DATA_WAREHOUSE_CONN_STRING)
+        engine = get_engine('warehouse')
         query = text("""
         SELECT * FROM dim_student WHERE student_id = :student_id
         """)
         student_data = pd.read_sql_query(query, engine, params={'student_id': base_student_id})
-        engine.dispose()
-        
         if student_data.empty:
             return jsonify({'error': 'Base student not found'}), 404
         
@@ -168,14 +164,14 @@ def batch_predict():
         filters = data.get('filters', {})
         
         # Apply role-based filtering
-        engine = create_engine(DATA_WAREHOUSE_CONN_STRING)
+        engine = get_engine('warehouse')
         
         if user_scope['role'] == Role.STAFF:
             # Staff can only predict for their classes
             query = text("""
             SELECT DISTINCT fe.student_id 
             FROM fact_enrollment fe
-            JOIN fact_attendance fa ON fe.student_id = fa.student_id
+            JOIN fact_attendance fa ON fe.student_key = fa.student_key
             WHERE fa.staff_id = :staff_id
             """)
             allowed_students = pd.read_sql_query(query, engine, params={'staff_id': user_scope['staff_id']})
@@ -204,8 +200,6 @@ def batch_predict():
             allowed_students = pd.read_sql_query(query, engine, params={'faculty_id': user_scope['faculty_id']})
             student_ids = [s for s in student_ids if s in allowed_students['student_id'].tolist()]
         
-        engine.dispose()
-        
         results = []
         for student_id in student_ids:
             try:
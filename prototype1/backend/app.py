@@ -7,9 +7,14 @@ from flask_cors import CORS
 from flask_jwt_extended import JWTManager, jwt_required
 import pandas as pd
 from datetime import datetime, timedelta
-from sqlalchemy import create_engine, text
-from config import DATA_WAREHOUSE_CONN_STRING, SECRET_KEY, JWT_SECRET_KEY
+from sqlalchemy import text
+from config import SECRET_KEY, JWT_SECRET_KEY
+from db_engines import get_engine, pool_stats
+from dashboard_stats import fetch_dashboard_stats
+from response_cache import cached_response, response_cache
+from json_response import init_response_layer, response_metrics
 from ml_models import MultiModelPredictor
+from gold_aggregates import read_summary
 
 # Import blueprints
 from api.auth import auth_bp
@@ -28,6 +33,7 @@ app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
 app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(days=30)
 
 CORS(app, supports_credentials=True)
+init_response_layer(app)
 jwt = JWTManager(app)
 
 # Register blueprints
@@ -45,67 +51,23 @@ except:
 
 @app.route('/api/dashboard/stats', methods=['GET'])
 @jwt_required()
+@cached_response
 def get_dashboard_stats():
     """Get dashboard statistics"""
     try:
-        engine = create_engine(DATA_WAREHOUSE_CONN_STRING)
-        
-        # Total students
-        total_students = pd.read_sql_query("SELECT COUNT(DISTINCT student_id) as count FROM dim_student", engine)['count'][0] or 0
-        
-        # Total courses
-        total_courses = pd.read_sql_query("SELECT COUNT(*) as count FROM dim_course", engine)['count'][0] or 0
-        
-        # Total enrollments
-        total_enrollments = pd.read_sql_query("SELECT COUNT(*) as count FROM fact_enrollment", engine)['count'][0] or 0
-        
-        # Average grade (only completed exams)
-        avg_grade_result = pd.read_sql_query(
-            "SELECT AVG(grade) as avg FROM fact_grade WHERE exam_status = 'Completed'", engine
-        )
-        avg_grade = avg_grade_result['avg'][0] if not avg_grade_result.empty and avg_grade_result['avg'][0] is not None else 0
-        
-        # MEX/FEX statistics
-        mex_count_result = pd.read_sql_query(
-            "SELECT COUNT(*) as count FROM fact_grade WHERE exam_status = 'MEX'", engine
-        )
-        mex_count = mex_count_result['count'][0] if not mex_count_result.empty else 0
-        
-        fex_count_result = pd.read_sql_query(
-            "SELECT COUNT(*) as count FROM fact_grade WHERE exam_status = 'FEX'", engine
-        )
-        fex_count = fex_count_result['count'][0] if not fex_count_result.empty else 0
-        
-        # Tuition-related missed exams
-        tuition_mex_result = pd.read_sql_query(
-            "SELECT COUNT(*) as count FROM fact_grade WHERE exam_status = 'MEX' AND (absence_reason LIKE '%Tuition%' OR absence_reason LIKE '%Financial%')", engine
-        )
-        tuition_mex_count = tuition_mex_result['count'][0] if not tuition_mex_result.empty else 0
-        
-        # Total payments
-        total_payments_result = pd.read_sql_query(
-            "SELECT SUM(amount) as total FROM fact_payment WHERE status = 'Completed'", engine
-        )
-        total_payments = total_payments_result['total'][0] if not total_payments_result.empty and total_payments_result['total'][0] is not None else 0
-        
-        # Average attendance
-        avg_attendance_result = pd.read_sql_query(
-            "SELECT AVG(total_hours) as avg FROM fact_attendance", engine
-        )
-        avg_attendance = avg_attendance_result['avg'][0] if not avg_attendance_result.empty and avg_attendance_result['avg'][0] is not None else 0
-        
-        engine.dispose()
+        # One concurrent round of single-scan queries (see dashboard_stats.py)
+        stats = fetch_dashboard_stats(get_engine('warehouse'))
         
         return jsonify({
-            'total_students': int(total_students),
-            'total_courses': int(total_courses),
-            'total_enrollments': int(total_enrollments),
-            'avg_grade': round(float(avg_grade), 2),
-            'total_payments': round(float(total_payments), 2),
-            'avg_attendance': round(float(avg_attendance), 2),
-            'missed_exams': int(mex_count),
-            'failed_exams': int(fex_count),
-            'tuition_related_missed': int(tuition_mex_count)
+            'total_students': int(stats['total_students']),
+            'total_courses': int(stats['total_courses']),
+            'total_enrollments': int(stats['total_enrollments']),
+            'avg_grade': round(float(stats['avg_grade']), 2),
+            'total_payments': round(float(stats['total_payments']), 2),
+            'avg_attendance': round(float(stats['avg_attendance']), 2),
+            'missed_exams': int(stats['missed_exams']),
+            'failed_exams': int(stats['failed_exams']),
+            'tuition_related_missed': int(stats['tuition_related_missed'])
         })
     except Exception as e:
         print(f"Error in get_dashboard_stats: {e}")
@@ -113,24 +75,28 @@ def get_dashboard_stats():
 
 @app.route('/api/dashboard/students-by-department', methods=['GET'])
 @jwt_required()
+@cached_response
 def get_students_by_department():
     """Get student count by department"""
     try:
-        engine = create_engine(DATA_WAREHOUSE_CONN_STRING)
+        engine = get_engine('warehouse')
         
+        summary_query = """
+        SELECT department, student_count
+        FROM agg_department_students
+        ORDER BY student_count DESC
+        """
         query = """
         SELECT 
             dc.department,
-            COUNT(DISTINCT fe.student_id) as student_count
+            COUNT(DISTINCT fe.student_key) as student_count
         FROM fact_enrollment fe
-        JOIN dim_course dc ON fe.course_code = dc.course_code
+        JOIN dim_course dc ON fe.course_key = dc.course_key
         GROUP BY dc.department
         ORDER BY student_count DESC
         """
         
-        df = pd.read_sql_query(query, engine)
-        engine.dispose()
-        
+        df = read_summary(engine, summary_query, query)
         return jsonify({
             'departments': df['department'].tolist(),
             'counts': df['student_count'].tolist()
@@ -141,11 +107,21 @@ def get_students_by_department():
 
 @app.route('/api/dashboard/grades-over-time', methods=['GET'])
 @jwt_required()
+@cached_response
 def get_grades_over_time():
     """Get average grades over time"""
     try:
-        engine = create_engine(DATA_WAREHOUSE_CONN_STRING)
+        engine = get_engine('warehouse')
         
+        summary_query = """
+        SELECT 
+            CONCAT(month_name, ' ', CAST(year AS CHAR)) as period,
+            completed_grade_sum / NULLIF(completed_count, 0) as avg_grade,
+            mex_count as missed_exams,
+            fex_count as failed_exams
+        FROM agg_grade_monthly
+        ORDER BY year, month
+        """
         query = """
         SELECT 
             CONCAT(dt.month_name, ' ', CAST(dt.year AS CHAR)) as period,
@@ -158,9 +134,7 @@ def get_grades_over_time():
         ORDER BY dt.year, dt.month
         """
         
-        df = pd.read_sql_query(query, engine)
-        engine.dispose()
-        
+        df = read_summary(engine, summary_query, query)
         return jsonify({
             'periods': df['period'].tolist(),
             'grades': df['avg_grade'].round(2).tolist(),
@@ -173,10 +147,11 @@ def get_grades_over_time():
 
 @app.route('/api/dashboard/payment-status', methods=['GET'])
 @jwt_required()
+@cached_response
 def get_payment_status():
     """Get payment status distribution"""
     try:
-        engine = create_engine(DATA_WAREHOUSE_CONN_STRING)
+        engine = get_engine('warehouse')
         
         query = """
         SELECT 
@@ -187,8 +162,6 @@ def get_payment_status():
         """
         
         df = pd.read_sql_query(query, engine)
-        engine.dispose()
-        
         return jsonify({
             'statuses': df['status'].tolist(),
             'counts': df['count'].tolist()
@@ -199,26 +172,36 @@ def get_payment_status():
 
 @app.route('/api/dashboard/attendance-by-course', methods=['GET'])
 @jwt_required()
+@cached_response
 def get_attendance_by_course():
     """Get attendance statistics by course"""
     try:
-        engine = create_engine(DATA_WAREHOUSE_CONN_STRING)
+        engine = get_engine('warehouse')
         
+        # Per-course sums roll up exactly to the per-course-name averages
+        summary_query = """
+        SELECT 
+            course_name,
+            SUM(total_hours) / SUM(attendance_rows) as avg_hours,
+            SUM(total_days) as total_days
+        FROM agg_course_attendance
+        GROUP BY course_name
+        ORDER BY avg_hours DESC
+        LIMIT 10
+        """
         query = """
         SELECT 
             dc.course_name,
             AVG(fa.total_hours) as avg_hours,
             SUM(fa.days_present) as total_days
         FROM fact_attendance fa
-        JOIN dim_course dc ON fa.course_code = dc.course_code
+        JOIN dim_course dc ON fa.course_key = dc.course_key
         GROUP BY dc.course_name
         ORDER BY avg_hours DESC
         LIMIT 10
         """
         
-        df = pd.read_sql_query(query, engine)
-        engine.dispose()
-        
+        df = read_summary(engine, summary_query, query)
         return jsonify({
             'courses': df['course_name'].tolist(),
             'avg_hours': df['avg_hours'].round(2).tolist(),
@@ -230,17 +213,13 @@ def get_attendance_by_course():
 
 @app.route('/api/dashboard/grade-distribution', methods=['GET'])
 @jwt_required()
+@cached_response
 def get_grade_distribution():
     """Get grade distribution"""
     try:
-        engine = create_engine(DATA_WAREHOUSE_CONN_STRING)
+        engine = get_engine('warehouse')
         
-        query = """
-        SELECT 
-            letter_grade,
-            COUNT(*) as count
-        FROM fact_grade
-        GROUP BY letter_grade
+        grade_order = """
         ORDER BY 
             CASE letter_grade
                 WHEN 'A' THEN 1
@@ -250,10 +229,21 @@ def get_grade_distribution():
                 WHEN 'F' THEN 5
             END
         """
+        summary_query = """
+        SELECT 
+            letter_grade,
+            grade_count as count
+        FROM agg_grade_letter
+        """ + grade_order
+        query = """
+        SELECT 
+            letter_grade,
+            COUNT(*) as count
+        FROM fact_grade
+        GROUP BY letter_grade
+        """ + grade_order
         
-        df = pd.read_sql_query(query, engine)
-        engine.dispose()
-        
+        df = read_summary(engine, summary_query, query)
         return jsonify({
             'grades': df['letter_grade'].tolist(),
             'counts': df['count'].tolist()
@@ -283,10 +273,11 @@ def predict_performance():
 
 @app.route('/api/dashboard/mex-fex-analysis', methods=['GET'])
 @jwt_required()
+@cached_response
 def get_mex_fex_analysis():
     """Get MEX/FEX analysis with reasons"""
     try:
-        engine = create_engine(DATA_WAREHOUSE_CONN_STRING)
+        engine = get_engine('warehouse')
         
         # Overall statistics
         overall_query = """
@@ -326,19 +317,17 @@ def get_mex_fex_analysis():
             COUNT(*) as student_count
         FROM (
             SELECT 
-                fg.student_id,
+                fg.student_key,
                 COUNT(CASE WHEN fg.exam_status = 'MEX' THEN 1 END) as mex_count,
                 AVG(CASE WHEN fg.exam_status = 'Completed' THEN fg.grade ELSE NULL END) as avg_grade
             FROM fact_grade fg
-            GROUP BY fg.student_id
+            GROUP BY fg.student_key
         ) student_stats
         WHERE avg_grade IS NOT NULL
         GROUP BY category
         """
         performance_df = pd.read_sql_query(performance_query, engine)
         
-        engine.dispose()
-        
         return jsonify({
             'overall': {
                 'total_mex': int(overall_df['total_mex'][0]) if not overall_df.empty else 0,
@@ -362,26 +351,34 @@ def get_mex_fex_analysis():
 
 @app.route('/api/dashboard/top-students', methods=['GET'])
 @jwt_required()
+@cached_response
 def get_top_students():
     """Get top performing students"""
     try:
-        engine = create_engine(DATA_WAREHOUSE_CONN_STRING)
+        engine = get_engine('warehouse')
         
+        summary_query = """
+        SELECT 
+            student_id,
+            CONCAT(first_name, ' ', last_name) as student_name,
+            avg_grade
+        FROM agg_student_grades
+        ORDER BY avg_grade DESC
+        LIMIT 10
+        """
         query = """
         SELECT 
             ds.student_id,
             CONCAT(ds.first_name, ' ', ds.last_name) as student_name,
             AVG(fg.grade) as avg_grade
         FROM fact_grade fg
-        JOIN dim_student ds ON fg.student_id = ds.student_id
+        JOIN dim_student ds ON fg.student_key = ds.student_key
         GROUP BY ds.student_id, ds.first_name, ds.last_name
         ORDER BY avg_grade DESC
         LIMIT 10
         """
         
-        df = pd.read_sql_query(query, engine)
-        engine.dispose()
-        
+        df = read_summary(engine, summary_query, query)
         return jsonify({
             'students': df['student_name'].tolist(),
             'grades': df['avg_grade'].round(2).tolist()
@@ -422,7 +419,7 @@ def generate_report():
         print(f"Error generating PDF: {e}")
         print(traceback.format_exc())
         # Fallback: return JSON data
-        engine = create_engine(DATA_WAREHOUSE_CONN_STRING)
+        engine = get_engine('warehouse')
         
         stats_query = """
         SELECT 
@@ -437,9 +434,9 @@ def generate_report():
         dept_query = """
         SELECT 
             dc.department,
-            COUNT(DISTINCT fe.student_id) as student_count
+            COUNT(DISTINCT fe.student_key) as student_count
         FROM fact_enrollment fe
-        JOIN dim_course dc ON fe.course_code = dc.course_code
+        JOIN dim_course dc ON fe.course_key = dc.course_key
         GROUP BY dc.department
         """
         departments = pd.read_sql_query(dept_query, engine).to_dict('records')
@@ -453,8 +450,6 @@ def generate_report():
         """
         grades = pd.read_sql_query(grade_query, engine).to_dict('records')
         
-        engine.dispose()
-        
         return jsonify({
             'stats': stats,
             'departments': departments,
@@ -462,6 +457,24 @@ def generate_report():
             'generated_at': datetime.now().isoformat()
         })
 
+@app.route('/api/system/db-pools', methods=['GET'])
+@jwt_required()
+def get_db_pool_stats():
+    """Connection pool usage and checkout wait times per database"""
+    return jsonify(pool_stats())
+
+@app.route('/api/system/cache', methods=['GET'])
+@jwt_required()
+def get_response_cache_stats():
+    """Response cache hits, misses, evictions and the load version it serves"""
+    return jsonify(response_cache.metrics())
+
+@app.route('/api/system/responses', methods=['GET'])
+@jwt_required()
+def get_response_stats():
+    """Serialization time and payload size before/after compression per endpoint"""
+    return jsonify(response_metrics.report())
+
 if __name__ == '__main__':
     # ML models are already initialized above
     print("Starting Flask server...")
@@ -471,5 +484,6 @@ if __name__ == '__main__':
     print("  - Analytics: /api/analytics/fex, /api/analytics/high-school")
     print("  - Predictions: /api/predictions/predict, /api/predictions/scenario")
     print("  - Dashboard: /api/dashboard/stats")
+    print("  - System: /api/system/db-pools, /api/system/cache, /api/system/responses")
     app.run(debug=True, host='0.0.0.0', port=5000)
 
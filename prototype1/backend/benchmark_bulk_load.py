@@ -0,0 +1,107 @@
+"""
+Benchmark the gold layer bulk load strategies (rows/sec per strategy)
+Loads synthetic fact_grade-shaped rows into a scratch table in the data warehouse
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+from config import DATA_WAREHOUSE_CONN_STRING
+from bulk_loader import BulkLoader, STRATEGIES
+from surrogate_keys import date_key
+
+BENCH_TABLE = 'bench_fact_grade'
+
+
+def make_rows(n_rows, seed=42):
+    """Synthetic rows with the same shape as fact_grade"""
+    rng = np.random.default_rng(seed)
+    statuses = np.array(['Completed', 'MEX', 'FEX', 'FCW'])
+    grades = np.array(['A', 'B+', 'B', 'C+', 'C', 'D', 'F'])
+    # INT YYYYMMDD keys over one academic year, like the warehouse's dim_time keys
+    days = pd.Timestamp('2023-08-01') + pd.to_timedelta(rng.integers(0, 365, n_rows), unit='D')
+    date_keys = date_key(days).astype('int64').to_numpy()
+    return pd.DataFrame({
+        'grade_id': np.arange(1, n_rows + 1),
+        'student_id': [f"STU{i:06d}" for i in rng.integers(1, 50000, n_rows)],
+        'course_code': [f"CSC{i:04d}" for i in rng.integers(1, 500, n_rows)],
+        'date_key': date_keys,
+        'semester_id': rng.integers(1, 5, n_rows),
+        'coursework_score': rng.uniform(0, 40, n_rows).round(2),
+        'exam_score': rng.uniform(0, 60, n_rows).round(2),
+        'total_score': rng.uniform(0, 100, n_rows).round(2),
+        'grade': grades[rng.integers(0, len(grades), n_rows)],
+        'grade_point': rng.uniform(0, 5, n_rows).round(1),
+        'exam_status': statuses[rng.integers(0, len(statuses), n_rows)],
+        'absence_reason': None,
+    })
+
+
+def reset_table(engine):
+    with engine.connect() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+        conn.execute(text(f"""
+            CREATE TABLE {BENCH_TABLE} (
+                grade_id INT PRIMARY KEY,
+                student_id VARCHAR(20),
+                course_code VARCHAR(20),
+                date_key INT,
+                semester_id INT,
+                coursework_score DECIMAL(5,2),
+                exam_score DECIMAL(5,2),
+                total_score DECIMAL(5,2),
+                grade VARCHAR(5),
+                grade_point DECIMAL(3,1),
+                exam_status VARCHAR(20),
+                absence_reason VARCHAR(255),
+                INDEX idx_student (student_id),
+                INDEX idx_course (course_code)
+            )
+        """))
+        conn.commit()
+
+
+def run_benchmark(sizes, strategies):
+    engine = create_engine(DATA_WAREHOUSE_CONN_STRING)
+    loader = BulkLoader(engine)
+    results = []
+    try:
+        for n_rows in sizes:
+            df = make_rows(n_rows)
+            for strategy in strategies:
+                if strategy == 'to_sql' and n_rows > 100000:
+                    # The old path is too slow to be worth timing at this size
+                    continue
+                reset_table(engine)
+                started = time.perf_counter()
+                loader.load(BENCH_TABLE, df, strategy=strategy)
+                elapsed = time.perf_counter() - started
+                # load_data silently falls back to executemany when local_infile is off
+                used = loader.stats[-1]['strategy']
+                results.append({
+                    'rows': n_rows,
+                    'strategy': strategy if used == strategy else f"{strategy}->{used}",
+                    'seconds': round(elapsed, 3),
+                    'rows_per_sec': round(n_rows / elapsed) if elapsed > 0 else None,
+                })
+    finally:
+        with engine.connect() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+            conn.commit()
+        engine.dispose()
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark gold layer bulk load strategies')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000],
+                        help='Row counts to benchmark')
+    parser.add_argument('--strategies', nargs='+', choices=STRATEGIES, default=list(STRATEGIES),
+                        help='Strategies to compare')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("BULK LOAD BENCHMARK")
+    print("=" * 60)
+    print(run_benchmark(args.rows, args.strategies).to_string(index=False))
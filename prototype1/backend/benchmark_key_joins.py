@@ -0,0 +1,116 @@
+"""
+Benchmark star schema joins on natural IDs vs INT surrogate keys
+Runs the main analytics join shapes both ways against the data warehouse
+and reports median query time and index sizes
+"""
+import argparse
+import statistics
+import time
+import pandas as pd
+from sqlalchemy import create_engine, text
+from config import DATA_WAREHOUSE_CONN_STRING, DATA_WAREHOUSE_NAME
+
+# name -> (natural ID join, surrogate key join); both return the same rows
+QUERIES = {
+    'grades by course': (
+        """SELECT dc.course_name, AVG(fg.grade) FROM fact_grade fg
+           JOIN dim_course dc ON fg.course_code = dc.course_code
+           GROUP BY dc.course_name""",
+        """SELECT dc.course_name, AVG(fg.grade) FROM fact_grade fg
+           JOIN dim_course dc ON fg.course_key = dc.course_key
+           GROUP BY dc.course_name""",
+    ),
+    'students by department': (
+        """SELECT dc.department, COUNT(DISTINCT fe.student_id) FROM fact_enrollment fe
+           JOIN dim_course dc ON fe.course_code = dc.course_code
+           GROUP BY dc.department""",
+        """SELECT dc.department, COUNT(DISTINCT fe.student_key) FROM fact_enrollment fe
+           JOIN dim_course dc ON fe.course_key = dc.course_key
+           GROUP BY dc.department""",
+    ),
+    'FEX drilldown': (
+        """SELECT dc.department, dc.course_code, COUNT(*) FROM fact_grade fg
+           JOIN dim_student ds ON fg.student_id = ds.student_id
+           JOIN dim_course dc ON fg.course_code = dc.course_code
+           WHERE fg.exam_status = 'FEX'
+           GROUP BY dc.department, dc.course_code""",
+        """SELECT dc.department, dc.course_code, COUNT(*) FROM fact_grade fg
+           JOIN dim_student ds ON fg.student_key = ds.student_key
+           JOIN dim_course dc ON fg.course_key = dc.course_key
+           WHERE fg.exam_status = 'FEX'
+           GROUP BY dc.department, dc.course_code""",
+    ),
+    'grades over time': (
+        """SELECT dt.year, dt.month, AVG(fg.grade) FROM fact_grade fg
+           JOIN dim_time dt ON CAST(fg.date_key AS CHAR) = CAST(dt.date_key AS CHAR)
+           GROUP BY dt.year, dt.month""",
+        """SELECT dt.year, dt.month, AVG(fg.grade) FROM fact_grade fg
+           JOIN dim_time dt ON fg.date_key = dt.date_key
+           GROUP BY dt.year, dt.month""",
+    ),
+    'student 360': (
+        """SELECT ds.high_school, COUNT(fg.grade_id), SUM(fp.amount) FROM dim_student ds
+           LEFT JOIN fact_grade fg ON ds.student_id = fg.student_id
+           LEFT JOIN fact_payment fp ON ds.student_id = fp.student_id
+           GROUP BY ds.high_school""",
+        """SELECT ds.high_school, COUNT(fg.grade_id), SUM(fp.amount) FROM dim_student ds
+           LEFT JOIN fact_grade fg ON ds.student_key = fg.student_key
+           LEFT JOIN fact_payment fp ON ds.student_key = fp.student_key
+           GROUP BY ds.high_school""",
+    ),
+}
+
+
+def time_query(conn, sql, repeats):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        conn.execute(text(sql)).fetchall()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def index_sizes(conn):
+    return pd.read_sql_query(text("""
+        SELECT TABLE_NAME AS table_name,
+               ROUND(DATA_LENGTH / 1048576, 2) AS data_mb,
+               ROUND(INDEX_LENGTH / 1048576, 2) AS index_mb
+        FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = :db AND (TABLE_NAME LIKE 'fact\\_%' OR TABLE_NAME LIKE 'dim\\_%')
+          AND TABLE_NAME NOT LIKE '%\\_\\_%'
+        ORDER BY TABLE_NAME
+    """), conn, params={'db': DATA_WAREHOUSE_NAME})
+
+
+def run_benchmark(repeats):
+    engine = create_engine(DATA_WAREHOUSE_CONN_STRING)
+    results = []
+    with engine.connect() as conn:
+        for name, (natural_sql, surrogate_sql) in QUERIES.items():
+            # Warm the buffer pool so both variants read from memory
+            conn.execute(text(surrogate_sql)).fetchall()
+            natural = time_query(conn, natural_sql, repeats)
+            surrogate = time_query(conn, surrogate_sql, repeats)
+            results.append({
+                'query': name,
+                'natural_ms': round(natural * 1000, 1),
+                'surrogate_ms': round(surrogate * 1000, 1),
+                'speedup': round(natural / surrogate, 2) if surrogate > 0 else None,
+            })
+        sizes = index_sizes(conn)
+    engine.dispose()
+    return pd.DataFrame(results), sizes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark natural vs surrogate key joins')
+    parser.add_argument('--repeats', type=int, default=5, help='Runs per query (median is reported)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("JOIN BENCHMARK - natural IDs vs INT surrogate keys")
+    print("=" * 60)
+    results, sizes = run_benchmark(args.repeats)
+    print(results.to_string(index=False))
+    print("\nTable and index sizes:")
+    print(sizes.to_string(index=False))
@@ -0,0 +1,101 @@
+"""
+Micro-benchmark the Silver/Gold transform steps (seconds and rows/sec per step)
+Runs each vectorized step on synthetic attendance-shaped data; --legacy also
+times the old row-wise versions for comparison (up to 1M rows)
+"""
+import argparse
+import random
+import time
+import numpy as np
+import pandas as pd
+from id_lookup import IdLookup
+from transform_ops import access_numbers, hours_attended, aggregate_attendance
+
+LEGACY_MAX_ROWS = 1000000
+
+
+def make_attendance(n_rows, seed=42):
+    """Synthetic rows with the same shape as silver attendance"""
+    rng = np.random.default_rng(seed)
+    statuses = np.array(['Present', 'Late', 'Absent', 'present', 'Excused'])
+    return pd.DataFrame({
+        'StudentID': rng.integers(1, 50000, n_rows),
+        'CourseID': rng.integers(1, 500, n_rows),
+        'date_key': rng.integers(20230901, 20230931, n_rows),
+        'Status': statuses[rng.integers(0, len(statuses), n_rows)],
+    })
+
+
+def vectorized_steps(df, lookup):
+    return {
+        'access_number': lambda: access_numbers(len(df)),
+        'student_id (lookup)': lambda: lookup.resolve(df['StudentID'], 'attendance'),
+        'student_id (STU%06d)': lambda: IdLookup('student', fallback_prefix='STU').resolve(df['StudentID'], 'attendance'),
+        'hours_attended': lambda: hours_attended(df['Status']),
+        'days_present': lambda: aggregate_attendance(df, 'Status'),
+    }
+
+
+def legacy_steps(df, lookup):
+    student_map = dict(zip(lookup.keys, lookup.values))
+    return {
+        'access_number': lambda: df['StudentID'].apply(
+            lambda x: f"{random.choice(['A', 'B'])}{random.randint(10000, 99999):05d}"),
+        'student_id (lookup)': lambda: df['StudentID'].map(student_map).fillna(''),
+        'student_id (STU%06d)': lambda: df['StudentID'].apply(lambda x: f"STU{int(x):06d}"),
+        'hours_attended': lambda: df['Status'].apply(
+            lambda x: 2.0 if str(x).upper() == 'PRESENT' else (1.0 if str(x).upper() == 'LATE' else 0.0)),
+        'days_present': lambda: df.groupby(['student_id', 'course_code', 'date_key']).agg({
+            'hours_attended': 'sum',
+            'Status': lambda x: (x == 'Present').sum() if len(x) > 0 and 'Present' in x.values else 0,
+        }),
+    }
+
+
+def time_step(step, repeats):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        step()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run_benchmark(sizes, repeats, legacy):
+    # 49,999 students with RegNos, matching the synthetic StudentID range
+    lookup = IdLookup('student', np.arange(1, 50000), [f"S23B{i:05d}" for i in range(1, 50000)])
+    results = []
+    for n_rows in sizes:
+        df = make_attendance(n_rows)
+        df['student_id'] = lookup.resolve(df['StudentID'], 'attendance')
+        df['course_code'] = 'C' + df['CourseID'].astype(str)
+        df['hours_attended'] = hours_attended(df['Status'])
+        variants = [('vectorized', vectorized_steps(df, lookup))]
+        if legacy and n_rows <= LEGACY_MAX_ROWS:
+            variants.append(('row-wise', legacy_steps(df, lookup)))
+        for variant, steps in variants:
+            for name, step in steps.items():
+                elapsed = time_step(step, repeats)
+                results.append({
+                    'rows': n_rows,
+                    'step': name,
+                    'variant': variant,
+                    'seconds': round(elapsed, 4),
+                    'rows_per_sec': round(n_rows / elapsed) if elapsed > 0 else None,
+                })
+    return pd.DataFrame(results).sort_values(['rows', 'step', 'variant'])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the silver transform steps')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 1000000, 10000000],
+                        help='Row counts to benchmark')
+    parser.add_argument('--repeats', type=int, default=3, help='Runs per step (best is reported)')
+    parser.add_argument('--legacy', action='store_true',
+                        help=f'Also time the old row-wise steps (up to {LEGACY_MAX_ROWS} rows)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("TRANSFORM BENCHMARK")
+    print("=" * 60)
+    print(run_benchmark(args.rows, args.repeats, args.legacy).to_string(index=False))
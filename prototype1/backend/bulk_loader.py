@@ -0,0 +1,211 @@
+"""
+Bulk loader for Gold layer (Data Warehouse) tables
+Pluggable load strategies picked per table: LOAD DATA LOCAL INFILE from a temp CSV,
+large executemany batches, multi-connection parallel inserts, or pandas to_sql
+"""
+import os
+import tempfile
+import time
+import logging
+import numpy as np
+import pandas as pd
+import pymysql
+from concurrent.futures import ThreadPoolExecutor
+from config import (
+    DATA_WAREHOUSE_NAME, get_pymysql_params,
+    BULK_LOAD_STRATEGIES, BULK_LOAD_DEFAULT_STRATEGY, BULK_LOAD_BATCH_ROWS, BULK_LOAD_WORKERS
+)
+
+STRATEGIES = ('load_data', 'executemany', 'parallel', 'to_sql')
+
+
+def _records(df):
+    """DataFrame rows as tuples of plain Python values with NaN/NaT as None"""
+    return list(df.astype(object).where(pd.notna(df), None).itertuples(index=False, name=None))
+
+
+def _csv_column(values):
+    """A column as LOAD DATA reads it: flags as 0/1 and text with backslashes escaped"""
+    if pd.api.types.is_bool_dtype(values):
+        # Nullable 'boolean' keeps <NA>, which to_csv writes as \N
+        return values.astype('Int64')
+    if values.dtype == object or isinstance(values.dtype, (pd.StringDtype, pd.CategoricalDtype)):
+        # Backslash is MySQL's escape character inside LOAD DATA files
+        return values.astype(object).map(
+            lambda v: v.replace('\\', '\\\\') if isinstance(v, str) else (int(v) if isinstance(v, bool) else v)
+        )
+    return values
+
+
+def write_load_data_csv(df, path):
+    """Write df to a headerless CSV in the format BulkLoader._load_data_infile loads it"""
+    csv_df = pd.DataFrame({col: _csv_column(df[col]) for col in df.columns}, index=df.index)
+    csv_df.to_csv(path, index=False, header=False, na_rep='\\N',
+                  date_format='%Y-%m-%d %H:%M:%S', lineterminator='\n')
+
+
+class BulkLoader:
+    """Loads DataFrames into warehouse tables with a configurable strategy per table"""
+    def __init__(self, engine, strategies=None, default_strategy=BULK_LOAD_DEFAULT_STRATEGY,
+                 batch_rows=BULK_LOAD_BATCH_ROWS, workers=BULK_LOAD_WORKERS, logger=None):
+        self.engine = engine
+        self.strategies = dict(BULK_LOAD_STRATEGIES if strategies is None else strategies)
+        self.default_strategy = default_strategy
+        self.batch_rows = batch_rows
+        self.workers = workers
+        self.logger = logger or logging.getLogger(__name__)
+        self.stats = []
+
+    def strategy_for(self, table_name):
+        """Strategy configured for a table, or the default"""
+        return self.strategies.get(table_name, self.default_strategy)
+
+    def load(self, table_name, df, strategy=None, disable_checks=True):
+        """Append all rows of df to table_name; returns the number of rows loaded"""
+        if df.empty:
+            return 0
+        strategy = strategy or self.strategy_for(table_name)
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown bulk load strategy '{strategy}' for {table_name}")
+
+        started = time.perf_counter()
+        if strategy == 'load_data':
+            try:
+                self._load_data_infile(table_name, df, disable_checks)
+            except pymysql.err.MySQLError as e:
+                # Servers without local_infile enabled reject the statement outright
+                self.logger.warning(f"  LOAD DATA LOCAL INFILE failed for {table_name} ({e}); "
+                                    f"falling back to executemany")
+                strategy = 'executemany'
+                self._load_executemany(table_name, df, disable_checks)
+        elif strategy == 'executemany':
+            self._load_executemany(table_name, df, disable_checks)
+        elif strategy == 'parallel':
+            self._load_parallel(table_name, df, disable_checks)
+        else:
+            df.to_sql(table_name, self.engine, if_exists='append', index=False, method='multi', chunksize=50)
+        elapsed = time.perf_counter() - started
+
+        rows_per_sec = len(df) / elapsed if elapsed > 0 else float('inf')
+        self.stats.append({'table': table_name, 'strategy': strategy, 'rows': len(df),
+                           'seconds': elapsed, 'rows_per_sec': rows_per_sec})
+        self.logger.info(f"  Bulk loaded {len(df)} rows into {table_name} via {strategy} "
+                         f"in {elapsed:.2f}s ({rows_per_sec:,.0f} rows/s)")
+        return len(df)
+
+    def merge(self, table_name, df, additive_cols=None):
+        """Upsert rows by the table's primary/unique keys in large batches"""
+        if df.empty:
+            return 0
+        additive_cols = set(additive_cols or [])
+        cols = list(df.columns)
+        updates = ', '.join(
+            f"`{c}` = `{c}` + VALUES(`{c}`)" if c in additive_cols else f"`{c}` = VALUES(`{c}`)"
+            for c in cols
+        )
+        sql = (f"{self._insert_sql(table_name, cols)} ON DUPLICATE KEY UPDATE {updates}")
+        started = time.perf_counter()
+        self._executemany(sql, _records(df), disable_checks=False)
+        elapsed = time.perf_counter() - started
+        self.logger.info(f"  Merged {len(df)} rows into {table_name} in {elapsed:.2f}s")
+        return len(df)
+
+    def delete(self, table_name, column, values):
+        """Delete the rows whose column is in values, one IN list per batch"""
+        return self.delete_keys(table_name, [column], [(v,) for v in values])
+
+    def delete_keys(self, table_name, columns, keys):
+        """Delete the rows whose (columns) tuple is in keys, one IN list per batch"""
+        keys = [tuple(v.item() if isinstance(v, np.generic) else v for v in key) for key in keys]
+        if not keys:
+            return 0
+        started = time.perf_counter()
+        col_list = ', '.join(f"`{c}`" for c in columns)
+        row_placeholder = f"({', '.join(['%s'] * len(columns))})"
+        raw_conn = self.engine.raw_connection()
+        try:
+            cursor = raw_conn.cursor()
+            try:
+                for start in range(0, len(keys), self.batch_rows):
+                    batch = keys[start:start + self.batch_rows]
+                    cursor.execute(f"DELETE FROM {table_name} WHERE ({col_list}) IN "
+                                   f"({', '.join([row_placeholder] * len(batch))})",
+                                   [value for key in batch for value in key])
+                raw_conn.commit()
+            finally:
+                cursor.close()
+        finally:
+            raw_conn.close()
+        self.logger.info(f"  Deleted {len(keys)} keys from {table_name} in {time.perf_counter() - started:.2f}s")
+        return len(keys)
+
+    def _insert_sql(self, table_name, cols):
+        col_list = ', '.join(f"`{c}`" for c in cols)
+        placeholders = ', '.join(['%s'] * len(cols))
+        return f"INSERT INTO {table_name} ({col_list}) VALUES ({placeholders})"
+
+    def _executemany(self, sql, rows, disable_checks):
+        """Run one INSERT over rows in batch_rows batches on a single connection"""
+        # PyMySQL rewrites executemany INSERTs into multi-row VALUES statements
+        raw_conn = self.engine.raw_connection()
+        try:
+            cursor = raw_conn.cursor()
+            if disable_checks:
+                # Facts are pre-filtered against the dimensions, so per-row checks are redundant
+                cursor.execute("SET FOREIGN_KEY_CHECKS=0")
+                cursor.execute("SET UNIQUE_CHECKS=0")
+            try:
+                for start in range(0, len(rows), self.batch_rows):
+                    cursor.executemany(sql, rows[start:start + self.batch_rows])
+                raw_conn.commit()
+            finally:
+                if disable_checks:
+                    cursor.execute("SET UNIQUE_CHECKS=1")
+                    cursor.execute("SET FOREIGN_KEY_CHECKS=1")
+                cursor.close()
+        finally:
+            raw_conn.close()
+
+    def _load_executemany(self, table_name, df, disable_checks):
+        self._executemany(self._insert_sql(table_name, list(df.columns)), _records(df), disable_checks)
+
+    def _load_parallel(self, table_name, df, disable_checks):
+        """Split rows across worker connections that insert concurrently"""
+        sql = self._insert_sql(table_name, list(df.columns))
+        slices = [part for part in np.array_split(df, min(self.workers, len(df))) if not part.empty]
+        with ThreadPoolExecutor(max_workers=len(slices), thread_name_prefix='bulk-load') as pool:
+            for future in [pool.submit(self._executemany, sql, _records(part), disable_checks)
+                           for part in slices]:
+                future.result()
+
+    def _load_data_infile(self, table_name, df, disable_checks):
+        """Dump rows to a temp CSV and stream it with LOAD DATA LOCAL INFILE"""
+        fd, csv_path = tempfile.mkstemp(prefix=f"{table_name}_", suffix='.csv')
+        os.close(fd)
+        try:
+            write_load_data_csv(df, csv_path)
+            col_list = ', '.join(f"`{c}`" for c in df.columns)
+            params = get_pymysql_params(DATA_WAREHOUSE_NAME)
+            params['local_infile'] = True
+            conn = pymysql.connect(**params)
+            try:
+                with conn.cursor() as cursor:
+                    if disable_checks:
+                        cursor.execute("SET FOREIGN_KEY_CHECKS=0")
+                        cursor.execute("SET UNIQUE_CHECKS=0")
+                    cursor.execute(
+                        f"LOAD DATA LOCAL INFILE %s INTO TABLE {table_name} "
+                        f"CHARACTER SET utf8mb4 "
+                        f"FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '\\\\' "
+                        f"LINES TERMINATED BY '\\n' ({col_list})",
+                        (csv_path.replace('\\', '/'),)
+                    )
+                conn.commit()
+            finally:
+                conn.close()
+        finally:
+            os.remove(csv_path)
+
+    def summary(self):
+        """Per-load statistics collected during this run"""
+        return pd.DataFrame(self.stats)
@@ -14,6 +14,7 @@ MYSQL_CHARSET = os.environ.get('MYSQL_CHARSET', 'utf8mb4')
 DB1_NAME = 'UCU_SourceDB1'
 DB2_NAME = 'UCU_SourceDB2'
 DATA_WAREHOUSE_NAME = 'UCU_DataWarehouse'
+RBAC_DB_NAME = 'ucu_rbac'
 
 # SQLAlchemy connection strings (URL encode password)
 from urllib.parse import quote_plus
@@ -29,6 +30,7 @@ def get_sqlalchemy_conn_string(database_name):
 DB1_CONN_STRING = get_sqlalchemy_conn_string(DB1_NAME)
 DB2_CONN_STRING = get_sqlalchemy_conn_string(DB2_NAME)
 DATA_WAREHOUSE_CONN_STRING = get_sqlalchemy_conn_string(DATA_WAREHOUSE_NAME)
+RBAC_CONN_STRING = get_sqlalchemy_conn_string(RBAC_DB_NAME)
 
 # PyMySQL connection parameters (for direct connections)
 def get_pymysql_params(database_name):
@@ -51,12 +53,165 @@ CSV2_PATH = BASE_DIR / "data" / "source_data2.csv"
 BRONZE_PATH = BASE_DIR / "data" / "bronze"
 SILVER_PATH = BASE_DIR / "data" / "silver"
 GOLD_PATH = BASE_DIR / "data" / "gold"
+# Run manifests (checkpoints for --resume)
+ETL_RUNS_PATH = BASE_DIR / "data" / "runs"
+# Fact rows rejected by the dimension semi-join, with their reason codes
+QUARANTINE_PATH = BASE_DIR / "data" / "quarantine"
 
 # Create directories
-for path in [BRONZE_PATH, SILVER_PATH, GOLD_PATH]:
+for path in [BRONZE_PATH, SILVER_PATH, GOLD_PATH, QUARANTINE_PATH]:
     path.mkdir(parents=True, exist_ok=True)
 
+# ETL incremental extraction
+# Source tables extracted incrementally, mapped to their primary key (the high-water
+# mark, or its tie-breaker after a modified timestamp). Tables not listed are
+# small reference tables and are always extracted in full.
+ETL_WATERMARK_TABLE = 'etl_watermark'
+ETL_INCREMENTAL_TABLES = {
+    'enrollments_db1': 'EnrollmentID',
+    'attendance_db1': 'AttendanceID',
+    'grades_db1': 'GradeID',
+    'student_fees_db1': 'PaymentID',
+    'payroll_db2': 'PayrollID',
+}
+# Last-modified column looked for in each incremental table: when present, rows are extracted
+# past the (modified, PK) pair so rows updated in place are picked up too. Tables without it
+# are extracted in full on every run, unless they are declared append-only (comma-separated),
+# in which case only rows past the PK mark are read and in-place updates need --full-reload
+ETL_MODIFIED_COLUMN = os.environ.get('ETL_MODIFIED_COLUMN', 'updated_at')
+ETL_APPEND_ONLY_TABLES = set(filter(None, os.environ.get('ETL_APPEND_ONLY_TABLES', '').split(',')))
+# Incremental tables whose facts aggregate source rows per grain: a changed row re-reads every
+# row of its grain, and the load replaces those grains instead of adding to them
+ETL_GRAIN_COLUMNS = {
+    'attendance_db1': ('StudentID', 'CourseID', 'Date'),
+}
+
+# ETL streaming mode
+# Memory budget (MB) for one in-flight chunk; chunk row counts are derived from it
+ETL_MEMORY_BUDGET_MB = int(os.environ.get('ETL_MEMORY_BUDGET_MB', '256'))
+# Multiplier for transform overhead (extra columns and copies) over raw chunk size
+ETL_CHUNK_MEMORY_FACTOR = 6
+ETL_MIN_CHUNK_ROWS = 1000
+ETL_MAX_CHUNK_ROWS = 500000
+
+# ETL parallel extraction
+ETL_EXTRACT_WORKERS = int(os.environ.get('ETL_EXTRACT_WORKERS', '4'))
+# Maximum concurrent connections/readers per source
+ETL_SOURCE_CONNECTION_LIMITS = {
+    'db1': int(os.environ.get('ETL_DB1_CONNECTIONS', '3')),
+    'db2': int(os.environ.get('ETL_DB2_CONNECTIONS', '2')),
+    'csv': 2,
+}
+
+# Gold layer bulk loading
+# Strategy per table: 'load_data' (LOAD DATA LOCAL INFILE from a temp CSV),
+# 'executemany' (large batched INSERTs), 'parallel' (multi-connection inserts)
+# or 'to_sql' (pandas, small tables). Unlisted tables use the default.
+BULK_LOAD_DEFAULT_STRATEGY = os.environ.get('BULK_LOAD_STRATEGY', 'executemany')
+BULK_LOAD_STRATEGIES = {
+    'fact_attendance': 'load_data',
+    'fact_grade': 'load_data',
+    'fact_enrollment': 'parallel',
+    'fact_payment': 'executemany',
+}
+BULK_LOAD_BATCH_ROWS = int(os.environ.get('BULK_LOAD_BATCH_ROWS', '10000'))
+BULK_LOAD_WORKERS = int(os.environ.get('BULK_LOAD_WORKERS', '4'))
+
+# Blue/green gold layer publishing
+# Each run loads <table>__shadow copies, validates them and swaps them live with a
+# single atomic RENAME TABLE; the replaced generation stays as <table>__previous
+GOLD_SHADOW_SUFFIX = '__shadow'
+GOLD_PREVIOUS_SUFFIX = '__previous'
+# Per-student ML features rebuilt after each load (see feature_store.py), with
+# this many parquet snapshots kept under GOLD_PATH
+GOLD_FEATURE_TABLE = 'feature_student'
+FEATURE_SNAPSHOTS_KEPT = int(os.environ.get('FEATURE_SNAPSHOTS_KEPT', '10'))
+# Dimension -> its Type-2 history table (see dimension_history.py)
+GOLD_HISTORY_TABLES = {'dim_student': 'dim_student_history'}
+# Summary tables rebuilt from the facts after each load (see gold_aggregates.py)
+GOLD_AGGREGATE_TABLES = [
+    'agg_grade_monthly', 'agg_grade_letter', 'agg_course_attendance',
+    'agg_department_students', 'agg_student_grades', 'agg_exam_outcomes',
+]
+# Tables published together, parents before children
+GOLD_TABLES = [
+    'dim_faculty', 'dim_department', 'dim_program',
+    'dim_student', 'dim_course', 'dim_time', 'dim_semester',
+    'fact_enrollment', 'fact_attendance', 'fact_payment', 'fact_grade',
+    *GOLD_AGGREGATE_TABLES,
+    *GOLD_HISTORY_TABLES.values(),
+    GOLD_FEATURE_TABLE,
+    ETL_WATERMARK_TABLE,
+]
+# Parquet copy of the star schema (one directory per published generation) that
+# heavy analytics queries run on with DuckDB; the newest generations are kept for rollback
+GOLD_LAKE_PATH = GOLD_PATH / "star"
+GOLD_LAKE_EXPORT = os.environ.get('GOLD_LAKE_EXPORT', '1') == '1'
+GOLD_LAKE_TABLES = [
+    'dim_faculty', 'dim_department', 'dim_program',
+    'dim_student', 'dim_course', 'dim_time', 'dim_semester',
+    'fact_enrollment', 'fact_attendance', 'fact_payment', 'fact_grade',
+    *GOLD_HISTORY_TABLES.values(),
+]
+GOLD_LAKE_GENERATIONS = int(os.environ.get('GOLD_LAKE_GENERATIONS', '2'))
+GOLD_LAKE_CHUNK_ROWS = int(os.environ.get('GOLD_LAKE_CHUNK_ROWS', '200000'))
+# Tables a generation must not leave empty
+GOLD_REQUIRED_TABLES = ['dim_student', 'dim_course', 'dim_time', 'dim_semester']
+# A generation may not shrink a table below this fraction of its live row count
+GOLD_SWAP_MIN_ROW_RATIO = float(os.environ.get('GOLD_SWAP_MIN_ROW_RATIO', '0.5'))
+
+# Persistent natural ID -> INT surrogate key map (student, course, semester);
+# kept outside the blue/green swap so keys stay stable across runs and rollbacks
+ETL_KEY_MAP_TABLE = 'etl_key_map'
+
+# Deferred index mode: load bare gold tables, then add secondary indexes and
+# FKs in one ALTER TABLE per table after referential integrity is checked
+ETL_DEFER_INDEXES = os.environ.get('ETL_DEFER_INDEXES', '0') == '1'
+# Per-table load timings, kept across runs to compare index modes
+ETL_LOAD_STATS_TABLE = 'etl_load_stats'
+
+# Gold load task DAG: table loads run concurrently once the tables they reference
+# are loaded; each running task holds one warehouse connection
+ETL_LOAD_WORKERS = int(os.environ.get('ETL_LOAD_WORKERS', '3'))
+ETL_TASK_RETRIES = int(os.environ.get('ETL_TASK_RETRIES', '1'))
+ETL_TASK_RETRY_DELAY = float(os.environ.get('ETL_TASK_RETRY_DELAY', '5'))
+
+# Bronze/silver data lake: <layer>/<table>/ingest_date=YYYY-MM-DD/part-*.parquet
+LAKE_COMPRESSION = os.environ.get('LAKE_COMPRESSION', 'zstd')
+LAKE_ROW_GROUP_ROWS = int(os.environ.get('LAKE_ROW_GROUP_ROWS', '131072'))
+# Compaction merges part files smaller than this into files of up to this size
+LAKE_COMPACT_TARGET_MB = int(os.environ.get('LAKE_COMPACT_TARGET_MB', '128'))
+# Partitions older than this many days are deleted (0 keeps everything)
+LAKE_RETENTION_DAYS = {
+    'bronze': int(os.environ.get('BRONZE_RETENTION_DAYS', '30')),
+    'silver': int(os.environ.get('SILVER_RETENTION_DAYS', '90')),
+    'quarantine': int(os.environ.get('QUARANTINE_RETENTION_DAYS', '90')),
+}
+
 # Flask configuration
 SECRET_KEY = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production')
 JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-key-change-in-production')
 
+# API connection pools: one pooled engine per database for the whole process (see db_engines.py)
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '10'))
+DB_POOL_MAX_OVERFLOW = int(os.environ.get('DB_POOL_MAX_OVERFLOW', '20'))
+# Seconds to wait for a free connection before failing the request
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', '30'))
+# Connections older than this many seconds are replaced (below MySQL's wait_timeout)
+DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', '1800'))
+DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', '1') == '1'
+
+# API response cache (see response_cache.py): entries are keyed by endpoint, filters and
+# RBAC scope and dropped when the ETL publishes a new load version
+LOAD_VERSION_FILE = GOLD_PATH / "LOAD_VERSION"
+RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', '1') == '1'
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', '2048'))
+# Shared tier across API processes: '' (none), 'local' (in-process stand-in) or a redis:// URL
+RESPONSE_CACHE_SHARED_URL = os.environ.get('RESPONSE_CACHE_SHARED_URL', '')
+RESPONSE_CACHE_SHARED_TTL = int(os.environ.get('RESPONSE_CACHE_SHARED_TTL', '86400'))
+
+# JSON response compression (see json_response.py): brotli when installed and accepted, else gzip
+RESPONSE_COMPRESSION = os.environ.get('RESPONSE_COMPRESSION', '1') == '1'
+RESPONSE_COMPRESS_MIN_BYTES = int(os.environ.get('RESPONSE_COMPRESS_MIN_BYTES', '1024'))
+RESPONSE_GZIP_LEVEL = int(os.environ.get('RESPONSE_GZIP_LEVEL', '6'))
+RESPONSE_BROTLI_QUALITY = int(os.environ.get('RESPONSE_BROTLI_QUALITY', '5'))
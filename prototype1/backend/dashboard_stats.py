@@ -0,0 +1,51 @@
+"""
+Consolidated queries behind /api/dashboard/stats
+Each fact table is scanned once with conditional aggregation, the per-table
+statements run concurrently on pooled connections, and the single result rows
+are merged as plain values without building DataFrames
+"""
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import text
+
+# One statement per table scan; every statement returns a single row of named counters
+STATS_QUERIES = {
+    # Key/row counts only touch the smallest index of each table
+    'counts': """
+        SELECT (SELECT COUNT(*) FROM dim_student) AS total_students,
+               (SELECT COUNT(*) FROM dim_course) AS total_courses,
+               (SELECT COUNT(*) FROM fact_enrollment) AS total_enrollments
+    """,
+    'grades': """
+        SELECT AVG(CASE WHEN exam_status = 'Completed' THEN grade END) AS avg_grade,
+               COUNT(CASE WHEN exam_status = 'MEX' THEN 1 END) AS missed_exams,
+               COUNT(CASE WHEN exam_status = 'FEX' THEN 1 END) AS failed_exams,
+               COUNT(CASE WHEN exam_status = 'MEX'
+                           AND (absence_reason LIKE '%Tuition%' OR absence_reason LIKE '%Financial%')
+                          THEN 1 END) AS tuition_related_missed
+        FROM fact_grade
+    """,
+    'payments': """
+        SELECT SUM(CASE WHEN status = 'Completed' THEN amount END) AS total_payments
+        FROM fact_payment
+    """,
+    'attendance': """
+        SELECT AVG(total_hours) AS avg_attendance
+        FROM fact_attendance
+    """,
+}
+
+_executor = ThreadPoolExecutor(max_workers=len(STATS_QUERIES), thread_name_prefix='dashboard-stats')
+
+
+def _fetch_row(engine, sql):
+    with engine.connect() as conn:
+        return conn.execute(text(sql)).mappings().one()
+
+
+def fetch_dashboard_stats(engine):
+    """All dashboard counters in one dict, NULL aggregates (empty tables) as 0"""
+    futures = [_executor.submit(_fetch_row, engine, sql) for sql in STATS_QUERIES.values()]
+    stats = {}
+    for future in futures:
+        stats.update({name: value if value is not None else 0 for name, value in future.result().items()})
+    return stats
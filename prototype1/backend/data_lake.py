@@ -0,0 +1,137 @@
+"""
+Partitioned parquet storage for the Bronze and Silver layers
+Files are laid out Hive-style as <layer>/<table>/ingest_date=YYYY-MM-DD/part-*.parquet
+with zstd compression; small files are compacted and old partitions expire
+"""
+import logging
+import shutil
+from datetime import datetime, timedelta
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from config import LAKE_COMPRESSION, LAKE_ROW_GROUP_ROWS, LAKE_COMPACT_TARGET_MB
+
+PARTITION_KEY = 'ingest_date'
+
+
+def _concat_tables(tables):
+    """Concatenate tables, null-filling columns some of them lack"""
+    try:
+        return pa.concat_tables(tables, promote_options='default')
+    except TypeError:
+        # pyarrow < 14 has only the (since deprecated) promote flag
+        return pa.concat_tables(tables, promote=True)
+
+
+class DataLake:
+    """One layer (bronze or silver) of the partitioned data lake"""
+    def __init__(self, root, retention_days=0, logger=None):
+        self.root = root
+        # Partitions older than this many days are deleted; 0 keeps everything
+        self.retention_days = retention_days
+        self.logger = logger or logging.getLogger(__name__)
+
+    def partition_dir(self, table_name, ingest_date):
+        return self.root / table_name / f"{PARTITION_KEY}={ingest_date}"
+
+    def _partitions(self, table_name):
+        """(ingest_date, directory) for every partition of a table, oldest first"""
+        table_dir = self.root / table_name
+        if not table_dir.is_dir():
+            return []
+        return sorted(
+            (path.name.split('=', 1)[1], path) for path in table_dir.iterdir()
+            if path.is_dir() and path.name.startswith(f"{PARTITION_KEY}=")
+        )
+
+    def tables(self):
+        return sorted(path.name for path in self.root.iterdir() if path.is_dir())
+
+    def write(self, table_name, df, run_id, part=0, ingest_date=None):
+        """Write one frame as a new part file in today's partition; returns its path"""
+        ingest_date = ingest_date or datetime.now().strftime('%Y-%m-%d')
+        partition = self.partition_dir(table_name, ingest_date)
+        partition.mkdir(parents=True, exist_ok=True)
+        path = partition / f"part-{run_id}-{part:04d}.parquet"
+        df.to_parquet(path, index=False, compression=LAKE_COMPRESSION, row_group_size=LAKE_ROW_GROUP_ROWS)
+        return path
+
+    def read(self, table_name, since=None, until=None):
+        """Read a table, pruning partitions outside [since, until] (YYYY-MM-DD) by directory name"""
+        files = [
+            path for ingest_date, partition in self._partitions(table_name)
+            if (since is None or ingest_date >= since) and (until is None or ingest_date <= until)
+            for path in sorted(partition.glob('*.parquet'))
+        ]
+        if not files:
+            return pd.DataFrame()
+        return _concat_tables([pq.read_table(path) for path in files]).to_pandas()
+
+    def compact(self, table_name, target_mb=LAKE_COMPACT_TARGET_MB, protected=()):
+        """Merge small part files in each partition into files of up to target_mb; returns files removed"""
+        target_bytes = target_mb * 1024 * 1024
+        # Files a resumable run still points at are left where they are
+        protected = {str(path) for path in protected}
+        removed = 0
+        for ingest_date, partition in self._partitions(table_name):
+            small = [path for path in sorted(partition.glob('part-*.parquet'))
+                     if path.stat().st_size < target_bytes and str(path) not in protected]
+            groups, group, group_bytes = [], [], 0
+            for path in small:
+                if group and group_bytes + path.stat().st_size > target_bytes:
+                    groups.append(group)
+                    group, group_bytes = [], 0
+                group.append(path)
+                group_bytes += path.stat().st_size
+            groups.append(group)
+            for n, group in enumerate(g for g in groups if len(g) > 1):
+                try:
+                    merged = _concat_tables([pq.read_table(path) for path in group])
+                except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                    self.logger.warning(f"  → Skipping compaction of {table_name}/{ingest_date}: {e}")
+                    continue
+                name = f"part-compacted-{datetime.now().strftime('%Y%m%d_%H%M%S')}-{n:04d}.parquet"
+                # Write under a temporary name so readers never see a half-written part
+                tmp_path = partition / f".{name}.tmp"
+                pq.write_table(merged, tmp_path, compression=LAKE_COMPRESSION, row_group_size=LAKE_ROW_GROUP_ROWS)
+                tmp_path.rename(partition / name)
+                for path in group:
+                    path.unlink()
+                removed += len(group) - 1
+                self.logger.info(f"  → Compacted {len(group)} files in {table_name}/{ingest_date} "
+                                 f"({merged.num_rows} rows)")
+        return removed
+
+    def apply_retention(self, today=None, protected=()):
+        """Delete partitions older than the retention window; returns partitions removed"""
+        if not self.retention_days:
+            return 0
+        today = today or datetime.now()
+        cutoff = (today - timedelta(days=self.retention_days)).strftime('%Y-%m-%d')
+        # Partitions holding a file a resumable run still points at are kept
+        protected = {str(path) for path in protected}
+        removed = 0
+        for table_name in self.tables():
+            for ingest_date, partition in self._partitions(table_name):
+                if ingest_date < cutoff:
+                    if any(str(path) in protected for path in partition.glob('*.parquet')):
+                        self.logger.info(f"  → Keeping {table_name}/{ingest_date}: an unfinished run needs it")
+                        continue
+                    shutil.rmtree(partition)
+                    removed += 1
+        # Flat files written before the partitioned layout expire by modification time
+        for path in self.root.glob('*.parquet'):
+            if str(path) in protected:
+                continue
+            if datetime.fromtimestamp(path.stat().st_mtime) < today - timedelta(days=self.retention_days):
+                path.unlink()
+                removed += 1
+        if removed:
+            self.logger.info(f"  → Removed {removed} partitions older than {cutoff} from {self.root.name}")
+        return removed
+
+    def maintain(self, protected=()):
+        """Run retention then compaction over every table in the layer"""
+        expired = self.apply_retention(protected=protected)
+        compacted = sum(self.compact(table_name, protected=protected) for table_name in self.tables())
+        return expired, compacted
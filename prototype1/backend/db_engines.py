@@ -0,0 +1,110 @@
+"""
+Process-wide pooled database engines for the API
+Handlers borrow connections from one QueuePool per database instead of creating
+(and disposing) an engine per request, so a request no longer pays for a MySQL
+handshake; each pool records how long checkouts wait and how many are in use
+"""
+import threading
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
+from config import (
+    DATA_WAREHOUSE_CONN_STRING, RBAC_CONN_STRING, DB1_CONN_STRING, DB2_CONN_STRING,
+    DB_POOL_SIZE, DB_POOL_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING
+)
+
+# Registry name -> connection string
+DATABASES = {
+    'warehouse': DATA_WAREHOUSE_CONN_STRING,
+    'rbac': RBAC_CONN_STRING,
+    'source1': DB1_CONN_STRING,
+    'source2': DB2_CONN_STRING,
+}
+
+
+class PoolStats:
+    """Checkout wait times and connection counts of one pool"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.connects = 0
+
+    def record_wait(self, seconds):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that times how long each checkout waits for a connection"""
+    stats = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if self.stats is not None:
+                self.stats.record_wait(time.perf_counter() - started)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+_engines = {}
+_stats = {}
+_lock = threading.Lock()
+
+
+def get_engine(name='warehouse'):
+    """Shared pooled engine for a database in DATABASES"""
+    engine = _engines.get(name)
+    if engine is not None:
+        return engine
+    with _lock:
+        if name not in _engines:
+            engine = create_engine(
+                DATABASES[name], poolclass=TimedQueuePool,
+                pool_size=DB_POOL_SIZE, max_overflow=DB_POOL_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT,
+                pool_recycle=DB_POOL_RECYCLE, pool_pre_ping=DB_POOL_PRE_PING,
+            )
+            stats = _stats[name] = PoolStats()
+            engine.pool.stats = stats
+            event.listen(engine, 'connect', lambda dbapi_conn, record: stats.record_connect())
+            _engines[name] = engine
+        return _engines[name]
+
+
+def pool_stats():
+    """Current state and checkout timings of every engine created so far"""
+    report = {}
+    for name, engine in list(_engines.items()):
+        stats = _stats[name]
+        pool = engine.pool
+        report[name] = {
+            'pool_size': pool.size(),
+            'in_use': pool.checkedout(),
+            'idle': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0),
+            'checkouts': stats.checkouts,
+            'connects': stats.connects,
+            'avg_wait_ms': round(stats.wait_seconds / stats.checkouts * 1000, 3) if stats.checkouts else 0.0,
+            'max_wait_ms': round(stats.max_wait_seconds * 1000, 3),
+        }
+    return report
+
+
+def dispose_all():
+    """Close every pooled connection (e.g. after forking worker processes)"""
+    with _lock:
+        for engine in _engines.values():
+            engine.dispose()
@@ -0,0 +1,80 @@
+"""
+Type-2 history of the gold dimensions
+The dimension table keeps only the current version of each row (its indexed
+current-row view, which the analytics queries and fact FKs use), while a history
+table keeps every version with valid_from/valid_to/is_current. Versions are opened
+and closed set-based by comparing the row hashes of the two tables, so a load
+writes only the rows that changed
+"""
+import logging
+from datetime import date, timedelta
+from sqlalchemy import text
+
+# The first version of a row covers every earlier fact; open versions end at OPEN_TO
+OPEN_FROM = date(1900, 1, 1)
+OPEN_TO = date(9999, 12, 31)
+
+# History columns added to the dimension's own columns
+HISTORY_COLUMNS = ['valid_from', 'valid_to', 'valid_from_key', 'valid_to_key', 'is_current']
+
+
+def _key(day):
+    return day.year * 10000 + day.month * 100 + day.day
+
+
+def point_in_time_join(fact_alias, history, alias, key_column='student_key'):
+    """JOIN clause matching each fact row to the history version valid on its date_key (uses idx_interval)"""
+    return (f"JOIN {history} {alias} ON {alias}.{key_column} = {fact_alias}.{key_column} "
+            f"AND {fact_alias}.date_key BETWEEN {alias}.valid_from_key AND {alias}.valid_to_key")
+
+
+def apply_type2(engine, dimension, history, key_column, columns, effective_date, logger=None):
+    """Close the versions whose current row changed or disappeared and open versions for new or
+    changed rows, effective from effective_date; returns (closed, opened)"""
+    logger = logger or logging.getLogger(__name__)
+    closed_on = effective_date - timedelta(days=1)
+    params = {
+        'effective': effective_date, 'effective_key': _key(effective_date),
+        'closed_on': closed_on, 'closed_key': _key(closed_on),
+        'open_from': OPEN_FROM, 'open_from_key': _key(OPEN_FROM),
+        'open_to': OPEN_TO, 'open_to_key': _key(OPEN_TO),
+    }
+    # Current versions whose row was deleted or whose hash no longer matches
+    stale = f"""
+        FROM {history} h
+        LEFT JOIN {dimension} d ON d.{key_column} = h.{key_column}
+        WHERE h.is_current = 1
+          AND (d.{key_column} IS NULL OR NOT (d.row_hash <=> h.row_hash))
+    """
+    col_list = ', '.join(columns)
+    with engine.connect() as conn:
+        # A version opened by an earlier load today is replaced rather than closed with valid_to < valid_from
+        replaced = conn.execute(text(f"""
+            DELETE h {stale} AND h.valid_from >= :effective
+        """), params).rowcount
+        closed = conn.execute(text(f"""
+            UPDATE {history} h
+            LEFT JOIN {dimension} d ON d.{key_column} = h.{key_column}
+            SET h.valid_to = :closed_on, h.valid_to_key = :closed_key, h.is_current = 0
+            WHERE h.is_current = 1
+              AND (d.{key_column} IS NULL OR NOT (d.row_hash <=> h.row_hash))
+        """), params).rowcount
+        # Rows never seen before get a version covering all of their earlier facts
+        opened = conn.execute(text(f"""
+            INSERT INTO {history} ({col_list}, {', '.join(HISTORY_COLUMNS)})
+            SELECT {', '.join(f'd.{c}' for c in columns)},
+                   CASE WHEN seen.{key_column} IS NULL THEN :open_from ELSE :effective END,
+                   :open_to,
+                   CASE WHEN seen.{key_column} IS NULL THEN :open_from_key ELSE :effective_key END,
+                   :open_to_key,
+                   1
+            FROM {dimension} d
+            LEFT JOIN (SELECT DISTINCT {key_column} FROM {history}) seen ON seen.{key_column} = d.{key_column}
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {history} cur WHERE cur.{key_column} = d.{key_column} AND cur.is_current = 1
+            )
+        """), params).rowcount
+        conn.commit()
+    logger.info(f"  → {history}: {closed} versions closed, {replaced} replaced, {opened} opened "
+                f"(effective {effective_date})")
+    return closed + replaced, opened
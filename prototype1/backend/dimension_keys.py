@@ -0,0 +1,85 @@
+"""
+In-memory key sets of the loaded gold dimensions
+Dimension loads publish the surrogate keys they wrote so fact loads can
+semi-join against them without querying the warehouse, and rows whose keys
+match no dimension row are rejected with a reason code instead of dropped
+"""
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+# Dimension -> its surrogate key column
+DIMENSION_KEY_COLUMNS = {
+    'dim_student': 'student_key',
+    'dim_course': 'course_key',
+    'dim_semester': 'semester_key',
+    'dim_time': 'date_key',
+}
+
+# Fact key column -> (dimension, reason when the key is missing, reason when it is not in the dimension)
+FACT_KEY_CHECKS = {
+    'date_key': ('dim_time', 'INVALID_DATE', 'DATE_NOT_IN_DIM_TIME'),
+    'student_key': ('dim_student', 'UNKNOWN_STUDENT', 'UNKNOWN_STUDENT'),
+    'course_key': ('dim_course', 'UNKNOWN_COURSE', 'UNKNOWN_COURSE'),
+    'semester_key': ('dim_semester', 'UNKNOWN_SEMESTER', 'UNKNOWN_SEMESTER'),
+}
+
+REJECT_REASON_COLUMN = 'reject_reason'
+
+
+class DimensionKeys:
+    """Key index per loaded dimension, shared by the concurrent fact loads"""
+    def __init__(self, engine, table_for=lambda table_name: table_name, logger=None):
+        self.engine = engine
+        # Physical table a dimension's keys are read from (its shadow during a load)
+        self.table_for = table_for
+        self.logger = logger or logging.getLogger(__name__)
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def publish(self, table_name, keys):
+        """Record the keys a dimension load wrote"""
+        index = pd.Index(pd.unique(np.asarray(keys, dtype='int64')))
+        with self._lock:
+            self._keys[table_name] = index
+
+    def forget(self, table_name):
+        """Drop a dimension's keys after its table was reset"""
+        with self._lock:
+            self._keys.pop(table_name, None)
+
+    def load(self, table_name):
+        """Read a dimension's keys back from its table once"""
+        column = DIMENSION_KEY_COLUMNS[table_name]
+        with self.engine.connect() as conn:
+            keys = conn.execute(text(f"SELECT {column} FROM {self.table_for(table_name)}")).scalars().all()
+        self.publish(table_name, keys)
+        self.logger.info(f"  → Read {len(keys)} {table_name} keys for fact filtering")
+
+    def keys(self, table_name):
+        """Key index of a dimension; read from the table if no load in this process published it"""
+        with self._lock:
+            index = self._keys.get(table_name)
+        if index is None:
+            self.load(table_name)
+            with self._lock:
+                index = self._keys[table_name]
+        return index
+
+    def semi_join(self, fact):
+        """(rows whose keys all exist in their dimensions, rejected rows with a reject_reason)"""
+        reasons = pd.Series(None, index=fact.index, dtype=object)
+        # The first failing check names the reason
+        for column, (table_name, missing_reason, unknown_reason) in FACT_KEY_CHECKS.items():
+            if column not in fact.columns:
+                continue
+            values = fact[column]
+            present = values.notna().to_numpy()
+            known = values.isin(self.keys(table_name)).to_numpy(dtype=bool, na_value=False)
+            pending = reasons.isna().to_numpy()
+            reasons[pending & ~present] = missing_reason
+            reasons[pending & present & ~known] = unknown_reason
+        rejected = reasons.notna().to_numpy()
+        return fact[~rejected], fact[rejected].assign(**{REJECT_REASON_COLUMN: reasons[rejected]})
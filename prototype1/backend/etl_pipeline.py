@@ -10,19 +10,126 @@ from sqlalchemy import create_engine, text
 import pymysql
 import random
 import logging
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from bulk_loader import BulkLoader
+from warehouse_swap import WarehouseSwap
+from surrogate_keys import SurrogateKeyMap, date_key
+from id_lookup import build_id_lookups, report_unresolved
+from transform_ops import access_numbers, hours_attended, aggregate_attendance
+from silver_schema import enforce_silver_schema, memory_mb
+from data_lake import DataLake
+from run_manifest import RunManifest
+from task_dag import TaskDAG
+from dimension_keys import DimensionKeys, REJECT_REASON_COLUMN
+from dimension_changes import DIMENSION_BUSINESS_KEYS, with_row_hash, stored_hashes, diff_rows
+from dimension_history import apply_type2
+from gold_aggregates import AGGREGATE_TABLES, refresh_aggregates
+from feature_store import (
+    feature_table_columns, load_inputs, build_features, write_snapshot, load_category_codes, save_category_codes
+)
+from gold_lake import GoldLake
+from load_version import bump_load_version
 from config import (
     DB1_CONN_STRING, DB2_CONN_STRING, CSV1_PATH, CSV2_PATH,
-    BRONZE_PATH, SILVER_PATH, GOLD_PATH,
+    BRONZE_PATH, SILVER_PATH, GOLD_PATH, QUARANTINE_PATH,
     DATA_WAREHOUSE_NAME, DATA_WAREHOUSE_CONN_STRING,
-    MYSQL_HOST, MYSQL_PORT, MYSQL_USER, MYSQL_PASSWORD
+    MYSQL_HOST, MYSQL_PORT, MYSQL_USER, MYSQL_PASSWORD,
+    ETL_WATERMARK_TABLE, ETL_INCREMENTAL_TABLES, ETL_MODIFIED_COLUMN, ETL_APPEND_ONLY_TABLES,
+    ETL_GRAIN_COLUMNS,
+    ETL_MEMORY_BUDGET_MB, ETL_CHUNK_MEMORY_FACTOR, ETL_MIN_CHUNK_ROWS, ETL_MAX_CHUNK_ROWS,
+    ETL_EXTRACT_WORKERS, ETL_SOURCE_CONNECTION_LIMITS, GOLD_TABLES,
+    ETL_DEFER_INDEXES, ETL_LOAD_STATS_TABLE, LAKE_RETENTION_DAYS,
+    ETL_LOAD_WORKERS, ETL_TASK_RETRIES, ETL_TASK_RETRY_DELAY, GOLD_FEATURE_TABLE, GOLD_LAKE_EXPORT,
+    GOLD_HISTORY_TABLES
 )
 
+# Silver tables written by the batch transform
+SILVER_TABLES = ['students', 'courses', 'enrollments', 'attendance', 'payments', 'grades']
+# Silver fact date columns that must have a dim_time row
+FACT_DATE_COLUMNS = ['enrollment_date', 'attendance_date', 'payment_date', 'exam_date']
+# Gold dimensions loaded by _create_dimensions
+DIMENSION_TABLES = ['dim_faculty', 'dim_department', 'dim_program', 'dim_student', 'dim_course', 'dim_semester']
+
+def _join_mark(modified, pk):
+    """Stored form of a (modified, pk) high-water mark"""
+    return f"{pd.Timestamp(modified).isoformat(sep=' ')}|{int(pk)}"
+
+
+def _split_mark(mark):
+    modified, pk = str(mark).rsplit('|', 1)
+    return pd.Timestamp(modified).to_pydatetime(), int(pk)
+
+
+def _mark_key(mark):
+    """Comparable value of a PK or (modified, pk) mark"""
+    return _split_mark(mark) if isinstance(mark, str) and '|' in mark else mark
+
+
 class ETLPipeline:
-    def __init__(self):
+    def __init__(self, full_reload=False, streaming=False, memory_budget_mb=ETL_MEMORY_BUDGET_MB,
+                 extract_workers=ETL_EXTRACT_WORKERS, defer_indexes=ETL_DEFER_INDEXES, resume_run_id=None,
+                 load_workers=ETL_LOAD_WORKERS):
         self.bronze_path = BRONZE_PATH
         self.silver_path = SILVER_PATH
         self.gold_path = GOLD_PATH
         self.dw_name = DATA_WAREHOUSE_NAME
+        # Incremental mode pulls only rows past each table's high-water mark;
+        # full reload rebuilds the warehouse from scratch
+        self.full_reload = full_reload
+        self.watermarks = {}
+        self.pending_watermarks = {}
+        # Per source table: (watermark columns, whether incremental runs filter on them), and
+        # how its rows were extracted: 'full', 'changed' (past a modified mark) or 'appended' (past a PK mark)
+        self._watermark_specs = {}
+        self.extract_modes = {}
+        # Fact grains already replaced in this run's shadow tables
+        self._replaced_grains = {}
+        # Streaming mode runs extract -> transform -> load one bounded chunk at a time
+        self.streaming = streaming
+        self.memory_budget_mb = memory_budget_mb
+        self.extract_workers = extract_workers
+        self._watermark_lock = threading.Lock()
+        self.loader = None
+        self.swap = None
+        self.keys = None
+        # Dimension key sets the fact loads semi-join against
+        self.dim_keys = None
+        self._quarantine_parts = {}
+        self._quarantine_lock = threading.Lock()
+        # Deferred index mode creates bare tables and adds indexes/FKs after the load
+        self.defer_indexes = defer_indexes
+        self.deferred_ddl = {}
+        self.gold_foreign_keys = {}
+        self.load_timings = {}
+        # Gold tables this run wrote to (None when unknown); the parquet export re-reads only these
+        self.changed_tables = None
+        self._timing_lock = threading.Lock()
+        # Gold table loads run as a task DAG with this many concurrent tasks
+        self.load_workers = load_workers
+        
+        # Every run checkpoints its stages in a manifest; resuming restores the
+        # options the run started with and the state its extract stage produced
+        if resume_run_id:
+            self.manifest = RunManifest.load(resume_run_id)
+            if self.manifest.options.get('streaming'):
+                raise ValueError(f"Run {resume_run_id} was a streaming run; streaming runs cannot be resumed")
+            self.run_id = resume_run_id
+            self.full_reload = self.manifest.options['full_reload']
+            self.defer_indexes = self.manifest.options['defer_indexes']
+            self.streaming = False
+            if self.manifest.is_complete('extract'):
+                extracted = self.manifest.step('extract')
+                self.full_reload = extracted['full_reload']
+                self.pending_watermarks = {t: tuple(mark) for t, mark in extracted['watermarks'].items()}
+                self.extract_modes = extracted.get('modes', {})
+        else:
+            self.run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+            self.manifest = RunManifest(self.run_id, {
+                'full_reload': self.full_reload, 'streaming': self.streaming, 'defer_indexes': self.defer_indexes
+            })
         
         # Setup logging
         self.log_dir = Path(__file__).parent / "logs"
@@ -42,6 +149,12 @@ class ETLPipeline:
             ]
         )
         self.logger = logging.getLogger(__name__)
+        # Bronze/silver parquet is partitioned by table and ingest date
+        self.bronze_lake = DataLake(self.bronze_path, LAKE_RETENTION_DAYS['bronze'], logger=self.logger)
+        self.silver_lake = DataLake(self.silver_path, LAKE_RETENTION_DAYS['silver'], logger=self.logger)
+        self.quarantine_lake = DataLake(QUARANTINE_PATH, LAKE_RETENTION_DAYS['quarantine'], logger=self.logger)
+        # Parquet copy of each published gold generation for the columnar analytics engine
+        self.gold_lake = GoldLake(logger=self.logger)
         self.logger.info(f"ETL Pipeline initialized. Log file: {self.log_file}")
         
     def create_data_warehouse(self):
@@ -81,91 +194,328 @@ class ETLPipeline:
         self.logger.info("=" * 60)
         print("Extracting data to Bronze layer...")
         
-        # Extract from Database 1 (ACADEMICS)
-        self.logger.info("Extracting from Source Database 1 (ACADEMICS)...")
-        engine1 = create_engine(DB1_CONN_STRING)
-        students_db1 = pd.read_sql_query("SELECT * FROM students", engine1)
-        self.logger.info(f"  → Extracted {len(students_db1)} students")
-        courses_db1 = pd.read_sql_query("SELECT * FROM courses", engine1)
-        self.logger.info(f"  → Extracted {len(courses_db1)} courses")
-        enrollments_db1 = pd.read_sql_query("SELECT * FROM enrollments", engine1)
-        self.logger.info(f"  → Extracted {len(enrollments_db1)} enrollments")
-        attendance_db1 = pd.read_sql_query("SELECT * FROM attendance", engine1)
-        self.logger.info(f"  → Extracted {len(attendance_db1)} attendance records")
-        grades_db1 = pd.read_sql_query("SELECT * FROM grades", engine1)
-        self.logger.info(f"  → Extracted {len(grades_db1)} grades")
-        student_fees_db1 = pd.read_sql_query("SELECT * FROM student_fees", engine1)
-        self.logger.info(f"  → Extracted {len(student_fees_db1)} student fees")
-        # Extract dimension tables
-        faculties_db1 = pd.read_sql_query("SELECT * FROM faculties", engine1)
-        self.logger.info(f"  → Extracted {len(faculties_db1)} faculties")
-        departments_db1 = pd.read_sql_query("SELECT * FROM departments", engine1)
-        self.logger.info(f"  → Extracted {len(departments_db1)} departments")
-        programs_db1 = pd.read_sql_query("SELECT * FROM programs", engine1)
-        self.logger.info(f"  → Extracted {len(programs_db1)} programs")
-        engine1.dispose()
-        
-        # Extract from Database 2 (ADMINISTRATION) - for future use
-        self.logger.info("Extracting from Source Database 2 (ADMINISTRATION)...")
-        engine2 = create_engine(DB2_CONN_STRING)
-        employees_db2 = pd.read_sql_query("SELECT * FROM employees", engine2)
-        self.logger.info(f"  → Extracted {len(employees_db2)} employees")
-        payroll_db2 = pd.read_sql_query("SELECT * FROM payroll", engine2)
-        self.logger.info(f"  → Extracted {len(payroll_db2)} payroll records")
-        engine2.dispose()
-        
-        # Extract from CSV files (for backward compatibility)
-        try:
-            payments_csv = pd.read_csv(CSV1_PATH)
-        except:
-            payments_csv = pd.DataFrame()
-        try:
-            grades_csv = pd.read_csv(CSV2_PATH)
-        except:
-            grades_csv = pd.DataFrame()
-        
-        # Save to Bronze layer (raw data)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        
-        students_db1.to_parquet(self.bronze_path / f"bronze_students_db1_{timestamp}.parquet", index=False)
-        courses_db1.to_parquet(self.bronze_path / f"bronze_courses_db1_{timestamp}.parquet", index=False)
-        enrollments_db1.to_parquet(self.bronze_path / f"bronze_enrollments_db1_{timestamp}.parquet", index=False)
-        attendance_db1.to_parquet(self.bronze_path / f"bronze_attendance_db1_{timestamp}.parquet", index=False)
-        grades_db1.to_parquet(self.bronze_path / f"bronze_grades_db1_{timestamp}.parquet", index=False)
-        student_fees_db1.to_parquet(self.bronze_path / f"bronze_student_fees_db1_{timestamp}.parquet", index=False)
-        if not faculties_db1.empty:
-            faculties_db1.to_parquet(self.bronze_path / f"bronze_faculties_db1_{timestamp}.parquet", index=False)
-        if not departments_db1.empty:
-            departments_db1.to_parquet(self.bronze_path / f"bronze_departments_db1_{timestamp}.parquet", index=False)
-        if not programs_db1.empty:
-            programs_db1.to_parquet(self.bronze_path / f"bronze_programs_db1_{timestamp}.parquet", index=False)
-        
-        employees_db2.to_parquet(self.bronze_path / f"bronze_employees_db2_{timestamp}.parquet", index=False)
-        payroll_db2.to_parquet(self.bronze_path / f"bronze_payroll_db2_{timestamp}.parquet", index=False)
-        
-        if not payments_csv.empty:
-            payments_csv.to_parquet(self.bronze_path / f"bronze_payments_csv_{timestamp}.parquet", index=False)
-        if not grades_csv.empty:
-            grades_csv.to_parquet(self.bronze_path / f"bronze_grades_csv_{timestamp}.parquet", index=False)
+        self._prepare_watermarks()
+        self.manifest.reset_files('bronze')
+        bronze_data = self._extract_parallel(self._extract_tasks())
+        bronze_data.setdefault('payments_csv', pd.DataFrame())
+        bronze_data.setdefault('grades_csv', pd.DataFrame())
+        self.manifest.complete('extract', full_reload=self.full_reload, watermarks=self.pending_watermarks,
+                               modes=self.extract_modes)
         
         self.logger.info(f"Bronze layer files saved to: {self.bronze_path}")
         self.logger.info("Bronze layer extraction complete!")
         print("Bronze layer extraction complete!")
+        return bronze_data
+    
+    def _extract_tasks(self):
+        """(source, source table, bronze name, label) for every table the batch run extracts"""
+        # DB1 is ACADEMICS, DB2 is ADMINISTRATION
+        extract_tasks = [
+            ('db1', 'students', 'students_db1', 'students'),
+            ('db1', 'courses', 'courses_db1', 'courses'),
+            ('db1', 'enrollments', 'enrollments_db1', 'enrollments'),
+            ('db1', 'attendance', 'attendance_db1', 'attendance records'),
+            ('db1', 'grades', 'grades_db1', 'grades'),
+            ('db1', 'student_fees', 'student_fees_db1', 'student fees'),
+            ('db1', 'faculties', 'faculties_db1', 'faculties'),
+            ('db1', 'departments', 'departments_db1', 'departments'),
+            ('db1', 'programs', 'programs_db1', 'programs'),
+            ('db2', 'employees', 'employees_db2', 'employees'),
+            ('db2', 'payroll', 'payroll_db2', 'payroll records'),
+        ]
+        # Extract from CSV files (for backward compatibility)
+        # CSVs have no watermark column, so they are only used on full reloads
+        if self.full_reload:
+            extract_tasks += [
+                ('csv', CSV1_PATH, 'payments_csv', 'CSV payments'),
+                ('csv', CSV2_PATH, 'grades_csv', 'CSV grades'),
+            ]
+        return extract_tasks
+    
+    def _read_run_files(self, layer, names):
+        """Frames this run already wrote to a lake layer; tables it never wrote come back empty"""
+        files = self.manifest.files(layer)
         return {
-            'students_db1': students_db1,
-            'courses_db1': courses_db1,
-            'enrollments_db1': enrollments_db1,
-            'attendance_db1': attendance_db1,
-            'grades_db1': grades_db1,
-            'student_fees_db1': student_fees_db1,
-            'faculties_db1': faculties_db1,
-            'departments_db1': departments_db1,
-            'programs_db1': programs_db1,
-            'employees_db2': employees_db2,
-            'payroll_db2': payroll_db2,
-            'payments_csv': payments_csv,
-            'grades_csv': grades_csv
+            name: pd.concat([pd.read_parquet(path) for path in files[name]], ignore_index=True)
+            if files.get(name) else pd.DataFrame()
+            for name in names
+        }
+    
+    def _reload_bronze(self):
+        """Bronze data of a resumed run, read back from its parquet instead of re-extracted"""
+        self.logger.info(f"Resuming run {self.run_id}: reading bronze parquet instead of re-extracting")
+        names = [task[2] for task in self._extract_tasks()] + ['payments_csv', 'grades_csv']
+        return self._read_run_files('bronze', names)
+    
+    def _reload_silver(self):
+        """Silver data of a resumed run, read back from its parquet instead of re-transformed"""
+        self.logger.info(f"Resuming run {self.run_id}: reading silver parquet instead of re-transforming")
+        silver_data = self._read_run_files('silver', SILVER_TABLES)
+        # Reference dimensions pass straight through from bronze
+        silver_data.update(self._read_run_files('bronze', ['faculties_db1', 'departments_db1', 'programs_db1']))
+        return silver_data
+    
+    def _extract_parallel(self, extract_tasks):
+        """Fan table reads and bronze writes out over a thread pool"""
+        # Each source gets its own bounded engine pool and semaphore so one
+        # database is never hit by more than its connection limit
+        engines = {
+            'db1': create_engine(DB1_CONN_STRING, pool_size=ETL_SOURCE_CONNECTION_LIMITS['db1'], max_overflow=0),
+            'db2': create_engine(DB2_CONN_STRING, pool_size=ETL_SOURCE_CONNECTION_LIMITS['db2'], max_overflow=0),
         }
+        source_slots = {source: threading.BoundedSemaphore(limit)
+                        for source, limit in ETL_SOURCE_CONNECTION_LIMITS.items()}
+        
+        def extract_one(source, location, bronze_name, label):
+            with source_slots[source]:
+                # Time only the work itself, not the wait for a connection slot
+                started = time.perf_counter()
+                if source == 'csv':
+                    try:
+                        df = pd.read_csv(location)
+                    except (OSError, pd.errors.ParserError, pd.errors.EmptyDataError) as e:
+                        self.logger.warning(f"  → Could not read {location} ({e}); skipping {label}")
+                        df = pd.DataFrame()
+                else:
+                    df = self._extract_table(engines[source], location, bronze_name)
+            # Save to Bronze layer (raw data)
+            if not df.empty:
+                path = self.bronze_lake.write(bronze_name, df, run_id=self.run_id)
+                self.manifest.add_file('bronze', bronze_name, path)
+            elapsed = time.perf_counter() - started
+            self.logger.info(f"  → Extracted {len(df)} {label} ({elapsed:.2f}s)")
+            return df, elapsed
+        
+        self.logger.info(f"Extracting {len(extract_tasks)} sources with {self.extract_workers} workers...")
+        wall_start = time.perf_counter()
+        results = {}
+        task_seconds = 0.0
+        try:
+            with ThreadPoolExecutor(max_workers=self.extract_workers, thread_name_prefix='extract') as pool:
+                futures = {pool.submit(extract_one, *task): task[2] for task in extract_tasks}
+                for future in as_completed(futures):
+                    df, elapsed = future.result()
+                    results[futures[future]] = df
+                    task_seconds += elapsed
+        finally:
+            for engine in engines.values():
+                engine.dispose()
+        wall_seconds = time.perf_counter() - wall_start
+        
+        # Serial time is the sum of the individual reads; the difference is what the pool saved
+        saved = task_seconds - wall_seconds
+        speedup = task_seconds / wall_seconds if wall_seconds > 0 else 1.0
+        self.logger.info(f"Parallel extraction: {wall_seconds:.2f}s wall vs {task_seconds:.2f}s serial "
+                         f"(saved {saved:.2f}s, {speedup:.1f}x)")
+        return results
+    
+    def _prepare_watermarks(self):
+        """Load high-water marks, falling back to a full reload when none exist"""
+        # Incremental runs need the high-water marks from the last successful load
+        if not self.full_reload:
+            self.watermarks = self._load_watermarks()
+            if not self.watermarks:
+                self.logger.info("No watermarks found - falling back to full reload")
+                self.full_reload = True
+            elif not self._gold_schema_current():
+                # Live tables from before surrogate keys cannot seed an incremental run
+                self.logger.info("Gold tables use the old schema - falling back to full reload")
+                self.full_reload = True
+        self.pending_watermarks = {}
+        mode = 'FULL RELOAD' if self.full_reload else 'INCREMENTAL'
+        if self.streaming:
+            mode += f' / STREAMING ({self.memory_budget_mb} MB budget)'
+        self.logger.info(f"Extraction mode: {mode}")
+    
+    def _gold_schema_current(self):
+        """Whether the live gold tables already carry surrogate key columns"""
+        try:
+            engine = create_engine(DATA_WAREHOUSE_CONN_STRING)
+            with engine.connect() as conn:
+                found = conn.execute(text("""
+                    SELECT COUNT(*) FROM information_schema.COLUMNS
+                    WHERE TABLE_SCHEMA = :db AND TABLE_NAME = 'fact_grade' AND COLUMN_NAME = 'student_key'
+                """), {'db': self.dw_name}).scalar()
+            engine.dispose()
+        except Exception as e:
+            self.logger.warning(f"Could not inspect gold schema ({e})")
+            return False
+        return bool(found)
+    
+    def _watermark_columns(self, engine, source_table, bronze_name):
+        """(columns, filtered) of a table's watermark: (modified, pk) when the source has a
+        last-modified column, else its PK, which only filters tables declared append-only"""
+        pk_col = ETL_INCREMENTAL_TABLES.get(bronze_name)
+        if pk_col is None:
+            return None, False
+        with self._watermark_lock:
+            cached = self._watermark_specs.get(bronze_name)
+        if cached is not None:
+            return cached
+        columns = pd.read_sql_query(text(f"SELECT * FROM {source_table} LIMIT 0"), engine).columns
+        if ETL_MODIFIED_COLUMN in columns:
+            spec = ((ETL_MODIFIED_COLUMN, pk_col), True)
+        else:
+            spec = ((pk_col,), bronze_name in ETL_APPEND_ONLY_TABLES)
+            if not spec[1] and not self.full_reload:
+                self.logger.info(f"  → {source_table} has no {ETL_MODIFIED_COLUMN} column; "
+                                 f"extracting it in full to pick up updated rows")
+        with self._watermark_lock:
+            self._watermark_specs[bronze_name] = spec
+        return spec
+    
+    def _extract_query(self, engine, source_table, bronze_name):
+        """Build the SELECT for a source table, filtered past its watermark when incremental"""
+        columns, filtered = self._watermark_columns(engine, source_table, bronze_name)
+        saved = self.watermarks.get(bronze_name)
+        # A mark saved for other columns (e.g. before a modified column was added) cannot filter
+        if (not filtered or self.full_reload or saved is None
+                or saved[0] != ','.join(columns)):
+            self._set_extract_mode(bronze_name, 'full')
+            return text(f"SELECT * FROM {source_table}"), {}
+        if len(columns) == 1:
+            self._set_extract_mode(bronze_name, 'appended')
+            query = text(f"SELECT * FROM {source_table} WHERE `{columns[0]}` > :last_mark ORDER BY `{columns[0]}`")
+            return query, {'last_mark': saved[1]}
+        self._set_extract_mode(bronze_name, 'changed')
+        modified_col, pk_col = columns
+        last_modified, last_pk = _split_mark(saved[1])
+        params = {'last_mark': saved[1], 'last_modified': last_modified, 'last_pk': last_pk}
+        # Tuple order, so rows sharing the last timestamp are not skipped or extracted twice
+        changed = (f"(c.`{modified_col}` > :last_modified "
+                   f"OR (c.`{modified_col}` = :last_modified AND c.`{pk_col}` > :last_pk))")
+        grain = ETL_GRAIN_COLUMNS.get(bronze_name)
+        if grain:
+            # Every row of a grain with a changed row, so the grain can be re-aggregated whole
+            match = ' AND '.join(f"c.`{col}` <=> s.`{col}`" for col in grain)
+            query = text(f"""
+                SELECT * FROM {source_table} s
+                WHERE EXISTS (SELECT 1 FROM {source_table} c WHERE {match} AND {changed})
+                ORDER BY s.`{modified_col}`, s.`{pk_col}`
+            """)
+        else:
+            query = text(f"SELECT * FROM {source_table} c WHERE {changed} "
+                         f"ORDER BY c.`{modified_col}`, c.`{pk_col}`")
+        return query, params
+    
+    def _set_extract_mode(self, bronze_name, mode):
+        with self._watermark_lock:
+            self.extract_modes[bronze_name] = mode
+    
+    def _track_watermark(self, bronze_name, df):
+        """Record the highest watermark value seen so far for a source table"""
+        with self._watermark_lock:
+            columns = (self._watermark_specs.get(bronze_name) or (None, False))[0]
+        if not columns or df.empty or any(col not in df.columns for col in columns):
+            return
+        if len(columns) == 1:
+            chunk_mark = df[columns[0]].max()
+        else:
+            modified_col, pk_col = columns
+            last_modified = df[modified_col].max()
+            chunk_mark = _join_mark(last_modified, df.loc[df[modified_col] == last_modified, pk_col].max())
+        column = ','.join(columns)
+        with self._watermark_lock:
+            _, mark, row_count = self.pending_watermarks.get(bronze_name, (column, None, 0))
+            if mark is None or _mark_key(chunk_mark) > _mark_key(mark):
+                mark = chunk_mark
+            self.pending_watermarks[bronze_name] = (column, mark, row_count + len(df))
+    
+    def _finish_watermark(self, bronze_name):
+        """Keep the previous mark for a source table that had no new rows"""
+        saved = self.watermarks.get(bronze_name)
+        with self._watermark_lock:
+            columns = (self._watermark_specs.get(bronze_name) or (None, False))[0]
+            if (columns and bronze_name not in self.pending_watermarks
+                    and saved is not None and saved[0] == ','.join(columns)):
+                self.pending_watermarks[bronze_name] = (saved[0], saved[1], 0)
+    
+    def _extract_table(self, engine, source_table, bronze_name):
+        """Read a source table, only past its high-water mark in incremental mode"""
+        query, params = self._extract_query(engine, source_table, bronze_name)
+        df = pd.read_sql_query(query, engine, params=params)
+        if params:
+            self.logger.info(f"  → {source_table}: {len(df)} new or changed rows since watermark {params['last_mark']}")
+        
+        # Advance the mark only once the load has succeeded (see _save_watermarks)
+        self._track_watermark(bronze_name, df)
+        self._finish_watermark(bronze_name)
+        return df
+    
+    def _chunk_rows(self, engine, source_table):
+        """Size extraction chunks so one in-flight chunk stays inside the memory budget"""
+        sample = pd.read_sql_query(text(f"SELECT * FROM {source_table} LIMIT 1000"), engine)
+        if sample.empty:
+            return ETL_MIN_CHUNK_ROWS
+        row_bytes = sample.memory_usage(deep=True, index=False).sum() / len(sample)
+        # Transform adds columns and copies, so a chunk costs several times its raw size
+        budget_bytes = self.memory_budget_mb * 1024 * 1024
+        rows = int(budget_bytes / (row_bytes * ETL_CHUNK_MEMORY_FACTOR))
+        return max(ETL_MIN_CHUNK_ROWS, min(ETL_MAX_CHUNK_ROWS, rows))
+    
+    def _stream_table(self, engine, source_table, bronze_name):
+        """Yield a source table chunk by chunk through a server-side cursor"""
+        chunk_rows = self._chunk_rows(engine, source_table)
+        query, params = self._extract_query(engine, source_table, bronze_name)
+        self.logger.info(f"  → Streaming {source_table} in chunks of {chunk_rows} rows")
+        total_rows = 0
+        with engine.connect().execution_options(stream_results=True) as conn:
+            for chunk in pd.read_sql_query(query, conn, params=params, chunksize=chunk_rows):
+                total_rows += len(chunk)
+                self._track_watermark(bronze_name, chunk)
+                yield chunk
+        self._finish_watermark(bronze_name)
+        self.logger.info(f"  → Streamed {total_rows} rows from {source_table}")
+    
+    def _ensure_watermark_table(self, conn, table_name=ETL_WATERMARK_TABLE):
+        """Create the watermark control table in the warehouse if missing"""
+        conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {table_name} (
+                table_name VARCHAR(100) PRIMARY KEY,
+                watermark_column VARCHAR(100) NOT NULL,
+                high_water_mark VARCHAR(50),
+                rows_extracted INT,
+                updated_at DATETIME
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """))
+    
+    def _load_watermarks(self):
+        """Read per-table high-water marks from the warehouse control table"""
+        try:
+            engine = create_engine(DATA_WAREHOUSE_CONN_STRING)
+            with engine.connect() as conn:
+                self._ensure_watermark_table(conn)
+                conn.commit()
+                rows = conn.execute(text(
+                    f"SELECT table_name, watermark_column, high_water_mark FROM {ETL_WATERMARK_TABLE}"
+                )).fetchall()
+            engine.dispose()
+        except Exception as e:
+            self.logger.warning(f"Could not read watermarks ({e})")
+            return {}
+        return {row[0]: (row[1], row[2]) for row in rows if row[2] is not None}
+    
+    def _save_watermarks(self, engine):
+        """Write the high-water marks reached by this run into the shadow generation"""
+        if not self.pending_watermarks:
+            return
+        now = datetime.now()
+        with engine.connect() as conn:
+            for table_name, (column, mark, row_count) in self.pending_watermarks.items():
+                conn.execute(text(f"""
+                    INSERT INTO {self._t(ETL_WATERMARK_TABLE)}
+                        (table_name, watermark_column, high_water_mark, rows_extracted, updated_at)
+                    VALUES (:table_name, :column, :mark, :row_count, :now)
+                    ON DUPLICATE KEY UPDATE
+                        watermark_column = VALUES(watermark_column),
+                        high_water_mark = VALUES(high_water_mark),
+                        rows_extracted = VALUES(rows_extracted),
+                        updated_at = VALUES(updated_at)
+                """), {'table_name': table_name, 'column': column, 'mark': str(mark),
+                       'row_count': row_count, 'now': now})
+            conn.commit()
+        for table_name, (column, mark, row_count) in self.pending_watermarks.items():
+            self.logger.info(f"  → Watermark {table_name}.{column} = {mark} ({row_count} rows)")
     
     def transform(self, bronze_data):
         """Transform and clean data (Silver Layer)"""
@@ -174,23 +524,82 @@ class ETLPipeline:
         self.logger.info("=" * 60)
         print("Transforming data to Silver layer...")
         
+        students = bronze_data['students_db1']
+        courses = bronze_data['courses_db1']
+        # One lookup index per run, shared by every table that carries source IDs
+        lookups = build_id_lookups(students, courses)
+        students_silver = self._transform_students(students, lookups)
+        courses_silver = self._transform_courses(courses)
+        enrollments_silver = self._transform_enrollments(bronze_data['enrollments_db1'], lookups)
+        attendance_silver = self._transform_attendance(bronze_data['attendance_db1'], lookups)
+        payments_silver = self._transform_payments(bronze_data['student_fees_db1'], bronze_data['payments_csv'], lookups)
+        grades_silver = self._transform_grades(bronze_data['grades_db1'], bronze_data['grades_csv'], lookups)
+        report_unresolved(lookups, self.logger)
+        
+        # Enforce the typed silver schema before anything is written
+        self.logger.info("Silver memory usage (object -> typed):")
+        students_silver = self._type_silver('students', students_silver)
+        courses_silver = self._type_silver('courses', courses_silver)
+        enrollments_silver = self._type_silver('enrollments', enrollments_silver)
+        attendance_silver = self._type_silver('attendance', attendance_silver)
+        payments_silver = self._type_silver('payments', payments_silver)
+        grades_silver = self._type_silver('grades', grades_silver)
+        
+        # Save to Silver layer
+        self.manifest.reset_files('silver')
+        for table_name, df in [('students', students_silver), ('courses', courses_silver),
+                               ('enrollments', enrollments_silver), ('attendance', attendance_silver),
+                               ('payments', payments_silver), ('grades', grades_silver)]:
+            self.manifest.add_file('silver', table_name, self.silver_lake.write(table_name, df, run_id=self.run_id))
+        self.manifest.complete('transform')
+        
+        self.logger.info(f"Silver layer files saved to: {self.silver_path}")
+        self.logger.info(f"  → Students: {len(students_silver)}")
+        self.logger.info(f"  → Courses: {len(courses_silver)}")
+        self.logger.info(f"  → Enrollments: {len(enrollments_silver)}")
+        self.logger.info(f"  → Attendance: {len(attendance_silver)}")
+        self.logger.info(f"  → Payments: {len(payments_silver)}")
+        self.logger.info(f"  → Grades: {len(grades_silver)}")
+        self.logger.info("Silver layer transformation complete!")
+        print("Silver layer transformation complete!")
+        return {
+            'students': students_silver,
+            'courses': courses_silver,
+            'enrollments': enrollments_silver,
+            'attendance': attendance_silver,
+            'payments': payments_silver,
+            'grades': grades_silver,
+            # Pass through dimension tables from bronze
+            'faculties_db1': bronze_data.get('faculties_db1', pd.DataFrame()),
+            'departments_db1': bronze_data.get('departments_db1', pd.DataFrame()),
+            'programs_db1': bronze_data.get('programs_db1', pd.DataFrame())
+        }
+    
+    def _type_silver(self, table_name, df):
+        """Apply the silver dtypes to one table and log its memory before and after"""
+        typed = enforce_silver_schema(df)
+        before, after = memory_mb(df), memory_mb(typed)
+        ratio = f" ({before / after:.1f}x smaller)" if after > 0 else ""
+        self.logger.info(f"  → {table_name}: {before:.2f} MB -> {after:.2f} MB{ratio}")
+        return typed
+    
+    def _transform_students(self, students, lookups):
+        """Clean source students into the silver student layout"""
         # Transform Students (DB1) - map to old format for compatibility
-        students_silver = bronze_data['students_db1'].copy()
+        students_silver = students.copy()
         students_silver = students_silver.fillna('')
         # Create student_id from RegNo for compatibility
         if 'RegNo' in students_silver.columns:
             students_silver['student_id'] = students_silver['RegNo'].astype(str)
             students_silver['reg_no'] = students_silver['RegNo'].astype(str)
         elif 'StudentID' in students_silver.columns:
-            students_silver['student_id'] = students_silver['StudentID'].apply(lambda x: f"STU{int(x):06d}" if pd.notna(x) else '')
+            students_silver['student_id'] = lookups['student'].resolve(students_silver['StudentID'], 'students')
         # Extract Access Number
         if 'AccessNumber' in students_silver.columns:
             students_silver['access_number'] = students_silver['AccessNumber'].astype(str)
         else:
             # Generate if missing (for backward compatibility)
-            students_silver['access_number'] = students_silver['student_id'].apply(
-                lambda x: f"{random.choice(['A', 'B'])}{random.randint(10000, 99999):05d}" if pd.notna(x) else ''
-            )
+            students_silver['access_number'] = access_numbers(len(students_silver))
         if 'FullName' in students_silver.columns:
             # Split FullName into first_name and last_name
             names = students_silver['FullName'].str.split(' ', n=1, expand=True)
@@ -222,9 +631,12 @@ class ETLPipeline:
         if 'admission_date' not in students_silver.columns:
             students_silver['admission_date'] = (datetime.now() - timedelta(days=random.randint(0, 1460))).strftime('%Y-%m-%d')
         students_silver = students_silver.fillna('')
-        
+        return students_silver
+    
+    def _transform_courses(self, courses):
+        """Clean source courses into the silver course layout"""
         # Transform Courses (DB1)
-        courses_silver = bronze_data['courses_db1'].copy()
+        courses_silver = courses.copy()
         courses_silver = courses_silver.fillna('')
         # Map CourseCode to course_code
         if 'CourseCode' in courses_silver.columns:
@@ -234,69 +646,57 @@ class ETLPipeline:
         if 'CreditUnits' in courses_silver.columns:
             courses_silver['credits'] = courses_silver['CreditUnits']
         courses_silver['department'] = 'General'  # Default, can be enhanced
-        
+        return courses_silver
+    
+    def _resolve_ids(self, frame, lookups, table_name, courses=True):
+        """Resolve StudentID/CourseID to RegNo/CourseCode in place"""
+        if 'StudentID' in frame.columns:
+            frame['student_id'] = lookups['student'].resolve(frame['StudentID'], table_name)
+        if courses and 'CourseID' in frame.columns:
+            frame['course_code'] = lookups['course'].resolve(frame['CourseID'], table_name)
+    
+    def _transform_enrollments(self, enrollments, lookups):
+        """Clean enrollments, resolving source IDs to RegNo/CourseCode"""
         # Clean enrollments - need to join with students and courses to get proper IDs
-        enrollments_silver = bronze_data['enrollments_db1'].copy()
+        enrollments_silver = enrollments.copy()
         enrollments_silver = enrollments_silver.fillna('')
         
-        # Join with students to get RegNo
-        if 'StudentID' in enrollments_silver.columns and 'RegNo' in bronze_data['students_db1'].columns:
-            student_map = dict(zip(bronze_data['students_db1']['StudentID'], bronze_data['students_db1']['RegNo']))
-            enrollments_silver['student_id'] = enrollments_silver['StudentID'].map(student_map).fillna('')
-        elif 'StudentID' in enrollments_silver.columns:
-            enrollments_silver['student_id'] = enrollments_silver['StudentID'].apply(lambda x: f"STU{int(x):06d}" if pd.notna(x) else '')
-        
-        # Join with courses to get CourseCode
-        if 'CourseID' in enrollments_silver.columns and 'CourseCode' in bronze_data['courses_db1'].columns:
-            course_map = dict(zip(bronze_data['courses_db1']['CourseID'], bronze_data['courses_db1']['CourseCode']))
-            enrollments_silver['course_code'] = enrollments_silver['CourseID'].map(course_map).fillna('')
-        elif 'CourseID' in enrollments_silver.columns:
-            enrollments_silver['course_code'] = enrollments_silver['CourseID'].apply(lambda x: f"COURSE{int(x):03d}" if pd.notna(x) else '')
+        # Resolve StudentID/CourseID through the shared lookup index
+        self._resolve_ids(enrollments_silver, lookups, 'enrollments')
         
         if 'AcademicYear' in enrollments_silver.columns:
             enrollments_silver['semester'] = enrollments_silver['AcademicYear'].astype(str) + ' ' + enrollments_silver.get('Semester', '').astype(str)
         enrollments_silver['enrollment_date'] = pd.to_datetime(datetime.now(), errors='coerce')
         enrollments_silver['status'] = 'Active'
         enrollments_silver['enrollment_id'] = enrollments_silver.get('EnrollmentID', range(1, len(enrollments_silver) + 1))
-        
+        return enrollments_silver
+    
+    def _transform_attendance(self, attendance, lookups):
+        """Clean attendance, resolving IDs and deriving hours attended"""
         # Clean attendance (DB1)
-        attendance_silver = bronze_data['attendance_db1'].copy()
+        attendance_silver = attendance.copy()
         attendance_silver = attendance_silver.fillna('')
         
-        # Join with students to get RegNo
-        if 'StudentID' in attendance_silver.columns and 'RegNo' in bronze_data['students_db1'].columns:
-            student_map = dict(zip(bronze_data['students_db1']['StudentID'], bronze_data['students_db1']['RegNo']))
-            attendance_silver['student_id'] = attendance_silver['StudentID'].map(student_map).fillna('')
-        elif 'StudentID' in attendance_silver.columns:
-            attendance_silver['student_id'] = attendance_silver['StudentID'].apply(lambda x: f"STU{int(x):06d}" if pd.notna(x) else '')
-        
-        # Join with courses to get CourseCode
-        if 'CourseID' in attendance_silver.columns and 'CourseCode' in bronze_data['courses_db1'].columns:
-            course_map = dict(zip(bronze_data['courses_db1']['CourseID'], bronze_data['courses_db1']['CourseCode']))
-            attendance_silver['course_code'] = attendance_silver['CourseID'].map(course_map).fillna('')
-        elif 'CourseID' in attendance_silver.columns:
-            attendance_silver['course_code'] = attendance_silver['CourseID'].apply(lambda x: f"COURSE{int(x):03d}" if pd.notna(x) else '')
+        # Resolve StudentID/CourseID through the shared lookup index
+        self._resolve_ids(attendance_silver, lookups, 'attendance')
         
         if 'Date' in attendance_silver.columns:
             attendance_silver['attendance_date'] = pd.to_datetime(attendance_silver['Date'], errors='coerce')
         # Calculate hours_attended based on status
         if 'Status' in attendance_silver.columns:
-            attendance_silver['hours_attended'] = attendance_silver['Status'].apply(
-                lambda x: 2.0 if str(x).upper() == 'PRESENT' else (1.0 if str(x).upper() == 'LATE' else 0.0)
-            )
+            attendance_silver['hours_attended'] = hours_attended(attendance_silver['Status'])
         else:
             attendance_silver['hours_attended'] = 2.0
-        
+        return attendance_silver
+    
+    def _transform_payments(self, student_fees, payments_csv, lookups):
+        """Clean payments from DB1 student_fees, falling back to the CSV source"""
         # Clean payments (from DB1 student_fees or CSV)
-        if not bronze_data['student_fees_db1'].empty:
-            payments_silver = bronze_data['student_fees_db1'].copy()
+        if not student_fees.empty:
+            payments_silver = student_fees.copy()
             payments_silver = payments_silver.fillna('')
-            # Join with students to get RegNo
-            if 'StudentID' in payments_silver.columns and 'RegNo' in bronze_data['students_db1'].columns:
-                student_map = dict(zip(bronze_data['students_db1']['StudentID'], bronze_data['students_db1']['RegNo']))
-                payments_silver['student_id'] = payments_silver['StudentID'].map(student_map).fillna('')
-            elif 'StudentID' in payments_silver.columns:
-                payments_silver['student_id'] = payments_silver['StudentID'].apply(lambda x: f"STU{int(x):06d}" if pd.notna(x) else '')
+            # Resolve StudentID through the shared lookup index
+            self._resolve_ids(payments_silver, lookups, 'payments', courses=False)
             if 'AmountPaid' in payments_silver.columns:
                 payments_silver['amount'] = pd.to_numeric(payments_silver['AmountPaid'], errors='coerce').fillna(0)
             payments_silver['payment_date'] = pd.to_datetime(datetime.now(), errors='coerce')
@@ -305,30 +705,23 @@ class ETLPipeline:
             if 'Semester' in payments_silver.columns:
                 payments_silver['semester'] = payments_silver['Semester']
             payments_silver['payment_id'] = payments_silver.get('PaymentID', range(1, len(payments_silver) + 1))
-        elif not bronze_data['payments_csv'].empty:
-            payments_silver = bronze_data['payments_csv'].copy()
+        elif not payments_csv.empty:
+            payments_silver = payments_csv.copy()
             payments_silver = payments_silver.fillna('')
             payments_silver['payment_date'] = pd.to_datetime(payments_silver.get('payment_date', datetime.now()), errors='coerce')
             payments_silver['amount'] = pd.to_numeric(payments_silver.get('amount', 0), errors='coerce').fillna(0)
         else:
             payments_silver = pd.DataFrame()
-        
+        return payments_silver
+    
+    def _transform_grades(self, grades, grades_csv, lookups):
+        """Clean grades from DB1, falling back to the CSV source"""
         # Clean grades (from DB1 or CSV)
-        if not bronze_data['grades_db1'].empty:
-            grades_silver = bronze_data['grades_db1'].copy()
+        if not grades.empty:
+            grades_silver = grades.copy()
             grades_silver = grades_silver.fillna('')
-            # Join with students to get RegNo
-            if 'StudentID' in grades_silver.columns and 'RegNo' in bronze_data['students_db1'].columns:
-                student_map = dict(zip(bronze_data['students_db1']['StudentID'], bronze_data['students_db1']['RegNo']))
-                grades_silver['student_id'] = grades_silver['StudentID'].map(student_map).fillna('')
-            elif 'StudentID' in grades_silver.columns:
-                grades_silver['student_id'] = grades_silver['StudentID'].apply(lambda x: f"STU{int(x):06d}" if pd.notna(x) else '')
-            # Join with courses to get CourseCode
-            if 'CourseID' in grades_silver.columns and 'CourseCode' in bronze_data['courses_db1'].columns:
-                course_map = dict(zip(bronze_data['courses_db1']['CourseID'], bronze_data['courses_db1']['CourseCode']))
-                grades_silver['course_code'] = grades_silver['CourseID'].map(course_map).fillna('')
-            elif 'CourseID' in grades_silver.columns:
-                grades_silver['course_code'] = grades_silver['CourseID'].apply(lambda x: f"COURSE{int(x):03d}" if pd.notna(x) else '')
+            # Resolve StudentID/CourseID through the shared lookup index
+            self._resolve_ids(grades_silver, lookups, 'grades')
             # Extract coursework and exam scores
             if 'CourseworkScore' in grades_silver.columns:
                 grades_silver['coursework_score'] = pd.to_numeric(grades_silver['CourseworkScore'], errors='coerce').fillna(0)
@@ -366,8 +759,8 @@ class ETLPipeline:
             grades_silver['exam_date'] = pd.to_datetime(datetime.now(), errors='coerce')
             grades_silver['semester'] = '2023/2024 Sem 1'
             grades_silver['grade_id'] = grades_silver.get('GradeID', range(1, len(grades_silver) + 1))
-        elif not bronze_data['grades_csv'].empty:
-            grades_silver = bronze_data['grades_csv'].copy()
+        elif not grades_csv.empty:
+            grades_silver = grades_csv.copy()
             grades_silver = grades_silver.fillna('')
             # Extract coursework and exam scores from CSV
             if 'coursework_score' in grades_silver.columns:
@@ -398,38 +791,7 @@ class ETLPipeline:
             grades_silver['exam_date'] = pd.to_datetime(grades_silver.get('exam_date', datetime.now()), errors='coerce')
         else:
             grades_silver = pd.DataFrame()
-        
-        # Save to Silver layer
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        
-        students_silver.to_parquet(self.silver_path / f"silver_students_{timestamp}.parquet", index=False)
-        courses_silver.to_parquet(self.silver_path / f"silver_courses_{timestamp}.parquet", index=False)
-        enrollments_silver.to_parquet(self.silver_path / f"silver_enrollments_{timestamp}.parquet", index=False)
-        attendance_silver.to_parquet(self.silver_path / f"silver_attendance_{timestamp}.parquet", index=False)
-        payments_silver.to_parquet(self.silver_path / f"silver_payments_{timestamp}.parquet", index=False)
-        grades_silver.to_parquet(self.silver_path / f"silver_grades_{timestamp}.parquet", index=False)
-        
-        self.logger.info(f"Silver layer files saved to: {self.silver_path}")
-        self.logger.info(f"  → Students: {len(students_silver)}")
-        self.logger.info(f"  → Courses: {len(courses_silver)}")
-        self.logger.info(f"  → Enrollments: {len(enrollments_silver)}")
-        self.logger.info(f"  → Attendance: {len(attendance_silver)}")
-        self.logger.info(f"  → Payments: {len(payments_silver)}")
-        self.logger.info(f"  → Grades: {len(grades_silver)}")
-        self.logger.info("Silver layer transformation complete!")
-        print("Silver layer transformation complete!")
-        return {
-            'students': students_silver,
-            'courses': courses_silver,
-            'enrollments': enrollments_silver,
-            'attendance': attendance_silver,
-            'payments': payments_silver,
-            'grades': grades_silver,
-            # Pass through dimension tables from bronze
-            'faculties_db1': bronze_data.get('faculties_db1', pd.DataFrame()),
-            'departments_db1': bronze_data.get('departments_db1', pd.DataFrame()),
-            'programs_db1': bronze_data.get('programs_db1', pd.DataFrame())
-        }
+        return grades_silver
     
     def load_to_warehouse(self, silver_data):
         """Load transformed data into star schema data warehouse (Gold Layer)"""
@@ -442,15 +804,31 @@ class ETLPipeline:
         self.create_data_warehouse()
         
         engine = create_engine(DATA_WAREHOUSE_CONN_STRING)
+        self.loader = BulkLoader(engine, logger=self.logger)
+        self.swap = WarehouseSwap(engine, logger=self.logger)
+        self.keys = SurrogateKeyMap(engine, logger=self.logger)
+        self.dim_keys = DimensionKeys(engine, self._t, logger=self.logger)
+        
+        # Build the new generation in shadow tables; the live ones keep serving the API.
+        # A resumed run keeps the shadows its failed attempt left behind.
+        if self.manifest.is_complete('load:shadow_tables') and self.swap.shadows_exist():
+            self._reattach_shadow_tables(engine)
+        else:
+            self.manifest.reset_steps('load:')
+            self.manifest.reset_steps('index:')
+            self._prepare_shadow_tables(engine)
+            self.manifest.complete('load:shadow_tables')
+        
+        # Dimensions, dim_time and facts load as a DAG: each table waits only for
+        # the tables it references, so independent loads run side by side
+        dag = self._load_dag(engine, silver_data)
+        try:
+            dag.run()
+        finally:
+            dag.report()
         
-        # Create dimension tables
-        self._create_dimensions(engine, silver_data)
-        
-        # Populate time dimension before facts (facts reference dim_time)
-        self._populate_time_dimension(engine)
-        
-        # Create fact tables
-        self._create_facts(engine, silver_data)
+        self._publish(engine)
+        self.manifest.complete('load:publish')
         
         engine.dispose()
         self.logger.info("=" * 60)
@@ -460,94 +838,329 @@ class ETLPipeline:
         print("Gold layer (Data Warehouse) loading complete!")
         print(f"ETL log file: {self.log_file}")
     
-    def _create_dimensions(self, engine, silver_data):
-        """Create dimension tables for star schema"""
-        self.logger.info("Creating dimension tables...")
+    def _load_step(self, engine, step, table_names, load):
+        """Run one checkpointed load step, skipping it if a previous attempt finished it"""
+        name = f"load:{step}"
+        if self.manifest.is_complete(name):
+            self.logger.info(f"  → {step} already loaded by run {self.run_id}, skipping")
+            return
+        if self.manifest.is_started(name):
+            # The failed attempt may have loaded part of the step
+            self.logger.info(f"  → Retrying {step}: resetting {', '.join(table_names) or 'nothing'}")
+            self._reset_shadow_tables(engine, table_names)
+        self.manifest.start(name)
+        # A retried fact load rewrites its quarantine parts rather than adding to them
+        with self._quarantine_lock:
+            self._quarantine_parts.pop(step, None)
+        load()
+        self.manifest.complete(name)
+    
+    def _t(self, table_name):
+        """Physical name of a gold table in this run: its shadow until published"""
+        return self.swap.shadow(table_name)
+    
+    def _publish(self, engine):
+        """Validate the shadow generation and swap it live in one step"""
+        # Bulk loads skip per-row FK checks, so integrity is enforced here set-based
+        self._check_referential_integrity(engine)
+        self._build_deferred_indexes(engine)
+        self._build_aggregates(engine)
+        self._build_feature_store(engine)
+        self._report_load_times(engine)
+        self.logger.info("Validating and publishing new gold generation...")
+        self.swap.validate()
+        if GOLD_LAKE_EXPORT:
+            started = time.perf_counter()
+            self.logger.info("Exporting gold star schema to parquet...")
+            self.gold_lake.export(engine, self.run_id, table_for=self._t,
+                                  changed=None if self.full_reload else self.changed_tables)
+            self.logger.info(f"  → Parquet export took {time.perf_counter() - started:.1f}s")
+        self.swap.publish()
+        if GOLD_LAKE_EXPORT:
+            self.gold_lake.publish(self.run_id)
+        # API response caches drop everything computed from the previous load
+        bump_load_version(self.run_id)
+        print("New gold generation published")
+    
+    def _write_dimension(self, engine, table_name, df):
+        """Write only the dimension rows whose row hash differs from the previous load"""
+        started = time.perf_counter()
+        business_key = DIMENSION_BUSINESS_KEYS[table_name]
+        df = with_row_hash(df)
+        stored = stored_hashes(engine, self._t(table_name), business_key)
+        inserts, updates, deleted = diff_rows(df, stored, business_key)
+        # Full reloads make the dimension match the source exactly; incremental runs never delete
+        if self.full_reload:
+            self.loader.delete(self._t(table_name), business_key, list(deleted))
+        else:
+            deleted = deleted[:0]
+        if stored.empty:
+            self.loader.load(self._t(table_name), inserts, strategy=self.loader.strategy_for(table_name),
+                             disable_checks=False)
+        else:
+            # Upserted so a business key that compared as new can never collide with a stored row
+            self.loader.merge(self._t(table_name), pd.concat([inserts, updates]))
+        changed = len(inserts) + len(updates) + len(deleted)
+        if changed:
+            self._mark_changed(table_name)
+        self.logger.info(f"  → {table_name}: {len(inserts)} inserted, {len(updates)} updated, "
+                         f"{len(deleted)} deleted, {len(df) - len(inserts) - len(updates)} unchanged")
+        self._record_timing(table_name, 'load_seconds', time.perf_counter() - started, rows=changed)
+    
+    def _write_fact(self, engine, table_name, df, additive_cols=None):
+        """Append facts on full reload, merge them by key on incremental runs"""
+        # Streamed chunks can split one aggregate grain, so additive facts always merge
+        started = time.perf_counter()
+        if self.full_reload and not (self.streaming and additive_cols):
+            self.loader.load(self._t(table_name), df, strategy=self.loader.strategy_for(table_name))
+        else:
+            self.loader.merge(self._t(table_name), df, additive_cols=additive_cols)
+        if len(df):
+            self._mark_changed(table_name)
+        self._record_timing(table_name, 'load_seconds', time.perf_counter() - started, rows=len(df))
+    
+    def _replace_grains(self, table_name, df, grain):
+        """Delete the stored rows of the grains in df not yet replaced in this run, so the
+        additive merge that follows rebuilds them (chunks of one grain still add up)"""
+        keys = set(df[grain].itertuples(index=False, name=None))
+        with self._timing_lock:
+            replaced = self._replaced_grains.setdefault(table_name, set())
+            keys -= replaced
+            replaced |= keys
+        if keys:
+            self.loader.delete_keys(self._t(table_name), grain, sorted(keys))
+    
+    def _write_history(self, engine, table_name, key_column, columns):
+        """Version the rows of a dimension that changed in this run into its Type-2 history"""
+        started = time.perf_counter()
+        history = GOLD_HISTORY_TABLES[table_name]
+        # Changes take effect on the day the run started, so a resumed run versions them identically
+        effective_date = datetime.strptime(self.run_id, '%Y%m%d_%H%M%S').date()
+        closed, opened = apply_type2(engine, self._t(table_name), self._t(history), key_column, columns,
+                                     effective_date, logger=self.logger)
+        if closed or opened:
+            self._mark_changed(history)
+        self._record_timing(history, 'load_seconds', time.perf_counter() - started, rows=closed + opened)
+    
+    def _prepare_shadow_tables(self, engine):
+        """Create this run's shadow gold tables, seeded with the live rows they build on"""
+        self.logger.info("Preparing shadow gold tables...")
+        self.deferred_ddl = {}
+        self.gold_foreign_keys = {}
+        self.load_timings = {}
+        self.changed_tables = set()
+        self.swap.drop_shadows()
+        self._create_dimension_tables(engine)
+        self._create_fact_tables(engine)
+        self._create_derived_tables(engine)
+        with engine.connect() as conn:
+            self._ensure_watermark_table(conn, self._t(ETL_WATERMARK_TABLE))
+            conn.commit()
         
+        for table_name in GOLD_TABLES:
+            if self._seeded_from_live(table_name):
+                started = time.perf_counter()
+                copied = self.swap.seed(table_name)
+                self._record_timing(table_name, 'load_seconds', time.perf_counter() - started, rows=copied)
+    
+    def _seeded_from_live(self, table_name):
+        """Whether a shadow table starts from a copy of its live rows"""
+        # Incremental runs merge into a copy of the live warehouse; full reloads start
+        # empty apart from the dimensions, whose live rows carry the hashes they are diffed against,
+        # and the dimension histories. Summary and feature tables are always rebuilt from the facts
+        if table_name in AGGREGATE_TABLES or table_name == GOLD_FEATURE_TABLE:
+            return False
+        return (not self.full_reload or table_name in DIMENSION_TABLES
+                or table_name in GOLD_HISTORY_TABLES.values())
+    
+    def _reattach_shadow_tables(self, engine):
+        """Pick up the shadow tables of a resumed run without rebuilding them"""
+        self.logger.info(f"Reusing shadow gold tables from run {self.run_id}...")
+        self.deferred_ddl = {}
+        self.gold_foreign_keys = {}
+        self.load_timings = {}
+        # The failed attempt's changes are not known, so the parquet export rewrites every table
+        self.changed_tables = None
+        # CREATE TABLE IF NOT EXISTS leaves the tables alone but rebuilds the DDL bookkeeping
+        self._create_dimension_tables(engine)
+        self._create_fact_tables(engine)
+        self._create_derived_tables(engine)
+    
+    def _reset_shadow_tables(self, engine, table_names):
+        """Return shadow tables to their seeded state before a load step is retried"""
         with engine.connect() as conn:
-            # Temporarily disable FK checks so we can drop and recreate tables safely
             conn.execute(text("SET FOREIGN_KEY_CHECKS=0"))
-
-            # Drop fact tables first (they reference dimensions)
-            conn.execute(text("DROP TABLE IF EXISTS fact_grade"))
-            conn.execute(text("DROP TABLE IF EXISTS fact_payment"))
-            conn.execute(text("DROP TABLE IF EXISTS fact_attendance"))
-            conn.execute(text("DROP TABLE IF EXISTS fact_enrollment"))
-
+            for table_name in table_names:
+                conn.execute(text(f"DELETE FROM {self._t(table_name)}"))
+            conn.execute(text("SET FOREIGN_KEY_CHECKS=1"))
+            conn.commit()
+        for table_name in table_names:
+            self.dim_keys.forget(table_name)
+            self._replaced_grains.pop(table_name, None)
+            if self._seeded_from_live(table_name):
+                self.swap.seed(table_name)
+    
+    def _create_gold_table(self, conn, table_name, columns, indexes=(), foreign_keys=()):
+        """Create a shadow gold table; in deferred mode indexes and FKs are added after the load"""
+        index_clauses = [f"INDEX {name} ({cols})" for name, cols in indexes]
+        fk_clauses = [
+            f"FOREIGN KEY ({col}) REFERENCES {self._t(parent)}({col}) ON DELETE CASCADE"
+            for col, parent in foreign_keys
+        ]
+        self.gold_foreign_keys[table_name] = list(foreign_keys)
+        if self.defer_indexes:
+            # Only the primary/unique keys stay inline: merges rely on them
+            body = columns.strip()
+            self.deferred_ddl[table_name] = index_clauses + fk_clauses
+        else:
+            body = ",\n                ".join([columns.strip()] + fk_clauses + index_clauses)
+        conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {self._t(table_name)} (
+                {body}
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """))
+    
+    def _create_dimension_tables(self, engine):
+        """Create the dimension table DDL for the shadow generation"""
+        with engine.connect() as conn:
+            # Dim_Faculty / Dim_Department / Dim_Program (same layout as populate_dimension_tables.py)
+            self._create_gold_table(conn, 'dim_faculty', """
+                faculty_id INT PRIMARY KEY,
+                faculty_name VARCHAR(200),
+                dean_name VARCHAR(100),
+                row_hash BIGINT
+            """, indexes=[('idx_faculty_name', 'faculty_name')])
+            self._create_gold_table(conn, 'dim_department', """
+                department_id INT PRIMARY KEY,
+                department_name VARCHAR(200),
+                faculty_id INT,
+                head_of_department VARCHAR(100),
+                row_hash BIGINT
+            """, indexes=[('idx_faculty', 'faculty_id'), ('idx_dept_name', 'department_name')],
+                foreign_keys=[('faculty_id', 'dim_faculty')])
+            self._create_gold_table(conn, 'dim_program', """
+                program_id INT PRIMARY KEY,
+                program_name VARCHAR(200),
+                degree_level VARCHAR(50),
+                department_id INT,
+                duration_years INT,
+                row_hash BIGINT
+            """, indexes=[('idx_department', 'department_id'), ('idx_program_name', 'program_name')],
+                foreign_keys=[('department_id', 'dim_department')])
+            
             # Dim_Student
-            conn.execute(text("DROP TABLE IF EXISTS dim_student"))
-            conn.execute(text("""
-                CREATE TABLE dim_student (
-                    student_id VARCHAR(20) PRIMARY KEY,
-                    reg_no VARCHAR(50),
-                    access_number VARCHAR(10) UNIQUE,
-                    first_name VARCHAR(50),
-                    last_name VARCHAR(50),
-                    email VARCHAR(100),
-                    gender CHAR(1),
-                    nationality VARCHAR(50),
-                    admission_date DATE,
-                    high_school VARCHAR(200),
-                    high_school_district VARCHAR(100),
-                    program_id INT,
-                    year_of_study INT,
-                    status VARCHAR(50),
-                    INDEX idx_name (last_name, first_name),
-                    INDEX idx_email (email),
-                    INDEX idx_access_number (access_number),
-                    INDEX idx_reg_no (reg_no),
-                    INDEX idx_high_school (high_school),
-                    INDEX idx_program (program_id),
-                    INDEX idx_status (status)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-            """))
+            self._create_gold_table(conn, 'dim_student', """
+                student_key INT PRIMARY KEY,
+                student_id VARCHAR(20) NOT NULL UNIQUE,
+                reg_no VARCHAR(50),
+                access_number VARCHAR(10) UNIQUE,
+                first_name VARCHAR(50),
+                last_name VARCHAR(50),
+                email VARCHAR(100),
+                gender CHAR(1),
+                nationality VARCHAR(50),
+                admission_date DATE,
+                high_school VARCHAR(200),
+                high_school_district VARCHAR(100),
+                program_id INT,
+                year_of_study INT,
+                status VARCHAR(50),
+                row_hash BIGINT
+            """, indexes=[
+                ('idx_name', 'last_name, first_name'),
+                ('idx_email', 'email'),
+                ('idx_access_number', 'access_number'),
+                ('idx_reg_no', 'reg_no'),
+                ('idx_high_school', 'high_school'),
+                ('idx_program', 'program_id'),
+                ('idx_status', 'status'),
+            ])
+            # Dim_Student_History - every version of each student (Type 2); dim_student is its current rows
+            self._create_gold_table(conn, GOLD_HISTORY_TABLES['dim_student'], """
+                student_version_key INT AUTO_INCREMENT PRIMARY KEY,
+                student_key INT NOT NULL,
+                student_id VARCHAR(20) NOT NULL,
+                reg_no VARCHAR(50),
+                access_number VARCHAR(10),
+                first_name VARCHAR(50),
+                last_name VARCHAR(50),
+                email VARCHAR(100),
+                gender CHAR(1),
+                nationality VARCHAR(50),
+                admission_date DATE,
+                high_school VARCHAR(200),
+                high_school_district VARCHAR(100),
+                program_id INT,
+                year_of_study INT,
+                status VARCHAR(50),
+                row_hash BIGINT,
+                valid_from DATE NOT NULL,
+                valid_to DATE NOT NULL,
+                valid_from_key INT NOT NULL,
+                valid_to_key INT NOT NULL,
+                is_current TINYINT NOT NULL,
+                UNIQUE KEY uq_student_version (student_key, valid_from)
+            """, indexes=[
+                # Point-in-time joins: student_key = fact.student_key AND fact.date_key BETWEEN the keys
+                ('idx_interval', 'student_key, valid_from_key, valid_to_key'),
+                ('idx_current', 'is_current, student_key'),
+                ('idx_status_interval', 'status, valid_from_key, valid_to_key'),
+            ])
             
             # Dim_Course
-            conn.execute(text("DROP TABLE IF EXISTS dim_course"))
-            conn.execute(text("""
-                CREATE TABLE dim_course (
-                    course_code VARCHAR(20) PRIMARY KEY,
-                    course_name VARCHAR(100),
-                    credits INT,
-                    department VARCHAR(50),
-                    INDEX idx_department (department)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-            """))
+            self._create_gold_table(conn, 'dim_course', """
+                course_key INT PRIMARY KEY,
+                course_code VARCHAR(20) NOT NULL UNIQUE,
+                course_name VARCHAR(100),
+                credits INT,
+                department VARCHAR(50),
+                row_hash BIGINT
+            """, indexes=[('idx_department', 'department')])
             
             # Dim_Time
-            conn.execute(text("DROP TABLE IF EXISTS dim_time"))
-            conn.execute(text("""
-                CREATE TABLE dim_time (
-                    date_key VARCHAR(8) PRIMARY KEY,
-                    date DATE,
-                    year INT,
-                    quarter INT,
-                    month INT,
-                    month_name VARCHAR(20),
-                    day INT,
-                    day_of_week INT,
-                    day_name VARCHAR(20),
-                    is_weekend BOOLEAN,
-                    INDEX idx_date (date),
-                    INDEX idx_year_month (year, month)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-            """))
+            self._create_gold_table(conn, 'dim_time', """
+                date_key INT PRIMARY KEY,
+                date DATE,
+                year INT,
+                quarter INT,
+                month INT,
+                month_name VARCHAR(20),
+                day INT,
+                day_of_week INT,
+                day_name VARCHAR(20),
+                is_weekend BOOLEAN
+            """, indexes=[('idx_date', 'date'), ('idx_year_month', 'year, month')])
             
             # Dim_Semester
-            conn.execute(text("DROP TABLE IF EXISTS dim_semester"))
-            conn.execute(text("""
-                CREATE TABLE dim_semester (
-                    semester_id INT PRIMARY KEY,
-                    semester_name VARCHAR(50),
-                    academic_year VARCHAR(20),
-                    INDEX idx_academic_year (academic_year)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-            """))
-
-            # Re‑enable foreign key checks
-            conn.execute(text("SET FOREIGN_KEY_CHECKS=1"))
+            self._create_gold_table(conn, 'dim_semester', """
+                semester_key INT PRIMARY KEY,
+                semester_id INT NOT NULL UNIQUE,
+                semester_name VARCHAR(50),
+                academic_year VARCHAR(20),
+                row_hash BIGINT
+            """, indexes=[('idx_academic_year', 'academic_year')])
             conn.commit()
-        
+    
+    def _create_dimensions(self, engine, silver_data):
+        """Load dimension tables for star schema"""
+        self.logger.info("Loading dimension tables...")
+        loaders = self._dimension_loaders()
+        for table_name in DIMENSION_TABLES:
+            loaders[table_name](engine, silver_data)
+    
+    def _dimension_loaders(self):
+        """Dimension table -> loader taking (engine, silver_data)"""
+        return {
+            'dim_faculty': self._load_dim_faculty,
+            'dim_department': self._load_dim_department,
+            'dim_program': self._load_dim_program,
+            'dim_student': self._load_dim_student,
+            'dim_course': self._load_dim_course,
+            'dim_semester': self._load_dim_semester,
+        }
+    
+    def _load_dim_student(self, engine, silver_data):
+        """Load students into dim_student"""
         # Dim_Student - deduplicate by student_id and include all fields
         student_cols = ['student_id', 'reg_no', 'access_number', 'first_name', 'last_name', 
                        'email', 'gender', 'nationality', 'admission_date', 'high_school', 
@@ -576,35 +1189,39 @@ class ETLPipeline:
         students_dim = students_dim.drop_duplicates(subset=['student_id'], keep='first')
         # Also deduplicate by access_number to avoid unique constraint violations
         students_dim = students_dim.drop_duplicates(subset=['access_number'], keep='first')
+        students_dim.insert(0, 'student_key', self.keys.assign('student', students_dim['student_id']).values)
         
-        # Clear existing data first
-        with engine.connect() as conn:
-            conn.execute(text("DELETE FROM dim_student"))
-            conn.commit()
-        
-        students_dim.to_sql('dim_student', engine, if_exists='append', index=False, method='multi', chunksize=100)
+        self._write_dimension(engine, 'dim_student', students_dim)
+        self._write_history(engine, 'dim_student', 'student_key', list(students_dim.columns) + ['row_hash'])
+        self._publish_dimension_keys('dim_student', students_dim['student_key'])
         self.logger.info(f"  → Loaded {len(students_dim)} students into dim_student")
-        
+    
+    def _load_dim_course(self, engine, silver_data):
+        """Load courses into dim_course"""
         # Dim_Course - deduplicate by course_code
         courses_dim = silver_data['courses'][['course_code', 'course_name', 'credits', 'department']].copy()
         courses_dim.columns = ['course_code', 'course_name', 'credits', 'department']
         courses_dim = courses_dim.drop_duplicates(subset=['course_code'], keep='first')
-        # Clear existing data first
-        with engine.connect() as conn:
-            conn.execute(text("DELETE FROM dim_course"))
-            conn.commit()
-        courses_dim.to_sql('dim_course', engine, if_exists='append', index=False)
+        courses_dim.insert(0, 'course_key', self.keys.assign('course', courses_dim['course_code']).values)
+        self._write_dimension(engine, 'dim_course', courses_dim)
+        self._publish_dimension_keys('dim_course', courses_dim['course_key'])
         self.logger.info(f"  → Loaded {len(courses_dim)} courses into dim_course")
-        
+    
+    def _load_dim_semester(self, engine, silver_data):
+        """Load semesters into dim_semester"""
         # Dim_Semester
         semesters = pd.DataFrame({
             'semester_id': [1, 2, 3, 4],
             'semester_name': ['Fall 2023', 'Spring 2024', 'Fall 2024', 'Spring 2025'],
             'academic_year': ['2023-2024', '2023-2024', '2024-2025', '2024-2025']
         })
-        semesters.to_sql('dim_semester', engine, if_exists='append', index=False)
+        semesters.insert(0, 'semester_key', self.keys.assign('semester', semesters['semester_id']).values)
+        self._write_dimension(engine, 'dim_semester', semesters)
+        self._publish_dimension_keys('dim_semester', semesters['semester_key'])
         self.logger.info(f"  → Loaded {len(semesters)} semesters into dim_semester")
-        
+    
+    def _load_dim_faculty(self, engine, silver_data):
+        """Load faculties from the source database into dim_faculty"""
         # Dim_Faculty - from source database
         if 'faculties_db1' in silver_data and not silver_data['faculties_db1'].empty:
             faculties_dim = silver_data['faculties_db1'].copy()
@@ -620,13 +1237,12 @@ class ETLPipeline:
             available_cols = [col for col in faculty_cols if col in faculties_dim.columns]
             if available_cols:
                 faculties_dim = faculties_dim[available_cols].drop_duplicates(subset=['faculty_id'], keep='first')
-                with engine.connect() as conn:
-                    conn.execute(text("DELETE FROM dim_faculty"))
-                    conn.commit()
-                faculties_dim.to_sql('dim_faculty', engine, if_exists='append', index=False)
+                self._write_dimension(engine, 'dim_faculty', faculties_dim)
                 self.logger.info(f"  -> Loaded {len(faculties_dim)} faculties into dim_faculty")
                 print(f"  -> Loaded {len(faculties_dim)} faculties into dim_faculty")
-        
+    
+    def _load_dim_department(self, engine, silver_data):
+        """Load departments from the source database into dim_department"""
         # Dim_Department - from source database
         if 'departments_db1' in silver_data and not silver_data['departments_db1'].empty:
             departments_dim = silver_data['departments_db1'].copy()
@@ -644,13 +1260,12 @@ class ETLPipeline:
             available_cols = [col for col in dept_cols if col in departments_dim.columns]
             if available_cols:
                 departments_dim = departments_dim[available_cols].drop_duplicates(subset=['department_id'], keep='first')
-                with engine.connect() as conn:
-                    conn.execute(text("DELETE FROM dim_department"))
-                    conn.commit()
-                departments_dim.to_sql('dim_department', engine, if_exists='append', index=False)
+                self._write_dimension(engine, 'dim_department', departments_dim)
                 self.logger.info(f"  -> Loaded {len(departments_dim)} departments into dim_department")
                 print(f"  -> Loaded {len(departments_dim)} departments into dim_department")
-        
+    
+    def _load_dim_program(self, engine, silver_data):
+        """Load programs from the source database into dim_program"""
         # Dim_Program - from source database
         if 'programs_db1' in silver_data and not silver_data['programs_db1'].empty:
             programs_dim = silver_data['programs_db1'].copy()
@@ -670,42 +1285,53 @@ class ETLPipeline:
             available_cols = [col for col in program_cols if col in programs_dim.columns]
             if available_cols:
                 programs_dim = programs_dim[available_cols].drop_duplicates(subset=['program_id'], keep='first')
-                with engine.connect() as conn:
-                    conn.execute(text("DELETE FROM dim_program"))
-                    conn.commit()
-                programs_dim.to_sql('dim_program', engine, if_exists='append', index=False)
+                self._write_dimension(engine, 'dim_program', programs_dim)
                 self.logger.info(f"  -> Loaded {len(programs_dim)} programs into dim_program")
                 print(f"  -> Loaded {len(programs_dim)} programs into dim_program")
-        
-    def _populate_time_dimension(self, engine):
-        """Populate time dimension table"""
-        self.logger.info("Populating time dimension...")
-        print("Populating time dimension...")
-        
-        # Generate dates from 2023-01-01 to 2025-12-31
-        dates = pd.date_range(start='2023-01-01', end='2025-12-31', freq='D')
-        time_dim = pd.DataFrame({
-            'date_key': [d.strftime('%Y%m%d') for d in dates],
-            'date': dates,
-            'year': dates.year,
-            'quarter': dates.quarter,
-            'month': dates.month,
-            'month_name': dates.strftime('%B'),
-            'day': dates.day,
-            'day_of_week': dates.dayofweek,
-            'day_name': dates.strftime('%A'),
-            'is_weekend': dates.dayofweek >= 5
-        })
-        
-        time_dim.to_sql('dim_time', engine, if_exists='append', index=False, method='multi', chunksize=1000)
-        self.logger.info(f"  → Loaded {len(time_dim)} time dimension records")
-        print("Time dimension populated!")
-        
-    def _create_time_dimension(self):
-        """Create time dimension table (helper method)"""
-        dates = pd.date_range(start='2023-01-01', end='2025-12-31', freq='D')
+    
+    def _publish_dimension_keys(self, table_name, keys):
+        """Share the keys of a loaded dimension with the fact loads"""
+        if self.full_reload:
+            self.dim_keys.publish(table_name, keys)
+        else:
+            # Incremental shadows also hold the live rows they were seeded with
+            self.dim_keys.load(table_name)
+    
+    def _populate_time_dimension(self, engine, fact_frames):
+        """Add the days the incoming facts need to dim_time, never rewriting days already there"""
+        self.logger.info("Updating time dimension...")
+        dates = pd.concat([pd.Series(pd.to_datetime(frame[col], errors='coerce'))
+                           for frame in fact_frames for col in FACT_DATE_COLUMNS if col in frame.columns]
+                          or [pd.Series(dtype='datetime64[ns]')]).dropna()
+        if dates.empty:
+            self.logger.info("  → No fact dates, time dimension unchanged")
+            return
+        existing = self.dim_keys.keys('dim_time')
+        start, end = dates.min().normalize(), dates.max().normalize()
+        if len(existing):
+            # Fill any gap so the dimension stays one contiguous run of days
+            start = min(start, pd.to_datetime(str(existing.min()), format='%Y%m%d'))
+            end = max(end, pd.to_datetime(str(existing.max()), format='%Y%m%d'))
+        days = pd.date_range(start=start, end=end, freq='D')
+        days = days[~pd.Index(days.year * 10000 + days.month * 100 + days.day).isin(existing)]
+        if days.empty:
+            self.logger.info(f"  → dim_time already covers {start.date()} to {end.date()}")
+            return
+        
+        time_dim = self._create_time_dimension(days)
+        started = time.perf_counter()
+        self.loader.load(self._t('dim_time'), time_dim, strategy=self.loader.strategy_for('dim_time'),
+                         disable_checks=False)
+        self._mark_changed('dim_time')
+        self._record_timing('dim_time', 'load_seconds', time.perf_counter() - started, rows=len(time_dim))
+        self.dim_keys.publish('dim_time', existing.append(pd.Index(time_dim['date_key'])))
+        self.logger.info(f"  → Added {len(time_dim)} days to dim_time ({start.date()} to {end.date()})")
+        print("Time dimension updated!")
+        
+    def _create_time_dimension(self, dates):
+        """Time dimension rows for the given days"""
         time_dim = pd.DataFrame({
-            'date_key': [d.strftime('%Y%m%d') for d in dates],
+            'date_key': dates.year * 10000 + dates.month * 100 + dates.day,
             'date': dates,
             'year': dates.year,
             'quarter': dates.quarter,
@@ -718,201 +1344,376 @@ class ETLPipeline:
         })
         return time_dim
     
-    def _create_facts(self, engine, silver_data):
-        """Create fact tables for star schema"""
-        
+    def _load_dag(self, engine, silver_data):
+        """One checkpointed task per gold table, depending on the tables its FKs reference"""
+        dag = TaskDAG(self.load_workers, retries=ETL_TASK_RETRIES, retry_delay=ETL_TASK_RETRY_DELAY,
+                      logger=self.logger)
+        loads = {table_name: (lambda load=load: load(engine, silver_data))
+                 for table_name, load in self._dimension_loaders().items()}
+        loads['dim_time'] = lambda: self._populate_time_dimension(
+            engine, [silver_data[name] for name in ('enrollments', 'attendance', 'payments', 'grades')])
+        for table_name, silver_name, load in [
+            ('fact_enrollment', 'enrollments', self._load_fact_enrollment),
+            ('fact_attendance', 'attendance', self._load_fact_attendance),
+            ('fact_payment', 'payments', self._load_fact_payment),
+            ('fact_grade', 'grades', self._load_fact_grade),
+        ]:
+            loads[table_name] = lambda load=load, silver_name=silver_name: load(engine, silver_data[silver_name])
+        for table_name, load in loads.items():
+            parents = [parent for _, parent in self.gold_foreign_keys.get(table_name, [])]
+            # A dimension's history is written by the same step
+            tables = [table_name] + ([GOLD_HISTORY_TABLES[table_name]] if table_name in GOLD_HISTORY_TABLES else [])
+            dag.add(table_name, lambda t=table_name, tables=tables, load=load: self._load_step(engine, t, tables, load),
+                    deps=parents)
+        # High-water marks are published with the data they describe
+        dag.add('watermarks', lambda: self._load_step(engine, 'watermarks', [], lambda: self._save_watermarks(engine)))
+        return dag
+    
+    def _create_fact_tables(self, engine):
+        """Create the fact table DDL for the shadow generation"""
         with engine.connect() as conn:
             # Fact_Enrollment
-            conn.execute(text("DROP TABLE IF EXISTS fact_enrollment"))
-            conn.execute(text("""
-                CREATE TABLE fact_enrollment (
-                    enrollment_id VARCHAR(20) PRIMARY KEY,
-                    student_id VARCHAR(20),
-                    course_code VARCHAR(20),
-                    date_key VARCHAR(8),
-                    semester_id INT,
-                    status VARCHAR(20),
-                    FOREIGN KEY (student_id) REFERENCES dim_student(student_id) ON DELETE CASCADE,
-                    FOREIGN KEY (course_code) REFERENCES dim_course(course_code) ON DELETE CASCADE,
-                    FOREIGN KEY (date_key) REFERENCES dim_time(date_key) ON DELETE CASCADE,
-                    FOREIGN KEY (semester_id) REFERENCES dim_semester(semester_id) ON DELETE CASCADE,
-                    INDEX idx_student (student_id),
-                    INDEX idx_course (course_code),
-                    INDEX idx_date (date_key),
-                    INDEX idx_semester (semester_id)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-            """))
+            self._create_gold_table(conn, 'fact_enrollment', """
+                enrollment_id VARCHAR(20) PRIMARY KEY,
+                student_key INT,
+                course_key INT,
+                date_key INT,
+                semester_key INT,
+                student_id VARCHAR(20),
+                course_code VARCHAR(20),
+                semester_id INT,
+                status VARCHAR(20)
+            """, indexes=[
+                ('idx_student', 'student_key'),
+                ('idx_course', 'course_key'),
+                ('idx_date', 'date_key'),
+                ('idx_semester', 'semester_key'),
+            ], foreign_keys=[
+                ('student_key', 'dim_student'),
+                ('course_key', 'dim_course'),
+                ('date_key', 'dim_time'),
+                ('semester_key', 'dim_semester'),
+            ])
             
             # Fact_Attendance
-            conn.execute(text("DROP TABLE IF EXISTS fact_attendance"))
-            conn.execute(text("""
-                CREATE TABLE fact_attendance (
-                    attendance_id INT AUTO_INCREMENT PRIMARY KEY,
-                    student_id VARCHAR(20),
-                    course_code VARCHAR(20),
-                    date_key VARCHAR(8),
-                    total_hours DECIMAL(10,2),
-                    days_present INT,
-                    FOREIGN KEY (student_id) REFERENCES dim_student(student_id) ON DELETE CASCADE,
-                    FOREIGN KEY (course_code) REFERENCES dim_course(course_code) ON DELETE CASCADE,
-                    FOREIGN KEY (date_key) REFERENCES dim_time(date_key) ON DELETE CASCADE,
-                    INDEX idx_student (student_id),
-                    INDEX idx_course (course_code),
-                    INDEX idx_date (date_key)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-            """))
+            self._create_gold_table(conn, 'fact_attendance', """
+                attendance_id INT AUTO_INCREMENT PRIMARY KEY,
+                student_key INT,
+                course_key INT,
+                date_key INT,
+                student_id VARCHAR(20),
+                course_code VARCHAR(20),
+                total_hours DECIMAL(10,2),
+                days_present INT,
+                UNIQUE KEY uq_attendance_grain (student_key, course_key, date_key)
+            """, indexes=[
+                ('idx_course', 'course_key'),
+                ('idx_date', 'date_key'),
+            ], foreign_keys=[
+                ('student_key', 'dim_student'),
+                ('course_key', 'dim_course'),
+                ('date_key', 'dim_time'),
+            ])
             
             # Fact_Payment
-            conn.execute(text("DROP TABLE IF EXISTS fact_payment"))
-            conn.execute(text("""
-                CREATE TABLE fact_payment (
-                    payment_id VARCHAR(20) PRIMARY KEY,
-                    student_id VARCHAR(20),
-                    date_key VARCHAR(8),
-                    semester_id INT,
-                    amount DECIMAL(15,2),
-                    payment_method VARCHAR(50),
-                    status VARCHAR(20),
-                    FOREIGN KEY (student_id) REFERENCES dim_student(student_id) ON DELETE CASCADE,
-                    FOREIGN KEY (date_key) REFERENCES dim_time(date_key) ON DELETE CASCADE,
-                    FOREIGN KEY (semester_id) REFERENCES dim_semester(semester_id) ON DELETE CASCADE,
-                    INDEX idx_student (student_id),
-                    INDEX idx_date (date_key),
-                    INDEX idx_semester (semester_id),
-                    INDEX idx_status (status)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-            """))
+            self._create_gold_table(conn, 'fact_payment', """
+                payment_id VARCHAR(20) PRIMARY KEY,
+                student_key INT,
+                date_key INT,
+                semester_key INT,
+                student_id VARCHAR(20),
+                semester_id INT,
+                amount DECIMAL(15,2),
+                payment_method VARCHAR(50),
+                status VARCHAR(20)
+            """, indexes=[
+                ('idx_student', 'student_key'),
+                ('idx_date', 'date_key'),
+                ('idx_semester', 'semester_key'),
+                ('idx_status', 'status'),
+            ], foreign_keys=[
+                ('student_key', 'dim_student'),
+                ('date_key', 'dim_time'),
+                ('semester_key', 'dim_semester'),
+            ])
             
             # Fact_Grade
-            conn.execute(text("DROP TABLE IF EXISTS fact_grade"))
-            conn.execute(text("""
-                CREATE TABLE fact_grade (
-                    grade_id VARCHAR(20) PRIMARY KEY,
-                    student_id VARCHAR(20),
-                    course_code VARCHAR(20),
-                    date_key VARCHAR(8),
-                    semester_id INT,
-                    coursework_score DECIMAL(5,2) NOT NULL,
-                    exam_score DECIMAL(5,2),
-                    grade DECIMAL(5,2) NOT NULL,
-                    letter_grade VARCHAR(5) NOT NULL,
-                    fcw BOOLEAN DEFAULT FALSE,
-                    exam_status VARCHAR(10),
-                    absence_reason VARCHAR(200),
-                    FOREIGN KEY (student_id) REFERENCES dim_student(student_id) ON DELETE CASCADE,
-                    FOREIGN KEY (course_code) REFERENCES dim_course(course_code) ON DELETE CASCADE,
-                    FOREIGN KEY (date_key) REFERENCES dim_time(date_key) ON DELETE CASCADE,
-                    FOREIGN KEY (semester_id) REFERENCES dim_semester(semester_id) ON DELETE CASCADE,
-                    INDEX idx_student (student_id),
-                    INDEX idx_course (course_code),
-                    INDEX idx_date (date_key),
-                    INDEX idx_semester (semester_id),
-                    INDEX idx_grade (grade)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-            """))
+            self._create_gold_table(conn, 'fact_grade', """
+                grade_id VARCHAR(20) PRIMARY KEY,
+                student_key INT,
+                course_key INT,
+                date_key INT,
+                semester_key INT,
+                student_id VARCHAR(20),
+                course_code VARCHAR(20),
+                semester_id INT,
+                coursework_score DECIMAL(5,2) NOT NULL,
+                exam_score DECIMAL(5,2),
+                grade DECIMAL(5,2) NOT NULL,
+                letter_grade VARCHAR(5) NOT NULL,
+                fcw BOOLEAN DEFAULT FALSE,
+                exam_status VARCHAR(10),
+                absence_reason VARCHAR(200)
+            """, indexes=[
+                ('idx_student', 'student_key'),
+                ('idx_course', 'course_key'),
+                ('idx_date', 'date_key'),
+                ('idx_semester', 'semester_key'),
+                ('idx_grade', 'grade'),
+            ], foreign_keys=[
+                ('student_key', 'dim_student'),
+                ('course_key', 'dim_course'),
+                ('date_key', 'dim_time'),
+                ('semester_key', 'dim_semester'),
+            ])
             conn.commit()
-        
-        # Fact_Enrollment
-        enrollments = silver_data['enrollments'].copy()
-        enrollments['date_key'] = pd.to_datetime(enrollments['enrollment_date'], errors='coerce').dt.strftime('%Y%m%d').fillna('')
+    
+    def _create_derived_tables(self, engine):
+        """Create the summary and feature table DDL for the shadow generation"""
+        with engine.connect() as conn:
+            for table_name, spec in AGGREGATE_TABLES.items():
+                self._create_gold_table(conn, table_name, spec['columns'], indexes=spec['indexes'])
+            self._create_gold_table(conn, GOLD_FEATURE_TABLE, feature_table_columns())
+            conn.commit()
+    
+    def _build_aggregates(self, engine):
+        """Rebuild the summary tables from the validated facts (the last gold stage)"""
+        self.logger.info("Building gold summary tables...")
+        for table_name, (rows, seconds) in refresh_aggregates(engine, self._t, logger=self.logger).items():
+            self._record_timing(table_name, 'load_seconds', seconds, rows=rows)
+    
+    def _build_feature_store(self, engine):
+        """Rebuild the per-student ML features from the validated gold tables"""
+        self.logger.info(f"Building {GOLD_FEATURE_TABLE}...")
+        started = time.perf_counter()
+        category_codes = load_category_codes()
+        features = build_features(load_inputs(engine, self._t), category_codes=category_codes)
+        # Codes only ever grow, so saving before publish cannot shift the codes a model was trained on
+        save_category_codes(category_codes)
+        features['feature_version'] = self.run_id
+        features['built_at'] = datetime.now().replace(microsecond=0)
+        with engine.connect() as conn:
+            conn.execute(text(f"DELETE FROM {self._t(GOLD_FEATURE_TABLE)}"))
+            conn.commit()
+        self.loader.load(self._t(GOLD_FEATURE_TABLE), features,
+                         strategy=self.loader.strategy_for(GOLD_FEATURE_TABLE), disable_checks=False)
+        write_snapshot(features, self.run_id, logger=self.logger)
+        self._record_timing(GOLD_FEATURE_TABLE, 'load_seconds', time.perf_counter() - started, rows=len(features))
+        self.logger.info(f"  → Built features for {len(features)} students (version {self.run_id})")
+    
+    def _check_referential_integrity(self, engine):
+        """Drop rows whose FK values have no dimension row, one set-based pass per FK"""
+        self.logger.info("Checking referential integrity...")
+        removed = 0
+        with engine.connect() as conn:
+            for table_name, foreign_keys in self.gold_foreign_keys.items():
+                for col, parent in foreign_keys:
+                    orphans = conn.execute(text(f"""
+                        DELETE child FROM {self._t(table_name)} child
+                        LEFT JOIN {self._t(parent)} parent ON child.{col} = parent.{col}
+                        WHERE child.{col} IS NOT NULL AND parent.{col} IS NULL
+                    """)).rowcount
+                    if orphans:
+                        removed += orphans
+                        self._mark_changed(table_name)
+                        self.logger.warning(f"  → Removed {orphans} {table_name} rows with no {parent}.{col}")
+            conn.commit()
+        self.logger.info(f"  → Referential integrity checked ({removed} orphan rows removed)")
+    
+    def _build_deferred_indexes(self, engine):
+        """Add the deferred indexes and FKs to each loaded table in one ALTER TABLE pass"""
+        if not self.deferred_ddl:
+            return
+        self.logger.info("Building deferred indexes and foreign keys...")
+        with engine.connect() as conn:
+            # FKs were just validated set-based, so skip InnoDB's row-by-row recheck
+            conn.execute(text("SET FOREIGN_KEY_CHECKS=0"))
+            for table_name in GOLD_TABLES:
+                deferred = self.deferred_ddl.get(table_name)
+                # Tables indexed before a resumed run failed already have theirs
+                if not deferred or self.manifest.is_complete(f"index:{table_name}"):
+                    continue
+                started = time.perf_counter()
+                clauses = [f"ADD {clause}" for clause in deferred]
+                conn.execute(text(f"ALTER TABLE {self._t(table_name)} " + ', '.join(clauses)))
+                self._record_timing(table_name, 'index_seconds', time.perf_counter() - started)
+                self.manifest.complete(f"index:{table_name}")
+            conn.execute(text("SET FOREIGN_KEY_CHECKS=1"))
+            conn.commit()
+    
+    def _mark_changed(self, table_name):
+        """Note that this run wrote to a gold table"""
+        with self._timing_lock:
+            if self.changed_tables is not None:
+                self.changed_tables.add(table_name)
+    
+    def _record_timing(self, table_name, phase, seconds, rows=0):
+        """Accumulate per-table load timings for this run's report"""
+        with self._timing_lock:
+            timing = self.load_timings.setdefault(table_name, {'rows': 0, 'load_seconds': 0.0, 'index_seconds': 0.0})
+            timing[phase] += seconds
+            timing['rows'] += rows
+    
+    def _ensure_load_stats_table(self, conn):
+        """Create the per-table load timing history table if missing"""
+        conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {ETL_LOAD_STATS_TABLE} (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                run_at DATETIME,
+                table_name VARCHAR(100),
+                load_type VARCHAR(20),
+                index_mode VARCHAR(20),
+                rows_loaded INT,
+                load_seconds DECIMAL(12,3),
+                index_seconds DECIMAL(12,3),
+                INDEX idx_table_mode (table_name, load_type, index_mode, run_at)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """))
+    
+    def _report_load_times(self, engine):
+        """Log per-table load times against the last run that used the other index mode"""
+        if not self.load_timings:
+            return
+        load_type = 'full' if self.full_reload else 'incremental'
+        index_mode = 'deferred' if self.defer_indexes else 'inline'
+        other_mode = 'inline' if self.defer_indexes else 'deferred'
+        now = datetime.now()
+        self.logger.info(f"Gold load times ({index_mode} indexes, {load_type} load):")
+        with engine.connect() as conn:
+            self._ensure_load_stats_table(conn)
+            for table_name in GOLD_TABLES:
+                timing = self.load_timings.get(table_name)
+                if not timing:
+                    continue
+                total = timing['load_seconds'] + timing['index_seconds']
+                line = (f"  → {table_name}: {timing['rows']} rows in {total:.2f}s "
+                        f"(load {timing['load_seconds']:.2f}s + index {timing['index_seconds']:.2f}s)")
+                # Compare time per row, since the two runs may have loaded different volumes
+                baseline = conn.execute(text(f"""
+                    SELECT rows_loaded, load_seconds + index_seconds FROM {ETL_LOAD_STATS_TABLE}
+                    WHERE table_name = :table_name AND load_type = :load_type AND index_mode = :other_mode
+                    ORDER BY run_at DESC LIMIT 1
+                """), {'table_name': table_name, 'load_type': load_type, 'other_mode': other_mode}).fetchone()
+                if baseline and baseline[0] and timing['rows'] and float(baseline[1]) > 0:
+                    deferred, inline = (total, float(baseline[1])) if self.defer_indexes else (float(baseline[1]), total)
+                    deferred_rows, inline_rows = ((timing['rows'], baseline[0]) if self.defer_indexes
+                                                  else (baseline[0], timing['rows']))
+                    reduction = 1 - (deferred / deferred_rows) / (inline / inline_rows)
+                    line += f", deferred vs inline: {-reduction:+.0%} time per row"
+                self.logger.info(line)
+                conn.execute(text(f"""
+                    INSERT INTO {ETL_LOAD_STATS_TABLE}
+                        (run_at, table_name, load_type, index_mode, rows_loaded, load_seconds, index_seconds)
+                    VALUES (:now, :table_name, :load_type, :index_mode, :rows, :load_seconds, :index_seconds)
+                """), {'now': now, 'table_name': table_name, 'load_type': load_type, 'index_mode': index_mode,
+                       'rows': timing['rows'], 'load_seconds': timing['load_seconds'],
+                       'index_seconds': timing['index_seconds']})
+            conn.commit()
+    
+    def _lookup_keys(self, fact, course=True, semester=True):
+        """Add surrogate keys to a fact frame; IDs with no key get <NA>"""
+        fact['student_key'] = self.keys.lookup('student', fact['student_id'])
+        if course:
+            fact['course_key'] = self.keys.lookup('course', fact['course_code'])
+        if semester:
+            fact['semester_key'] = self.keys.lookup('semester', fact['semester_id'])
+        return fact
+    
+    def _attach_keys(self, table_name, fact, course=True, semester=True):
+        """Add surrogate keys to a fact frame, quarantining rows that reference no dimension row"""
+        fact, rejected = self.dim_keys.semi_join(self._lookup_keys(fact, course, semester))
+        if not rejected.empty:
+            self._quarantine(table_name, rejected)
+        return fact
+    
+    def _quarantine(self, table_name, rejected):
+        """Write rejected fact rows to the quarantine lake"""
+        with self._quarantine_lock:
+            part = self._quarantine_parts.get(table_name, 0)
+            self._quarantine_parts[table_name] = part + 1
+        self.quarantine_lake.write(table_name, rejected, run_id=self.run_id, part=part)
+        reasons = ', '.join(f"{reason}: {count}" for reason, count in rejected[REJECT_REASON_COLUMN].value_counts().items())
+        self.logger.warning(f"  → Quarantined {len(rejected)} {table_name} rows ({reasons})")
+    
+    def _load_fact_enrollment(self, engine, enrollments):
+        """Load silver enrollments into fact_enrollment"""
+        enrollments = enrollments.copy()
+        enrollments['date_key'] = date_key(enrollments['enrollment_date'])
         enrollments['semester_id'] = enrollments['semester'].map({
             'Fall 2023': 1, 'Spring 2024': 2, 'Fall 2024': 3, 'Spring 2025': 4
-        }).fillna(1)  # Default to 1 if unmapped
+        }).fillna(1).astype(int)  # Default to 1 if unmapped
         
-        # Filter out rows with invalid date_key (must exist in dim_time)
         fact_enrollment = enrollments[['enrollment_id', 'student_id', 'course_code', 
                                       'date_key', 'semester_id', 'status']].copy()
-        fact_enrollment = fact_enrollment[fact_enrollment['date_key'] != '']  # Remove invalid dates
         
-        # Filter to only include students that exist in dim_student
-        if not fact_enrollment.empty:
-            with engine.connect() as conn:
-                valid_students = pd.read_sql_query("SELECT student_id FROM dim_student", conn)
-            valid_student_ids = set(valid_students['student_id'].tolist())
-            fact_enrollment = fact_enrollment[fact_enrollment['student_id'].isin(valid_student_ids)]
+        # Resolve surrogate keys; rows with invalid dates or unknown students/courses are quarantined
+        fact_enrollment = self._attach_keys('fact_enrollment', fact_enrollment)
         
         if not fact_enrollment.empty:
-            fact_enrollment.to_sql('fact_enrollment', engine, if_exists='append', index=False, method='multi', chunksize=50)
+            self._write_fact(engine, 'fact_enrollment', fact_enrollment)
             self.logger.info(f"  → Loaded {len(fact_enrollment)} enrollments into fact_enrollment")
         else:
             self.logger.warning("  → No enrollment data to load")
+    
+    def _load_fact_attendance(self, engine, attendance):
+        """Aggregate silver attendance by student/course/day into fact_attendance"""
+        attendance = attendance.copy()
+        attendance['date_key'] = date_key(attendance['attendance_date'])
         
-        # Fact_Attendance
-        attendance = silver_data['attendance'].copy()
-        attendance['date_key'] = pd.to_datetime(attendance['attendance_date'], errors='coerce').dt.strftime('%Y%m%d').fillna('')
-        
-        # Filter out rows with invalid dates
-        attendance = attendance[attendance['date_key'] != '']
-        
-        # Filter to only include students that exist in dim_student
-        if not attendance.empty:
-            # Get list of valid student_ids from dim_student
-            with engine.connect() as conn:
-                valid_students = pd.read_sql_query("SELECT student_id FROM dim_student", conn)
-            valid_student_ids = set(valid_students['student_id'].tolist())
-            attendance = attendance[attendance['student_id'].isin(valid_student_ids)]
+        # Quarantine individual attendance rows with invalid dates or unknown students/courses
+        attendance = self._attach_keys('fact_attendance', attendance, semester=False)
         
         if not attendance.empty:
             # Aggregate attendance by student, course, and date
-            # Check which columns exist
-            agg_dict = {'hours_attended': 'sum'}
-            if 'Status' in attendance.columns:
-                agg_dict['Status'] = lambda x: (x == 'Present').sum() if len(x) > 0 and 'Present' in x.values else 0
-            elif 'status' in attendance.columns:
-                agg_dict['status'] = lambda x: (x == 'Present').sum() if len(x) > 0 and 'Present' in x.values else 0
-            
-            attendance_agg = attendance.groupby(['student_id', 'course_code', 'date_key']).agg(agg_dict).reset_index()
-            
-            # Rename columns appropriately
-            if 'Status' in attendance_agg.columns or 'status' in attendance_agg.columns:
-                status_col = 'Status' if 'Status' in attendance_agg.columns else 'status'
-                attendance_agg.columns = ['student_id', 'course_code', 'date_key', 
-                                          'total_hours', 'days_present']
-            else:
-                # If no status column, calculate days_present from hours_attended
-                attendance_agg['days_present'] = (attendance_agg['hours_attended'] > 0).astype(int)
-                attendance_agg.columns = ['student_id', 'course_code', 'date_key', 
-                                          'total_hours', 'days_present']
+            status_col = next((c for c in ('Status', 'status') if c in attendance.columns), None)
+            attendance_agg = aggregate_attendance(attendance, status_col)
             
-            fact_attendance = attendance_agg.copy()
-            fact_attendance.to_sql('fact_attendance', engine, if_exists='append', index=False, method='multi', chunksize=50)
+            fact_attendance = self._lookup_keys(attendance_agg, semester=False)
+            if not self.full_reload and self.extract_modes.get('attendance_db1') != 'appended':
+                # Full or changed-row extracts hold whole grains: they replace the aggregates
+                self._replace_grains('fact_attendance', fact_attendance, ['student_key', 'course_key', 'date_key'])
+            # New attendance rows add to the hours/days already aggregated for the same grain
+            self._write_fact(engine, 'fact_attendance', fact_attendance,
+                             additive_cols=['total_hours', 'days_present'])
             self.logger.info(f"  → Loaded {len(fact_attendance)} attendance records into fact_attendance")
         else:
             self.logger.warning("  → No attendance data to load")
-        
-        # Fact_Payment
-        payments = silver_data['payments'].copy()
-        payments['date_key'] = pd.to_datetime(payments['payment_date'], errors='coerce').dt.strftime('%Y%m%d').fillna('')
+    
+    def _load_fact_payment(self, engine, payments):
+        """Load silver payments into fact_payment"""
+        payments = payments.copy()
+        if payments.empty:
+            # Incremental runs with no new fees still go through the same path
+            payments = pd.DataFrame(columns=['payment_id', 'student_id', 'payment_date', 'semester',
+                                             'amount', 'payment_method', 'status'])
+        payments['date_key'] = date_key(payments['payment_date'])
         payments['semester_id'] = payments['semester'].map({
             'Fall 2023': 1, 'Spring 2024': 2, 'Fall 2024': 3, 'Spring 2025': 4
-        }).fillna(1)  # Default to 1 if unmapped
+        }).fillna(1).astype(int)  # Default to 1 if unmapped
         
-        # Filter out rows with invalid dates
         fact_payment = payments[['payment_id', 'student_id', 'date_key', 'semester_id',
                                 'amount', 'payment_method', 'status']].copy()
-        fact_payment = fact_payment[fact_payment['date_key'] != '']  # Remove invalid dates
         
-        # Filter to only include students that exist in dim_student
-        if not fact_payment.empty:
-            with engine.connect() as conn:
-                valid_students = pd.read_sql_query("SELECT student_id FROM dim_student", conn)
-            valid_student_ids = set(valid_students['student_id'].tolist())
-            fact_payment = fact_payment[fact_payment['student_id'].isin(valid_student_ids)]
+        # Resolve surrogate keys; rows with invalid dates or unknown students are quarantined
+        fact_payment = self._attach_keys('fact_payment', fact_payment, course=False)
         
         if not fact_payment.empty:
-            fact_payment.to_sql('fact_payment', engine, if_exists='append', index=False, method='multi', chunksize=50)
+            self._write_fact(engine, 'fact_payment', fact_payment)
             self.logger.info(f"  → Loaded {len(fact_payment)} payments into fact_payment")
         else:
             self.logger.warning("  → No payment data to load")
-        
-        # Fact_Grade
-        grades = silver_data['grades'].copy()
-        grades['date_key'] = pd.to_datetime(grades['exam_date'], errors='coerce').dt.strftime('%Y%m%d').fillna('')
+    
+    def _load_fact_grade(self, engine, grades):
+        """Load silver grades into fact_grade"""
+        grades = grades.copy()
+        if grades.empty:
+            grades = pd.DataFrame(columns=['grade_id', 'student_id', 'course_code', 'exam_date', 'semester',
+                                           'grade', 'letter_grade'])
+        grades['date_key'] = date_key(grades['exam_date'])
         grades['semester_id'] = grades['semester'].map({
             'Fall 2023': 1, 'Spring 2024': 2, 'Fall 2024': 3, 'Spring 2025': 4
-        }).fillna(1)  # Default to 1 if unmapped
+        }).fillna(1).astype(int)  # Default to 1 if unmapped
         
-        # Filter out rows with invalid dates
         # Ensure all required columns exist
         if 'coursework_score' not in grades.columns:
             grades['coursework_score'] = 0.0
@@ -930,21 +1731,147 @@ class ETLPipeline:
                      'letter_grade', 'fcw', 'exam_status', 'absence_reason']
         
         fact_grade = grades[grade_cols].copy()
-        fact_grade = fact_grade[fact_grade['date_key'] != '']  # Remove invalid dates
         
-        # Filter to only include students that exist in dim_student
-        if not fact_grade.empty:
-            with engine.connect() as conn:
-                valid_students = pd.read_sql_query("SELECT student_id FROM dim_student", conn)
-            valid_student_ids = set(valid_students['student_id'].tolist())
-            fact_grade = fact_grade[fact_grade['student_id'].isin(valid_student_ids)]
+        # Resolve surrogate keys; rows with invalid dates or unknown students/courses are quarantined
+        fact_grade = self._attach_keys('fact_grade', fact_grade)
         
         if not fact_grade.empty:
-            fact_grade.to_sql('fact_grade', engine, if_exists='append', index=False, method='multi', chunksize=50)
+            self._write_fact(engine, 'fact_grade', fact_grade)
             self.logger.info(f"  → Loaded {len(fact_grade)} grades into fact_grade")
         else:
             self.logger.warning("  → No grade data to load")
     
+    def run_streaming(self):
+        """Run extract -> transform -> load chunk by chunk with bounded memory"""
+        self.logger.info("=" * 60)
+        self.logger.info("STREAMING ETL - Bronze -> Silver -> Gold per chunk")
+        self.logger.info("=" * 60)
+        print("Running streaming ETL...")
+        self._prepare_watermarks()
+        timestamp = self.run_id
+        engine1 = create_engine(DB1_CONN_STRING)
+        engine2 = create_engine(DB2_CONN_STRING)
+        
+        # Reference tables are small and needed whole to resolve IDs in every chunk
+        reference = {}
+        for engine, source_table, bronze_name in [
+            (engine1, 'students', 'students_db1'),
+            (engine1, 'courses', 'courses_db1'),
+            (engine1, 'faculties', 'faculties_db1'),
+            (engine1, 'departments', 'departments_db1'),
+            (engine1, 'programs', 'programs_db1'),
+            (engine2, 'employees', 'employees_db2'),
+        ]:
+            reference[bronze_name] = self._extract_table(engine, source_table, bronze_name)
+            if not reference[bronze_name].empty:
+                self.manifest.add_file('bronze', bronze_name,
+                                       self.bronze_lake.write(bronze_name, reference[bronze_name], run_id=timestamp))
+            self.logger.info(f"  → Extracted {len(reference[bronze_name])} {source_table}")
+        students = reference['students_db1']
+        courses = reference['courses_db1']
+        lookups = build_id_lookups(students, courses)
+        
+        self.create_data_warehouse()
+        dw_engine = create_engine(DATA_WAREHOUSE_CONN_STRING)
+        self.loader = BulkLoader(dw_engine, logger=self.logger)
+        self.swap = WarehouseSwap(dw_engine, logger=self.logger)
+        self.keys = SurrogateKeyMap(dw_engine, logger=self.logger)
+        self.dim_keys = DimensionKeys(dw_engine, self._t, logger=self.logger)
+        self._prepare_shadow_tables(dw_engine)
+        self._create_dimensions(dw_engine, {
+            'students': self._transform_students(students, lookups),
+            'courses': self._transform_courses(courses),
+            'faculties_db1': reference['faculties_db1'],
+            'departments_db1': reference['departments_db1'],
+            'programs_db1': reference['programs_db1']
+        })
+        
+        # Fact sources: (engine, source table, bronze name, CSV fallback, transform, loader)
+        empty = pd.DataFrame()
+        fact_sources = [
+            (engine1, 'enrollments', 'enrollments_db1', None,
+             lambda c: self._transform_enrollments(c, lookups), self._load_fact_enrollment),
+            (engine1, 'attendance', 'attendance_db1', None,
+             lambda c: self._transform_attendance(c, lookups), self._load_fact_attendance),
+            (engine1, 'student_fees', 'student_fees_db1', CSV1_PATH,
+             lambda c: self._transform_payments(c, empty, lookups), self._load_fact_payment),
+            (engine1, 'grades', 'grades_db1', CSV2_PATH,
+             lambda c: self._transform_grades(c, empty, lookups), self._load_fact_grade),
+            (engine2, 'payroll', 'payroll_db2', None, None, None),
+        ]
+        csv_transforms = {
+            'student_fees_db1': lambda c: self._transform_payments(empty, c, lookups),
+            'grades_db1': lambda c: self._transform_grades(empty, c, lookups),
+        }
+        peak_chunk_bytes = 0
+        for engine, source_table, bronze_name, csv_path, transform, loader in fact_sources:
+            chunks = self._stream_table(engine, source_table, bronze_name)
+            streamed_rows = 0
+            for part, chunk in enumerate(chunks):
+                streamed_rows += len(chunk)
+                peak_chunk_bytes = max(peak_chunk_bytes, self._stream_chunk(
+                    dw_engine, chunk, bronze_name, timestamp, part, transform, loader))
+            
+            # CSVs have no watermark column, so they only back up empty tables on full reloads
+            if streamed_rows == 0 and csv_path is not None and self.full_reload and Path(csv_path).exists():
+                self.logger.info(f"  → {source_table} is empty, streaming {Path(csv_path).name} instead")
+                csv_name = bronze_name.replace('_db1', '_csv')
+                for part, chunk in enumerate(pd.read_csv(csv_path, chunksize=ETL_MIN_CHUNK_ROWS * 10)):
+                    peak_chunk_bytes = max(peak_chunk_bytes, self._stream_chunk(
+                        dw_engine, chunk, csv_name, timestamp, part, csv_transforms[bronze_name], loader))
+        
+        engine1.dispose()
+        engine2.dispose()
+        report_unresolved(lookups, self.logger)
+        self._save_watermarks(dw_engine)
+        self._publish(dw_engine)
+        dw_engine.dispose()
+        self.logger.info(f"Largest in-flight chunk: {peak_chunk_bytes / (1024 * 1024):.1f} MB "
+                         f"(budget {self.memory_budget_mb} MB)")
+        self.logger.info("=" * 60)
+        self.logger.info("STREAMING ETL COMPLETED SUCCESSFULLY")
+        self.logger.info("=" * 60)
+        print("Streaming ETL complete!")
+    
+    def _stream_chunk(self, dw_engine, chunk, bronze_name, timestamp, part, transform, loader):
+        """Persist one chunk to bronze/silver and load it; returns its in-memory size"""
+        self.manifest.add_file('bronze', bronze_name, self.bronze_lake.write(bronze_name, chunk, run_id=timestamp, part=part))
+        chunk_bytes = chunk.memory_usage(deep=True, index=False).sum()
+        if transform is None:
+            return chunk_bytes
+        silver_chunk = enforce_silver_schema(transform(chunk))
+        if silver_chunk.empty:
+            return chunk_bytes
+        silver_name = bronze_name.rsplit('_', 1)[0]
+        self.manifest.add_file('silver', silver_name,
+                               self.silver_lake.write(silver_name, silver_chunk, run_id=timestamp, part=part))
+        self._populate_time_dimension(dw_engine, [silver_chunk])
+        loader(dw_engine, silver_chunk)
+        return chunk_bytes + silver_chunk.memory_usage(deep=True, index=False).sum()
+    
+    def maintain_lake(self):
+        """Expire old bronze/silver/quarantine partitions and compact small part files"""
+        self.logger.info("Maintaining bronze/silver data lake...")
+        protected = RunManifest.unfinished_files()
+        for lake in (self.bronze_lake, self.silver_lake, self.quarantine_lake):
+            expired, compacted = lake.maintain(protected)
+            self.logger.info(f"  → {lake.root.name}: {expired} partitions expired, {compacted} files compacted away")
+    
+    def rollback(self):
+        """Swap the previous gold generation back live"""
+        engine = create_engine(DATA_WAREHOUSE_CONN_STRING)
+        try:
+            restored = WarehouseSwap(engine, logger=self.logger).rollback()
+        finally:
+            engine.dispose()
+        if restored:
+            # Keep the columnar copy on the same generation as the warehouse
+            self.gold_lake.rollback()
+            bump_load_version(f"rollback_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        print("Rolled back to the previous gold generation" if restored
+              else "No previous gold generation to roll back to")
+        return restored
+    
     def run(self):
         """Run the complete ETL pipeline"""
         start_time = datetime.now()
@@ -954,11 +1881,23 @@ class ETLPipeline:
         self.logger.info("=" * 60)
         print("Starting ETL Pipeline...")
         print(f"Log file: {self.log_file}")
+        if self.manifest.status == 'completed':
+            self.logger.info(f"Run {self.run_id} already completed - nothing to resume")
+            print(f"Run {self.run_id} already completed")
+            return
+        self.logger.info(f"Run ID: {self.run_id}")
         
         try:
-            bronze_data = self.extract()
-            silver_data = self.transform(bronze_data)
-            self.load_to_warehouse(silver_data)
+            if self.streaming:
+                self.run_streaming()
+            elif self.manifest.is_complete('transform'):
+                self.load_to_warehouse(self._reload_silver())
+            else:
+                bronze_data = self._reload_bronze() if self.manifest.is_complete('extract') else self.extract()
+                silver_data = self.transform(bronze_data)
+                self.load_to_warehouse(silver_data)
+            self.manifest.finish('completed')
+            self.maintain_lake()
             
             end_time = datetime.now()
             duration = end_time - start_time
@@ -970,10 +1909,43 @@ class ETLPipeline:
             end_time = datetime.now()
             duration = end_time - start_time
             self.logger.error(f"ETL Pipeline failed after {duration}: {e}", exc_info=True)
+            self.manifest.finish('failed', error=str(e))
             print(f"ETL Pipeline failed: {e}")
             print(f"Check log file for details: {self.log_file}")
+            if not self.streaming:
+                print(f"Resume from the failed step with: python etl_pipeline.py --resume {self.run_id}")
             raise
 
 if __name__ == "__main__":
-    pipeline = ETLPipeline()
-    pipeline.run()
+    parser = argparse.ArgumentParser(description="Run the UCU ETL pipeline")
+    parser.add_argument('--full-reload', action='store_true',
+                        help="Ignore watermarks and rebuild the warehouse from all source rows "
+                             "(needed to pick up in-place updates to ETL_APPEND_ONLY_TABLES)")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Process source tables in bounded-memory chunks end to end")
+    parser.add_argument('--memory-budget-mb', type=int, default=ETL_MEMORY_BUDGET_MB,
+                        help="Memory budget for one in-flight chunk in streaming mode")
+    parser.add_argument('--workers', type=int, default=ETL_EXTRACT_WORKERS,
+                        help="Thread pool size for parallel source extraction")
+    parser.add_argument('--defer-indexes', action='store_true', default=ETL_DEFER_INDEXES,
+                        help="Create bare gold tables and build indexes/FKs after the bulk load")
+    parser.add_argument('--rollback', action='store_true',
+                        help="Restore the previous gold generation instead of running a load")
+    parser.add_argument('--maintain-lake', action='store_true',
+                        help="Only run bronze/silver retention and compaction")
+    parser.add_argument('--load-workers', type=int, default=ETL_LOAD_WORKERS,
+                        help="Gold table loads to run concurrently once their dependencies are loaded")
+    parser.add_argument('--resume', metavar='RUN_ID',
+                        help="Resume a failed run from its checkpoints instead of starting over")
+    args = parser.parse_args()
+    
+    pipeline = ETLPipeline(full_reload=args.full_reload, streaming=args.streaming,
+                           memory_budget_mb=args.memory_budget_mb, extract_workers=args.workers,
+                           defer_indexes=args.defer_indexes, resume_run_id=args.resume,
+                           load_workers=args.load_workers)
+    if args.rollback:
+        pipeline.rollback()
+    elif args.maintain_lake:
+        pipeline.maintain_lake()
+    else:
+        pipeline.run()
@@ -0,0 +1,227 @@
+"""
+Per-student feature store for the ML models
+The ETL builds one row of model features per student from the gold tables with
+vectorized groupbys; training scans the table and predictions read one row by key
+"""
+import json
+import logging
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from config import GOLD_PATH, GOLD_FEATURE_TABLE, FEATURE_SNAPSHOTS_KEPT
+
+FEATURE_SNAPSHOT_PATH = GOLD_PATH / GOLD_FEATURE_TABLE
+# Category -> integer code of every categorical feature, kept across builds
+CATEGORY_CODES_FILE = FEATURE_SNAPSHOT_PATH / "category_codes.json"
+
+# Label-encoded with codes that never change once assigned: the first build numbers the
+# sorted distinct values (like sklearn's LabelEncoder), later values get the next free codes
+CATEGORICAL_FEATURES = ['gender', 'nationality', 'high_school', 'high_school_district']
+
+# Model inputs, in the order the models are trained on
+FEATURE_COLUMNS = CATEGORICAL_FEATURES + [
+    'admission_year', 'years_at_university', 'program_id', 'year_of_study',
+    # Attendance
+    'total_attendance_hours', 'total_days_present', 'courses_attended', 'avg_hours_per_course',
+    'total_attendance_records', 'attendance_rate',
+    # Payments
+    'total_paid', 'total_pending', 'total_required', 'payment_count', 'avg_payment',
+    'payment_completion_rate', 'has_significant_balance',
+    # Enrollments
+    'total_enrollments', 'semesters_enrolled',
+    # Grades
+    'min_grade', 'max_grade', 'grade_stddev', 'num_grades', 'completed_exams', 'missed_exams',
+    'failed_exams', 'failed_coursework', 'tuition_related_missed', 'family_related_missed',
+    'medical_related_missed', 'missed_exam_rate', 'avg_coursework_score', 'avg_exam_score',
+    # High school of the student
+    'school_avg_grade', 'school_student_count', 'school_avg_payment', 'school_pending_rate',
+]
+TARGET_COLUMN = 'avg_grade'
+
+# Pending fees above this count as a significant balance
+SIGNIFICANT_BALANCE = 500000
+
+# Gold table -> columns the features are built from
+FEATURE_INPUTS = {
+    'dim_student': ['student_id', 'gender', 'nationality', 'high_school', 'high_school_district',
+                    'admission_date', 'program_id', 'year_of_study'],
+    'fact_attendance': ['student_id', 'course_code', 'total_hours', 'days_present'],
+    'fact_payment': ['student_id', 'amount', 'status'],
+    'fact_enrollment': ['student_id', 'course_code', 'semester_id'],
+    'fact_grade': ['student_id', 'grade_id', 'grade', 'exam_status', 'absence_reason',
+                   'coursework_score', 'exam_score'],
+}
+
+
+def feature_table_columns():
+    """DDL columns of the feature table"""
+    columns = ["student_id VARCHAR(20) PRIMARY KEY"]
+    columns += [f"{name} DOUBLE" for name in FEATURE_COLUMNS + [TARGET_COLUMN]]
+    columns += ["feature_version VARCHAR(20)", "built_at DATETIME"]
+    return ",\n                ".join(columns)
+
+
+def load_inputs(engine, table_for=lambda table_name: table_name):
+    """One scan of each gold table the features need"""
+    inputs = {}
+    with engine.connect() as conn:
+        for table_name, columns in FEATURE_INPUTS.items():
+            result = conn.execute(text(f"SELECT {', '.join(columns)} FROM {table_for(table_name)}"))
+            inputs[table_name] = pd.DataFrame(result.fetchall(), columns=columns)
+    return inputs
+
+
+def _numeric(frame, columns):
+    for name in columns:
+        frame[name] = pd.to_numeric(frame[name], errors='coerce')
+    return frame
+
+
+def _reason_count(reasons, *words):
+    return reasons.str.contains('|'.join(words), case=False, na=False).astype(int)
+
+
+def load_category_codes(path=CATEGORY_CODES_FILE):
+    """Persisted category codes per categorical feature ({} before the first build)"""
+    return json.loads(path.read_text(encoding='utf-8')) if path.exists() else {}
+
+
+def save_category_codes(codes, path=CATEGORY_CODES_FILE):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(json.dumps(codes, indent=2, sort_keys=True), encoding='utf-8')
+    tmp_path.replace(path)
+
+
+def encode_categories(values, codes):
+    """Integer codes of values; values not in codes are appended to it (sorted) with new codes"""
+    values = pd.Series(values).astype(str)
+    for value in sorted(set(values.unique()) - set(codes)):
+        codes[value] = len(codes)
+    return values.map(codes).to_numpy()
+
+
+def build_features(inputs, today=None, category_codes=None):
+    """Feature rows (student_id, FEATURE_COLUMNS, avg_grade) from the load_inputs frames;
+    category_codes (see load_category_codes) is extended with any new category values"""
+    today = today or datetime.now()
+    category_codes = {} if category_codes is None else category_codes
+    students = inputs['dim_student'].drop_duplicates('student_id').copy()
+    attendance = _numeric(inputs['fact_attendance'].copy(), ['total_hours', 'days_present'])
+    payments = _numeric(inputs['fact_payment'].copy(), ['amount'])
+    enrollments = inputs['fact_enrollment']
+    grades = _numeric(inputs['fact_grade'].copy(), ['grade', 'coursework_score', 'exam_score'])
+
+    features = pd.DataFrame({'student_id': students['student_id'].values})
+    for name in CATEGORICAL_FEATURES:
+        features[name] = encode_categories(students[name].values, category_codes.setdefault(name, {}))
+    admission_year = pd.to_datetime(students['admission_date'], errors='coerce').dt.year
+    features['admission_year'] = admission_year.values
+    features['years_at_university'] = (today.year - admission_year).values
+    features['program_id'] = pd.to_numeric(students['program_id'], errors='coerce').values
+    features['year_of_study'] = pd.to_numeric(students['year_of_study'], errors='coerce').values
+
+    attended = attendance.groupby('student_id').agg(
+        total_attendance_hours=('total_hours', 'sum'),
+        total_days_present=('days_present', 'sum'),
+        courses_attended=('course_code', 'nunique'),
+        avg_hours_per_course=('total_hours', 'mean'),
+        total_attendance_records=('student_id', 'size'),
+    )
+    attended['attendance_rate'] = attended['total_days_present'] / attended['total_attendance_records'] * 100
+
+    completed_payment = payments['status'].eq('Completed')
+    payment_rows = payments.assign(
+        paid=payments['amount'].where(completed_payment, 0.0),
+        pending=payments['amount'].where(payments['status'].eq('Pending'), 0.0),
+        completed=completed_payment.astype(int),
+    )
+    paid = payment_rows.groupby('student_id').agg(
+        total_paid=('paid', 'sum'),
+        total_pending=('pending', 'sum'),
+        total_required=('amount', 'sum'),
+        payment_count=('completed', 'sum'),
+        avg_payment=('paid', 'mean'),
+    )
+    paid['payment_completion_rate'] = (paid['total_paid'] / paid['total_required'] * 100).where(
+        paid['total_required'] > 0, 0.0)
+    paid['has_significant_balance'] = (paid['total_pending'] > SIGNIFICANT_BALANCE).astype(int)
+
+    enrolled = enrollments.groupby('student_id').agg(
+        total_enrollments=('course_code', 'nunique'),
+        semesters_enrolled=('semester_id', 'nunique'),
+    )
+
+    status = grades['exam_status']
+    reasons = grades['absence_reason'].astype(str)
+    grade_rows = grades.assign(
+        completed_grade=grades['grade'].where(status.eq('Completed')),
+        completed=status.eq('Completed').astype(int),
+        mex=status.eq('MEX').astype(int),
+        fex=status.eq('FEX').astype(int),
+        fcw=status.eq('FCW').astype(int),
+        tuition=_reason_count(reasons, 'Tuition', 'Financial'),
+        family=_reason_count(reasons, 'Family', 'Death', 'Bereavement'),
+        medical=_reason_count(reasons, 'Sickness', 'Medical'),
+    )
+    graded = grade_rows.groupby('student_id').agg(
+        avg_grade=('completed_grade', 'mean'),
+        min_grade=('completed_grade', 'min'),
+        max_grade=('completed_grade', 'max'),
+        num_grades=('grade_id', 'count'),
+        completed_exams=('completed', 'sum'),
+        missed_exams=('mex', 'sum'),
+        failed_exams=('fex', 'sum'),
+        failed_coursework=('fcw', 'sum'),
+        tuition_related_missed=('tuition', 'sum'),
+        family_related_missed=('family', 'sum'),
+        medical_related_missed=('medical', 'sum'),
+        avg_coursework_score=('coursework_score', 'mean'),
+        avg_exam_score=('exam_score', 'mean'),
+    )
+    # Population standard deviation, like MySQL's STDDEV
+    graded['grade_stddev'] = grade_rows.groupby('student_id')['completed_grade'].std(ddof=0)
+    graded['missed_exam_rate'] = (graded['missed_exams'] / graded['num_grades'] * 100).where(
+        graded['num_grades'] > 0, 0.0)
+
+    features = features.join(attended, on='student_id').join(paid, on='student_id')
+    features = features.join(enrolled, on='student_id').join(graded, on='student_id')
+
+    # High school metrics over each school's students' own grades and payments
+    school = students.set_index('student_id')['high_school'].dropna()
+    school_grades = grade_rows.join(school, on='student_id', how='inner').groupby('high_school')
+    school_payments = payment_rows.join(school, on='student_id', how='inner').groupby('high_school')
+    schools = pd.DataFrame({
+        'school_avg_grade': school_grades['completed_grade'].mean(),
+        'school_student_count': school.groupby(school).size(),
+        'school_avg_payment': school_payments['paid'].mean(),
+        'school_pending_rate': (school_payments['pending'].sum()
+                                / school_payments['amount'].sum().replace(0, np.nan) * 100),
+    })
+    for name, values in schools.reindex(students['high_school'].values).items():
+        features[name] = values.values
+
+    features[FEATURE_COLUMNS + [TARGET_COLUMN]] = (
+        features[FEATURE_COLUMNS + [TARGET_COLUMN]].apply(pd.to_numeric, errors='coerce').fillna(0).astype(float)
+    )
+    return features[['student_id'] + FEATURE_COLUMNS + [TARGET_COLUMN]]
+
+
+def write_snapshot(features, version, path=FEATURE_SNAPSHOT_PATH, keep=FEATURE_SNAPSHOTS_KEPT, logger=None):
+    """Write a parquet snapshot of the features, keeping the newest `keep` snapshots"""
+    logger = logger or logging.getLogger(__name__)
+    path.mkdir(parents=True, exist_ok=True)
+    snapshot = path / f"{GOLD_FEATURE_TABLE}_{version}.parquet"
+    features.to_parquet(snapshot, index=False)
+    # keep=0 keeps every snapshot
+    for old in sorted(path.glob(f"{GOLD_FEATURE_TABLE}_*.parquet"))[:-keep] if keep else []:
+        old.unlink()
+    logger.info(f"  → Wrote feature snapshot {snapshot.name}")
+    return snapshot
+
+
+def latest_snapshot(path=FEATURE_SNAPSHOT_PATH):
+    """Newest feature snapshot, or None"""
+    snapshots = sorted(path.glob(f"{GOLD_FEATURE_TABLE}_*.parquet")) if path.exists() else []
+    return pd.read_parquet(snapshots[-1]) if snapshots else None
@@ -0,0 +1,182 @@
+"""
+Pre-aggregated Gold summary tables
+The ETL rebuilds each summary from the fact tables as its last gold stage, and
+the dashboard endpoints read them instead of scanning the facts, falling back
+to the fact tables when the summaries have not been built yet
+"""
+import logging
+import time
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+# Gold tables the summaries are built from
+SOURCE_TABLES = ['fact_grade', 'fact_enrollment', 'fact_attendance',
+                 'dim_student', 'dim_course', 'dim_time', 'dim_program', 'dim_department', 'dim_faculty']
+
+# Summary table -> DDL columns, indexes and the SELECT that fills it (columns in DDL order)
+AGGREGATE_TABLES = {
+    # Per month: grades over time
+    'agg_grade_monthly': {
+        'columns': """
+            year INT NOT NULL,
+            month INT NOT NULL,
+            month_name VARCHAR(20),
+            exam_count INT,
+            completed_count INT,
+            completed_grade_sum DECIMAL(15,2),
+            mex_count INT,
+            fex_count INT,
+            PRIMARY KEY (year, month)
+        """,
+        'indexes': [],
+        'select': """
+            SELECT dt.year, dt.month, dt.month_name,
+                   COUNT(*),
+                   COUNT(CASE WHEN fg.exam_status = 'Completed' THEN 1 END),
+                   SUM(CASE WHEN fg.exam_status = 'Completed' THEN fg.grade END),
+                   COUNT(CASE WHEN fg.exam_status = 'MEX' THEN 1 END),
+                   COUNT(CASE WHEN fg.exam_status = 'FEX' THEN 1 END)
+            FROM {fact_grade} fg
+            JOIN {dim_time} dt ON fg.date_key = dt.date_key
+            GROUP BY dt.year, dt.month, dt.month_name
+        """,
+    },
+    # Per letter grade: grade distribution
+    'agg_grade_letter': {
+        'columns': """
+            letter_grade VARCHAR(5) PRIMARY KEY,
+            grade_count INT
+        """,
+        'indexes': [],
+        'select': """
+            SELECT letter_grade, COUNT(*)
+            FROM {fact_grade}
+            GROUP BY letter_grade
+        """,
+    },
+    # Per course: attendance by course
+    'agg_course_attendance': {
+        'columns': """
+            course_key INT PRIMARY KEY,
+            course_code VARCHAR(20),
+            course_name VARCHAR(100),
+            attendance_rows INT,
+            total_hours DECIMAL(15,2),
+            total_days INT
+        """,
+        'indexes': [('idx_course_name', 'course_name')],
+        'select': """
+            SELECT dc.course_key, dc.course_code, dc.course_name,
+                   COUNT(fa.total_hours), SUM(fa.total_hours), SUM(fa.days_present)
+            FROM {fact_attendance} fa
+            JOIN {dim_course} dc ON fa.course_key = dc.course_key
+            GROUP BY dc.course_key, dc.course_code, dc.course_name
+        """,
+    },
+    # Per department: distinct enrolled students (not additive, so kept at this grain)
+    'agg_department_students': {
+        'columns': """
+            department VARCHAR(50),
+            student_count INT,
+            UNIQUE KEY uq_department (department)
+        """,
+        'indexes': [],
+        'select': """
+            SELECT dc.department, COUNT(DISTINCT fe.student_key)
+            FROM {fact_enrollment} fe
+            JOIN {dim_course} dc ON fe.course_key = dc.course_key
+            GROUP BY dc.department
+        """,
+    },
+    # Per student: top students
+    'agg_student_grades': {
+        'columns': """
+            student_key INT PRIMARY KEY,
+            student_id VARCHAR(20),
+            first_name VARCHAR(50),
+            last_name VARCHAR(50),
+            grade_count INT,
+            grade_sum DECIMAL(15,2),
+            avg_grade DECIMAL(7,4)
+        """,
+        'indexes': [('idx_avg_grade', 'avg_grade')],
+        'select': """
+            SELECT ds.student_key, ds.student_id, ds.first_name, ds.last_name,
+                   COUNT(fg.grade), SUM(fg.grade), AVG(fg.grade)
+            FROM {fact_grade} fg
+            JOIN {dim_student} ds ON fg.student_key = ds.student_key
+            GROUP BY ds.student_key, ds.student_id, ds.first_name, ds.last_name
+        """,
+    },
+    # Per course, program, department, faculty and semester: exam outcomes for FEX analytics
+    'agg_exam_outcomes': {
+        'columns': """
+            course_key INT,
+            course_code VARCHAR(20),
+            course_name VARCHAR(100),
+            department VARCHAR(50),
+            program_id INT,
+            program_name VARCHAR(200),
+            faculty_id INT,
+            faculty_name VARCHAR(200),
+            semester_key INT,
+            exam_count INT,
+            completed_count INT,
+            fex_count INT,
+            mex_count INT,
+            fcw_count INT,
+            fex_grade_count INT,
+            fex_grade_sum DECIMAL(15,2)
+        """,
+        'indexes': [('idx_course', 'course_code'), ('idx_program', 'program_id'),
+                    ('idx_faculty', 'faculty_id'), ('idx_semester', 'semester_key')],
+        'select': """
+            SELECT fg.course_key, dc.course_code, dc.course_name, dc.department,
+                   dp.program_id, dp.program_name, df.faculty_id, df.faculty_name, fg.semester_key,
+                   COUNT(*),
+                   COUNT(CASE WHEN fg.exam_status = 'Completed' THEN 1 END),
+                   COUNT(CASE WHEN fg.exam_status = 'FEX' THEN 1 END),
+                   COUNT(CASE WHEN fg.exam_status = 'MEX' THEN 1 END),
+                   COUNT(CASE WHEN fg.exam_status = 'FCW' THEN 1 END),
+                   COUNT(CASE WHEN fg.exam_status = 'FEX' THEN fg.grade END),
+                   SUM(CASE WHEN fg.exam_status = 'FEX' THEN fg.grade END)
+            FROM {fact_grade} fg
+            JOIN {dim_student} ds ON fg.student_key = ds.student_key
+            JOIN {dim_course} dc ON fg.course_key = dc.course_key
+            LEFT JOIN {dim_program} dp ON ds.program_id = dp.program_id
+            LEFT JOIN {dim_department} ddept ON dp.department_id = ddept.department_id
+            LEFT JOIN {dim_faculty} df ON ddept.faculty_id = df.faculty_id
+            GROUP BY fg.course_key, dc.course_code, dc.course_name, dc.department,
+                     dp.program_id, dp.program_name, df.faculty_id, df.faculty_name, fg.semester_key
+        """,
+    },
+}
+
+
+def refresh_aggregates(engine, table_for=lambda table_name: table_name, logger=None):
+    """Rebuild every summary table from the facts in set-based SQL; returns {table: (rows, seconds)}"""
+    logger = logger or logging.getLogger(__name__)
+    sources = {name: table_for(name) for name in SOURCE_TABLES}
+    refreshed = {}
+    with engine.connect() as conn:
+        for table_name, spec in AGGREGATE_TABLES.items():
+            started = time.perf_counter()
+            conn.execute(text(f"DELETE FROM {table_for(table_name)}"))
+            rows = conn.execute(text(
+                f"INSERT INTO {table_for(table_name)} {spec['select'].format(**sources)}"
+            )).rowcount
+            conn.commit()
+            refreshed[table_name] = (rows, time.perf_counter() - started)
+            logger.info(f"  → Rebuilt {table_name} ({rows} rows)")
+    return refreshed
+
+
+def read_summary(engine, summary_query, fact_query, params=None):
+    """Run summary_query, or fact_query against the base facts if the summary tables are not there"""
+    try:
+        return pd.read_sql_query(text(summary_query), engine, params=params)
+    except (ProgrammingError, OperationalError) as e:
+        # Warehouses loaded before the summaries existed have only the fact tables
+        print(f"Summary tables unavailable, reading base facts: {e.orig}")
+        return pd.read_sql_query(text(fact_query), engine, params=params)
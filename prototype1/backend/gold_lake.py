@@ -0,0 +1,194 @@
+"""
+Columnar copy of the Gold star schema and an embedded query engine over it
+Each published generation of the warehouse is also written as parquet under
+GOLD_LAKE_PATH/<version>/<table>/ (facts partitioned by year; tables an incremental
+run did not change are hardlinked from the previous generation), and heavy analytics
+queries run on it with DuckDB instead of MySQL row storage
+"""
+import logging
+import os
+import re
+import shutil
+import threading
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as pads
+import pyarrow.parquet as pq
+from sqlalchemy import text
+from config import (
+    GOLD_LAKE_PATH, GOLD_LAKE_TABLES, GOLD_LAKE_GENERATIONS, GOLD_LAKE_CHUNK_ROWS, LAKE_COMPRESSION
+)
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# Facts are partitioned by the year of their date_key
+PARTITION_COLUMN = 'date_year'
+CURRENT_FILE = 'CURRENT'
+
+# MySQL column type -> Arrow type, so every chunk of a table is written with one schema
+_ARROW_TYPES = {
+    'tinyint': pa.int64(), 'smallint': pa.int64(), 'mediumint': pa.int64(), 'int': pa.int64(), 'bigint': pa.int64(),
+    'decimal': pa.float64(), 'float': pa.float64(), 'double': pa.float64(),
+    'date': pa.date32(), 'datetime': pa.timestamp('us'), 'timestamp': pa.timestamp('us'),
+}
+
+
+class GoldLake:
+    """Versioned parquet generations of the gold tables"""
+    def __init__(self, root=GOLD_LAKE_PATH, logger=None):
+        self.root = root
+        self.logger = logger or logging.getLogger(__name__)
+
+    def _arrow_schema(self, conn, table_name):
+        columns = conn.execute(text("""
+            SELECT COLUMN_NAME, DATA_TYPE FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table_name
+            ORDER BY ORDINAL_POSITION
+        """), {'table_name': table_name}).fetchall()
+        return pa.schema([(name, _ARROW_TYPES.get(data_type, pa.string())) for name, data_type in columns])
+
+    def _reuse(self, previous, generation, table_name):
+        """Hardlink (or copy, across devices) a table's files from the previous generation"""
+        def link(src, dst):
+            try:
+                os.link(src, dst)
+            except OSError:
+                shutil.copy2(src, dst)
+        shutil.copytree(previous / table_name, generation / table_name, copy_function=link)
+
+    def export(self, engine, version, table_for=lambda table_name: table_name, tables=GOLD_LAKE_TABLES,
+               changed=None):
+        """Write the tables as parquet into a new generation directory; returns its path.
+        With a set of changed tables, the others are reused from the live generation instead of re-read"""
+        generation = self.root / version
+        if generation.exists():
+            shutil.rmtree(generation)
+        live = self.current()
+        previous = self.root / live if live is not None and live != version else None
+        with engine.connect() as conn:
+            for table_name in tables:
+                if (changed is not None and table_name not in changed
+                        and previous is not None and (previous / table_name).is_dir()):
+                    self._reuse(previous, generation, table_name)
+                    self.logger.info(f"  → {table_name} unchanged, reused from generation {live}")
+                    continue
+                schema = self._arrow_schema(conn, table_for(table_name))
+                partitioned = table_name.startswith('fact_') and 'date_key' in schema.names
+                rows = 0
+                result = conn.execution_options(stream_results=True).execute(
+                    text(f"SELECT * FROM {table_for(table_name)}"))
+                for part, batch in enumerate(iter(lambda: result.fetchmany(GOLD_LAKE_CHUNK_ROWS), [])):
+                    chunk = pd.DataFrame(batch, columns=schema.names)
+                    for field in schema:
+                        if pa.types.is_floating(field.type):
+                            chunk[field.name] = pd.to_numeric(chunk[field.name], errors='coerce')
+                    arrow = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+                    if partitioned:
+                        years = pc.divide(arrow['date_key'], 10000)
+                        arrow = arrow.append_column(PARTITION_COLUMN, years)
+                    pads.write_dataset(
+                        arrow, generation / table_name, format='parquet',
+                        partitioning=[PARTITION_COLUMN] if partitioned else None, partitioning_flavor='hive',
+                        basename_template=f"part-{part:04d}-{{i}}.parquet",
+                        existing_data_behavior='overwrite_or_ignore',
+                        file_options=pads.ParquetFileFormat().make_write_options(compression=LAKE_COMPRESSION),
+                    )
+                    rows += len(chunk)
+                if rows == 0:
+                    # Keep empty tables queryable
+                    (generation / table_name).mkdir(parents=True, exist_ok=True)
+                    pq.write_table(schema.empty_table(), generation / table_name / "part-0000-0.parquet")
+                self.logger.info(f"  → Exported {rows} {table_name} rows to parquet")
+        return generation
+
+    def current(self):
+        """Version of the live parquet generation, or None"""
+        pointer = self.root / CURRENT_FILE
+        if not pointer.exists():
+            return None
+        version = pointer.read_text(encoding='utf-8').strip()
+        return version if (self.root / version).is_dir() else None
+
+    def _point_to(self, version):
+        tmp_path = self.root / f".{CURRENT_FILE}.tmp"
+        tmp_path.write_text(version, encoding='utf-8')
+        tmp_path.replace(self.root / CURRENT_FILE)
+
+    def _generations(self):
+        return sorted(path.name for path in self.root.iterdir() if path.is_dir()) if self.root.exists() else []
+
+    def publish(self, version):
+        """Make an exported generation live and drop all but the newest GOLD_LAKE_GENERATIONS"""
+        self._point_to(version)
+        generations = self._generations()
+        for old in generations[:-GOLD_LAKE_GENERATIONS] if GOLD_LAKE_GENERATIONS else []:
+            if old != version:
+                shutil.rmtree(self.root / old)
+        self.logger.info(f"Published gold parquet generation {version}")
+
+    def rollback(self):
+        """Point back at the generation before the live one; returns False if there is none"""
+        current = self.current()
+        older = [g for g in self._generations() if current is None or g < current]
+        if not older:
+            return False
+        self._point_to(older[-1])
+        # The rolled-back generation is dropped so the next publish cannot resurrect it
+        if current:
+            shutil.rmtree(self.root / current)
+        self.logger.info(f"Rolled back gold parquet to generation {older[-1]}")
+        return True
+
+
+class GoldQueryEngine:
+    """DuckDB views over the live parquet generation, one connection per thread"""
+    def __init__(self, lake=None):
+        self.lake = lake or GoldLake()
+        self._local = threading.local()
+
+    def available(self):
+        return duckdb is not None and self.lake.current() is not None
+
+    def _connection(self):
+        version = self.lake.current()
+        if version is None or duckdb is None:
+            raise RuntimeError("No gold parquet generation to query")
+        if getattr(self._local, 'version', None) != version:
+            # The previous generation's catalog and buffers go with its connection
+            previous = getattr(self._local, 'connection', None)
+            if previous is not None:
+                previous.close()
+                self._local.connection = self._local.version = None
+            con = duckdb.connect()
+            generation = self.lake.root / version
+            for table_dir in sorted(path for path in generation.iterdir() if path.is_dir()):
+                con.execute(f"""
+                    CREATE VIEW {table_dir.name} AS SELECT * FROM read_parquet(
+                        '{(table_dir / '**' / '*.parquet').as_posix()}', hive_partitioning = true, union_by_name = true)
+                """)
+            self._local.connection, self._local.version = con, version
+        return self._local.connection
+
+    def query(self, sql, params=None):
+        """Run a query written with :name parameters; returns a DataFrame"""
+        # SQLAlchemy-style :name placeholders become DuckDB $name ones
+        sql = re.sub(r"(?<![:\w]):([A-Za-z_]\w*)", r"$\1", sql)
+        return self._connection().execute(sql, params or {}).df()
+
+
+_engine = GoldQueryEngine()
+
+
+def query_analytics(engine, sql, params=None):
+    """Run an analytics query on the columnar engine, falling back to MySQL"""
+    if _engine.available():
+        try:
+            return _engine.query(sql, params)
+        except Exception:
+            # Usually a DuckDB/MySQL dialect difference; the query then runs on row storage
+            logging.getLogger(__name__).warning("Columnar engine failed, querying MySQL instead", exc_info=True)
+    return pd.read_sql_query(text(sql), engine, params=params)
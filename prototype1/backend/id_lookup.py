@@ -0,0 +1,87 @@
+"""
+Shared ID-resolution lookup index for the Silver layer
+Built once per run from the reference tables; resolves source IDs (StudentID,
+CourseID) to natural IDs (RegNo, CourseCode) with vectorized searchsorted/take
+and collects unresolved IDs so they can be reported in bulk
+"""
+import numpy as np
+import pandas as pd
+from transform_ops import format_ids
+
+# Unresolved IDs kept per table for the report
+UNRESOLVED_SAMPLE_SIZE = 10
+
+
+class IdLookup:
+    """Sorted-array index from source IDs to natural IDs for one entity"""
+    def __init__(self, name, source_ids=None, targets=None, fallback_prefix='', fallback_width=6):
+        self.name = name
+        # Without a mapping source IDs are formatted instead, e.g. 42 -> STU000042
+        self.fallback_prefix = fallback_prefix
+        self.fallback_width = fallback_width
+        self.keys = None
+        self.values = None
+        self.unresolved = {}
+        if source_ids is not None and targets is not None:
+            pairs = pd.DataFrame({'key': pd.to_numeric(pd.Series(source_ids), errors='coerce'),
+                                  'value': pd.Series(targets).values})
+            # Later rows win on duplicate IDs, as dict(zip(...)) did
+            pairs = pairs.dropna(subset=['key']).drop_duplicates('key', keep='last').sort_values('key')
+            self.keys = pairs['key'].to_numpy(dtype='int64')
+            self.values = pairs['value'].to_numpy(dtype=object)
+
+    def resolve(self, ids, table_name):
+        """Natural IDs for a column of source IDs; unresolved ones become ''"""
+        ids = pd.Series(ids)
+        numeric = pd.to_numeric(ids, errors='coerce')
+        valid = numeric.notna().to_numpy()
+        codes = numeric.fillna(-1).to_numpy(dtype='int64')
+        resolved = np.full(len(ids), '', dtype=object)
+
+        if self.keys is not None:
+            found = np.zeros(len(ids), dtype=bool)
+            if len(self.keys):
+                positions = np.searchsorted(self.keys, codes).clip(0, len(self.keys) - 1)
+                found = valid & (self.keys.take(positions) == codes)
+                resolved[found] = self.values.take(positions[found])
+        else:
+            found = valid
+            resolved = format_ids(numeric, self.fallback_prefix, self.fallback_width).to_numpy()
+
+        self._record_unresolved(table_name, ids[~found])
+        return pd.Series(resolved, index=ids.index)
+
+    def _record_unresolved(self, table_name, missing):
+        # Blank source IDs are plain missing data, not resolution failures
+        missing = missing[missing.notna() & (missing.astype(str) != '')]
+        if missing.empty:
+            return
+        count, sample = self.unresolved.get(table_name, (0, []))
+        if len(sample) < UNRESOLVED_SAMPLE_SIZE:
+            sample = sample + [v for v in missing.unique()[:UNRESOLVED_SAMPLE_SIZE - len(sample)].tolist()
+                               if v not in sample]
+        self.unresolved[table_name] = (count + len(missing), sample)
+
+
+def build_id_lookups(students, courses):
+    """Student and course lookups from the source reference tables"""
+    if 'StudentID' in students.columns and 'RegNo' in students.columns:
+        student_lookup = IdLookup('student', students['StudentID'], students['RegNo'])
+    else:
+        student_lookup = IdLookup('student', fallback_prefix='STU', fallback_width=6)
+    if 'CourseID' in courses.columns and 'CourseCode' in courses.columns:
+        course_lookup = IdLookup('course', courses['CourseID'], courses['CourseCode'])
+    else:
+        course_lookup = IdLookup('course', fallback_prefix='COURSE', fallback_width=3)
+    return {'student': student_lookup, 'course': course_lookup}
+
+
+def report_unresolved(lookups, logger):
+    """Log every unresolved source ID collected during the run in one summary"""
+    for lookup in lookups.values():
+        if not lookup.unresolved:
+            continue
+        total = sum(count for count, _ in lookup.unresolved.values())
+        logger.warning(f"  → {total} {lookup.name} IDs could not be resolved:")
+        for table_name, (count, sample) in sorted(lookup.unresolved.items()):
+            logger.warning(f"     {table_name}: {count} rows (e.g. {sample})")
@@ -0,0 +1,199 @@
+"""
+Fast JSON responses for the API
+jsonify() goes through an orjson-based provider that serializes NumPy, Decimal and
+pandas values natively and embeds DataFrames as pre-serialized JSON (record or
+columnar form) instead of per-row dicts; responses are then gzip/brotli compressed
+as the client accepts, with serialization time and payload sizes kept per endpoint
+"""
+import dataclasses
+import gzip
+import threading
+import time
+import uuid
+from datetime import date
+from decimal import Decimal
+import numpy as np
+import pandas as pd
+from flask import request, has_request_context
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+from config import (
+    RESPONSE_COMPRESSION, RESPONSE_COMPRESS_MIN_BYTES, RESPONSE_GZIP_LEVEL, RESPONSE_BROTLI_QUALITY
+)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/html', 'text/plain', 'text/csv'}
+# Accepted ?orient= values for DataFrame payloads
+FRAME_ORIENTS = ('records', 'columns')
+
+
+class Columns:
+    """DataFrame serialized column-wise: {"column": [values, ...], ...}"""
+    def __init__(self, df):
+        self.df = df
+
+
+def frame_json(df, orient='records'):
+    """JSON value for a DataFrame in record ([{...}, ...]) or columnar form"""
+    if orient not in FRAME_ORIENTS:
+        raise ValueError(f"orient must be one of {', '.join(FRAME_ORIENTS)}")
+    return Columns(df) if orient == 'columns' else df
+
+
+def _plain_column(values):
+    """Whether pandas' to_json writes a column exactly as the provider would (no dates, Decimals, ...)"""
+    if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+        return True
+    return values.dtype == object and pd.api.types.infer_dtype(values, skipna=True) in ('string', 'empty')
+
+
+def _records(df):
+    # pandas writes the whole frame to JSON in C instead of building one dict per row
+    if hasattr(orjson, 'Fragment') and all(_plain_column(values) for _, values in df.items()):
+        return orjson.Fragment(df.to_json(orient='records', double_precision=15))
+    return df.to_dict('records')
+
+
+def _columns(df):
+    return {str(name): (values.astype(object) if pd.api.types.is_datetime64_any_dtype(values) else values).to_numpy()
+            for name, values in df.items()}
+
+
+def _default(obj):
+    """Values orjson (or json) cannot serialize by themselves"""
+    if isinstance(obj, pd.DataFrame):
+        return _records(obj)
+    if isinstance(obj, Columns):
+        return _columns(obj.df)
+    if obj is pd.NaT or obj is pd.NA:
+        return None
+    if isinstance(obj, date):
+        return http_date(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, pd.Series):
+        return obj.to_numpy()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if dataclasses.is_dataclass(obj):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class ResponseMetrics:
+    """Per-endpoint serialization time and payload sizes before/after compression"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def _entry(self, endpoint):
+        return self._endpoints.setdefault(endpoint or 'unknown', {
+            'responses': 0, 'serialize_seconds': 0.0, 'max_serialize_seconds': 0.0,
+            'raw_bytes': 0, 'sent_bytes': 0, 'compressed': 0, 'compress_seconds': 0.0,
+        })
+
+    def record_serialize(self, endpoint, seconds):
+        with self._lock:
+            entry = self._entry(endpoint)
+            entry['serialize_seconds'] += seconds
+            entry['max_serialize_seconds'] = max(entry['max_serialize_seconds'], seconds)
+
+    def record_payload(self, endpoint, raw_bytes, sent_bytes, compress_seconds=0.0):
+        with self._lock:
+            entry = self._entry(endpoint)
+            entry['responses'] += 1
+            entry['raw_bytes'] += raw_bytes
+            entry['sent_bytes'] += sent_bytes
+            if compress_seconds:
+                entry['compressed'] += 1
+                entry['compress_seconds'] += compress_seconds
+
+    def report(self):
+        with self._lock:
+            report = {}
+            for endpoint, entry in self._endpoints.items():
+                responses = entry['responses'] or 1
+                report[endpoint] = {
+                    'responses': entry['responses'],
+                    'avg_serialize_ms': round(entry['serialize_seconds'] / responses * 1000, 3),
+                    'max_serialize_ms': round(entry['max_serialize_seconds'] * 1000, 3),
+                    'avg_raw_bytes': round(entry['raw_bytes'] / responses),
+                    'avg_sent_bytes': round(entry['sent_bytes'] / responses),
+                    'compression_ratio': round(entry['sent_bytes'] / entry['raw_bytes'], 4) if entry['raw_bytes'] else 1.0,
+                    'avg_compress_ms': round(entry['compress_seconds'] / entry['compressed'] * 1000, 3)
+                                       if entry['compressed'] else 0.0,
+                }
+            return report
+
+
+response_metrics = ResponseMetrics()
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson, falling back to the json module without it"""
+    default = staticmethod(_default)
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=_default, option=option).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        started = time.perf_counter()
+        body = self.dumps(obj)
+        if has_request_context():
+            response_metrics.record_serialize(request.endpoint, time.perf_counter() - started)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def _encoding():
+    """Best compression the client accepts: brotli, then gzip"""
+    offered = ['br', 'gzip'] if brotli is not None else ['gzip']
+    return request.accept_encodings.best_match(offered)
+
+
+def compress_response(response):
+    """after_request hook: compress large text/JSON bodies and record their sizes"""
+    if (response.status_code != 200 or response.direct_passthrough
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES or 'Content-Encoding' in response.headers):
+        return response
+    body = response.get_data()
+    response.vary.add('Accept-Encoding')
+    encoding = _encoding() if RESPONSE_COMPRESSION and len(body) >= RESPONSE_COMPRESS_MIN_BYTES else None
+    if encoding is None:
+        response_metrics.record_payload(request.endpoint, len(body), len(body))
+        return response
+    started = time.perf_counter()
+    if encoding == 'br':
+        compressed = brotli.compress(body, quality=RESPONSE_BROTLI_QUALITY)
+    else:
+        compressed = gzip.compress(body, compresslevel=RESPONSE_GZIP_LEVEL)
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    response_metrics.record_payload(request.endpoint, len(body), len(compressed), time.perf_counter() - started)
+    return response
+
+
+def init_response_layer(app):
+    """Install the fast JSON provider and response compression on a Flask app"""
+    app.json = FastJSONProvider(app)
+    app.after_request(compress_response)
@@ -0,0 +1,37 @@
+"""
+Version stamp of the published warehouse load
+The ETL writes the run ID of every load it publishes (or rolls back to) to a
+stamp file; API caches compare it against the version their entries were built from
+"""
+import os
+from datetime import datetime, timezone
+from config import LOAD_VERSION_FILE
+
+
+def bump_load_version(version, path=LOAD_VERSION_FILE):
+    """Stamp a newly published load; cached responses of older loads stop matching"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(str(version), encoding='utf-8')
+    tmp_path.replace(path)
+
+
+class LoadVersion:
+    """Current load version, re-read only when the stamp file changes"""
+    def __init__(self, path=LOAD_VERSION_FILE):
+        self.path = path
+        self._mtime = None
+        self._version = None
+        # When the current version was published (the stamp file's mtime, UTC)
+        self.modified = None
+
+    def current(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if mtime != self._mtime:
+            self._version = self.path.read_text(encoding='utf-8').strip()
+            self._mtime = mtime
+            self.modified = datetime.fromtimestamp(mtime / 1e9, tz=timezone.utc).replace(microsecond=0)
+        return self._version
@@ -2,6 +2,7 @@
 Enhanced Machine Learning Models for Student Performance Prediction
 Includes: Random Forest, Gradient Boosting, and Neural Network
 """
+import logging
 import pandas as pd
 import numpy as np
 import pickle
@@ -9,10 +10,15 @@ from pathlib import Path
 from sklearn.model_selection import train_test_split, cross_val_score, GridSearchCV
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.neural_network import MLPRegressor
-from sklearn.preprocessing import StandardScaler, LabelEncoder
+from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
-from sqlalchemy import create_engine, text
-from config import DATA_WAREHOUSE_CONN_STRING
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from config import GOLD_FEATURE_TABLE
+from db_engines import get_engine
+from feature_store import FEATURE_COLUMNS, TARGET_COLUMN, latest_snapshot
+
+logger = logging.getLogger(__name__)
 
 class MultiModelPredictor:
     """Multiple ML models for student performance prediction"""
@@ -27,162 +33,22 @@ class MultiModelPredictor:
         self.model_path = Path(__file__).parent / "models"
         self.model_path.mkdir(parents=True, exist_ok=True)
         self.feature_cols = None
+        # feature_student version the models were trained on
+        self.feature_version = None
+        # Feature versions already warned about in predict()
+        self._version_warnings = set()
     
     def prepare_features(self):
-        """Prepare features from data warehouse with enhanced features including high school"""
-        engine = create_engine(DATA_WAREHOUSE_CONN_STRING)
-        
-        # Get student demographic data with high school
-        student_query = """
-        SELECT 
-            ds.student_id,
-            ds.gender,
-            ds.nationality,
-            ds.high_school,
-            ds.high_school_district,
-            YEAR(ds.admission_date) as admission_year,
-            YEAR(CURDATE()) - YEAR(ds.admission_date) as years_at_university,
-            ds.program_id,
-            ds.year_of_study
-        FROM dim_student ds
-        """
-        student_df = pd.read_sql_query(student_query, engine)
-        
-        # Get attendance data
-        attendance_query = """
-        SELECT 
-            fa.student_id,
-            SUM(fa.total_hours) as total_attendance_hours,
-            SUM(fa.days_present) as total_days_present,
-            COUNT(DISTINCT fa.course_code) as courses_attended,
-            AVG(fa.total_hours) as avg_hours_per_course,
-            COUNT(*) as total_attendance_records,
-            CASE 
-                WHEN COUNT(*) > 0 
-                THEN (SUM(fa.days_present) / COUNT(*)) * 100
-                ELSE 0 
-            END as attendance_rate
-        FROM fact_attendance fa
-        GROUP BY fa.student_id
-        """
-        attendance_df = pd.read_sql_query(attendance_query, engine)
-        
-        # Get payment data with tuition completion metrics
-        payment_query = """
-        SELECT 
-            fp.student_id,
-            SUM(CASE WHEN fp.status = 'Completed' THEN fp.amount ELSE 0 END) as total_paid,
-            SUM(CASE WHEN fp.status = 'Pending' THEN fp.amount ELSE 0 END) as total_pending,
-            SUM(fp.amount) as total_required,
-            COUNT(CASE WHEN fp.status = 'Completed' THEN 1 END) as payment_count,
-            AVG(CASE WHEN fp.status = 'Completed' THEN fp.amount ELSE 0 END) as avg_payment,
-            MAX(CASE WHEN fp.status = 'Completed' THEN fp.date_key ELSE NULL END) as last_payment_date_key,
-            CASE 
-                WHEN SUM(fp.amount) > 0 
-                THEN SUM(CASE WHEN fp.status = 'Completed' THEN fp.amount ELSE 0 END) / SUM(fp.amount) * 100
-                ELSE 0 
-            END as payment_completion_rate,
-            CASE 
-                WHEN SUM(CASE WHEN fp.status = 'Pending' THEN fp.amount ELSE 0 END) > 500000 
-                THEN 1 ELSE 0 
-            END as has_significant_balance
-        FROM fact_payment fp
-        GROUP BY fp.student_id
-        """
-        payment_df = pd.read_sql_query(payment_query, engine)
-        
-        # Get enrollment data
-        enrollment_query = """
-        SELECT 
-            fe.student_id,
-            COUNT(DISTINCT fe.course_code) as total_enrollments,
-            COUNT(DISTINCT fe.semester_id) as semesters_enrolled
-        FROM fact_enrollment fe
-        GROUP BY fe.student_id
-        """
-        enrollment_df = pd.read_sql_query(enrollment_query, engine)
-        
-        # Get grade data (target variable) with high school performance metrics
-        grade_query = """
-        SELECT 
-            fg.student_id,
-            AVG(CASE WHEN fg.exam_status = 'Completed' THEN fg.grade ELSE NULL END) as avg_grade,
-            MIN(CASE WHEN fg.exam_status = 'Completed' THEN fg.grade ELSE NULL END) as min_grade,
-            MAX(CASE WHEN fg.exam_status = 'Completed' THEN fg.grade ELSE NULL END) as max_grade,
-            STDDEV(CASE WHEN fg.exam_status = 'Completed' THEN fg.grade ELSE NULL END) as grade_stddev,
-            COUNT(fg.grade_id) as num_grades,
-            COUNT(CASE WHEN fg.exam_status = 'Completed' THEN 1 END) as completed_exams,
-            COUNT(CASE WHEN fg.exam_status = 'MEX' THEN 1 END) as missed_exams,
-            COUNT(CASE WHEN fg.exam_status = 'FEX' THEN 1 END) as failed_exams,
-            COUNT(CASE WHEN fg.exam_status = 'FCW' THEN 1 END) as failed_coursework,
-            COUNT(CASE WHEN fg.absence_reason LIKE '%%Tuition%%' OR fg.absence_reason LIKE '%%Financial%%' THEN 1 END) as tuition_related_missed,
-            COUNT(CASE WHEN fg.absence_reason LIKE '%%Family%%' OR fg.absence_reason LIKE '%%Death%%' OR fg.absence_reason LIKE '%%Bereavement%%' THEN 1 END) as family_related_missed,
-            COUNT(CASE WHEN fg.absence_reason LIKE '%%Sickness%%' OR fg.absence_reason LIKE '%%Medical%%' THEN 1 END) as medical_related_missed,
-            CASE 
-                WHEN COUNT(fg.grade_id) > 0 
-                THEN (COUNT(CASE WHEN fg.exam_status = 'MEX' THEN 1 END) / COUNT(fg.grade_id)) * 100
-                ELSE 0 
-            END as missed_exam_rate,
-            AVG(fg.coursework_score) as avg_coursework_score,
-            AVG(fg.exam_score) as avg_exam_score
-        FROM fact_grade fg
-        GROUP BY fg.student_id
-        """
-        grade_df = pd.read_sql_query(grade_query, engine)
-        
-        # Get high school performance metrics (aggregate by high school)
-        high_school_query = """
-        SELECT 
-            ds.high_school,
-            AVG(CASE WHEN fg.exam_status = 'Completed' THEN fg.grade ELSE NULL END) as school_avg_grade,
-            COUNT(DISTINCT ds.student_id) as school_student_count,
-            AVG(CASE WHEN fp.status = 'Completed' THEN fp.amount ELSE 0 END) as school_avg_payment,
-            SUM(CASE WHEN fp.status = 'Pending' THEN fp.amount ELSE 0 END) / NULLIF(SUM(fp.amount), 0) * 100 as school_pending_rate
-        FROM dim_student ds
-        LEFT JOIN fact_grade fg ON ds.student_id = fg.student_id
-        LEFT JOIN fact_payment fp ON ds.student_id = fp.student_id
-        WHERE ds.high_school IS NOT NULL
-        GROUP BY ds.high_school
-        """
-        hs_performance_df = pd.read_sql_query(high_school_query, engine)
-        
-        # Merge all data
-        features_df = student_df.copy()
-        features_df = features_df.merge(attendance_df, on='student_id', how='left')
-        features_df = features_df.merge(payment_df, on='student_id', how='left')
-        features_df = features_df.merge(enrollment_df, on='student_id', how='left')
-        features_df = features_df.merge(grade_df, on='student_id', how='left')
-        
-        # Merge high school performance metrics
-        features_df = features_df.merge(
-            hs_performance_df[['high_school', 'school_avg_grade', 'school_student_count', 'school_avg_payment', 'school_pending_rate']],
-            on='high_school',
-            how='left'
-        )
-        
-        # Fill missing values
-        numeric_cols = features_df.select_dtypes(include=[np.number]).columns
-        features_df[numeric_cols] = features_df[numeric_cols].fillna(0)
-        
-        # Fill missing MEX/FEX features
-        mex_fex_cols = ['missed_exams', 'failed_exams', 'completed_exams', 
-                       'tuition_related_missed', 'family_related_missed', 
-                       'medical_related_missed', 'missed_exam_rate', 'failed_coursework']
-        for col in mex_fex_cols:
-            if col not in features_df.columns:
-                features_df[col] = 0
-            else:
-                features_df[col] = features_df[col].fillna(0)
-        
-        # Fill high school metrics
-        hs_cols = ['school_avg_grade', 'school_student_count', 'school_avg_payment', 'school_pending_rate']
-        for col in hs_cols:
-            if col not in features_df.columns:
-                features_df[col] = 0
-            else:
-                features_df[col] = features_df[col].fillna(0)
-        
-        engine.dispose()
+        """Read the per-student features the ETL built (one scan of feature_student)"""
+        try:
+            features_df = pd.read_sql_query(f"SELECT * FROM {GOLD_FEATURE_TABLE}", get_engine('warehouse'))
+        except (ProgrammingError, OperationalError):
+            # Warehouse not rebuilt since the feature store was added: use the last snapshot
+            features_df = latest_snapshot()
+            if features_df is None:
+                raise ValueError(f"No {GOLD_FEATURE_TABLE} table or snapshot. Run the ETL pipeline first.")
+        
+        self.feature_version = str(features_df['feature_version'].iloc[0]) if not features_df.empty else None
         return features_df
     
     def train_all_models(self, use_grid_search=False):
@@ -190,22 +56,9 @@ class MultiModelPredictor:
         print("Preparing features...")
         features_df = self.prepare_features()
         
-        # Prepare target variable
-        target = features_df['avg_grade'].fillna(0)
-        features_df = features_df.drop(['student_id', 'avg_grade'], axis=1, errors='ignore')
-        
-        # Encode categorical variables
-        categorical_cols = ['gender', 'nationality', 'high_school', 'high_school_district']
-        label_encoders = {}
-        
-        for col in categorical_cols:
-            if col in features_df.columns:
-                le = LabelEncoder()
-                features_df[col] = le.fit_transform(features_df[col].astype(str))
-                label_encoders[col] = le
-        
-        # Select numeric features
-        self.feature_cols = features_df.select_dtypes(include=[np.number]).columns.tolist()
+        # Prepare target variable; categorical features are already encoded by the ETL
+        target = features_df[TARGET_COLUMN].fillna(0)
+        self.feature_cols = list(FEATURE_COLUMNS)
         X = features_df[self.feature_cols].fillna(0)
         y = target.fillna(0)
         
@@ -282,81 +135,27 @@ class MultiModelPredictor:
     
     def predict(self, student_id, model_type='ensemble'):
         """Predict student performance using specified model or ensemble"""
-        engine = create_engine(DATA_WAREHOUSE_CONN_STRING)
-        
-        # Get student features
-        query = text("""
-        SELECT 
-            ds.student_id,
-            ds.gender,
-            ds.nationality,
-            ds.high_school,
-            ds.high_school_district,
-            YEAR(ds.admission_date) as admission_year,
-            YEAR(CURDATE()) - YEAR(ds.admission_date) as years_at_university,
-            ds.program_id,
-            ds.year_of_study,
-            COALESCE(SUM(fa.total_hours), 0) as total_attendance_hours,
-            COALESCE(SUM(fa.days_present), 0) as total_days_present,
-            COALESCE(COUNT(DISTINCT fa.course_code), 0) as courses_attended,
-            COALESCE(AVG(fa.total_hours), 0) as avg_hours_per_course,
-            COALESCE(COUNT(*), 0) as total_attendance_records,
-            CASE 
-                WHEN COUNT(*) > 0 
-                THEN (SUM(fa.days_present) / COUNT(*)) * 100
-                ELSE 0 
-            END as attendance_rate,
-            COALESCE(SUM(CASE WHEN fp.status = 'Completed' THEN fp.amount ELSE 0 END), 0) as total_paid,
-            COALESCE(SUM(CASE WHEN fp.status = 'Pending' THEN fp.amount ELSE 0 END), 0) as total_pending,
-            COALESCE(SUM(fp.amount), 0) as total_required,
-            COALESCE(COUNT(CASE WHEN fp.status = 'Completed' THEN 1 END), 0) as payment_count,
-            COALESCE(AVG(CASE WHEN fp.status = 'Completed' THEN fp.amount ELSE 0 END), 0) as avg_payment,
-            CASE 
-                WHEN SUM(fp.amount) > 0 
-                THEN SUM(CASE WHEN fp.status = 'Completed' THEN fp.amount ELSE 0 END) / SUM(fp.amount) * 100
-                ELSE 0 
-            END as payment_completion_rate,
-            CASE 
-                WHEN SUM(CASE WHEN fp.status = 'Pending' THEN fp.amount ELSE 0 END) > 500000 
-                THEN 1 ELSE 0 
-            END as has_significant_balance,
-            COALESCE(COUNT(DISTINCT fe.course_code), 0) as total_enrollments,
-            COALESCE(COUNT(DISTINCT fe.semester_id), 0) as semesters_enrolled,
-            COALESCE(AVG(dc.credits), 0) as avg_course_credits,
-            COALESCE(SUM(dc.credits), 0) as total_credits,
-            COALESCE(COUNT(CASE WHEN fg.exam_status = 'MEX' THEN 1 END), 0) as missed_exams,
-            COALESCE(COUNT(CASE WHEN fg.exam_status = 'FEX' THEN 1 END), 0) as failed_exams,
-            COALESCE(COUNT(CASE WHEN fg.exam_status = 'FCW' THEN 1 END), 0) as failed_coursework,
-            COALESCE(AVG(fg.coursework_score), 0) as avg_coursework_score,
-            COALESCE(AVG(fg.exam_score), 0) as avg_exam_score
-        FROM dim_student ds
-        LEFT JOIN fact_attendance fa ON ds.student_id = fa.student_id
-        LEFT JOIN fact_payment fp ON ds.student_id = fp.student_id
-        LEFT JOIN fact_enrollment fe ON ds.student_id = fe.student_id
-        LEFT JOIN dim_course dc ON fe.course_code = dc.course_code
-        LEFT JOIN fact_grade fg ON ds.student_id = fg.student_id
-        WHERE ds.student_id = :student_id
-        GROUP BY ds.student_id, ds.gender, ds.nationality, ds.high_school, ds.high_school_district, ds.admission_date, ds.program_id, ds.year_of_study
-        """)
+        engine = get_engine('warehouse')
         
+        # Get student features: a primary-key lookup in the feature store
+        query = text(f"SELECT * FROM {GOLD_FEATURE_TABLE} WHERE student_id = :student_id")
         student_data = pd.read_sql_query(query, engine, params={'student_id': student_id})
-        engine.dispose()
         
         if student_data.empty:
             raise ValueError(f"Student {student_id} not found")
         
-        # Encode categorical variables
-        student_data['gender_encoded'] = student_data['gender'].map({'M': 1, 'F': 0}).fillna(0)
-        student_data['nationality_encoded'] = pd.Categorical(student_data['nationality']).codes
-        student_data['high_school_encoded'] = pd.Categorical(student_data['high_school']).codes
-        student_data['high_school_district_encoded'] = pd.Categorical(student_data['high_school_district']).codes
-        
         # Prepare feature vector
         if not self.feature_cols:
             raise ValueError("Model not trained. Please train models first.")
         
-        available_cols = [col for col in self.feature_cols if col in student_data.columns]
-        X = student_data[available_cols].fillna(0).values
+        row_version = str(student_data['feature_version'].iloc[0]) if 'feature_version' in student_data else None
+        if self.feature_version and row_version != self.feature_version and row_version not in self._version_warnings:
+            # Category codes are stable across builds, but the feature distributions may have drifted
+            self._version_warnings.add(row_version)
+            logger.warning(f"Scoring {GOLD_FEATURE_TABLE} version {row_version} with models trained on version "
+                           f"{self.feature_version}; retrain the models to pick up the new features")
+        
+        X = student_data.reindex(columns=self.feature_cols, fill_value=0).fillna(0).values
         
         if not hasattr(self.scaler, 'mean_'):
             raise ValueError("Model scaler not fitted. Please train models first.")
@@ -390,7 +189,8 @@ class MultiModelPredictor:
         model_data = {
             'models': self.models,
             'scaler': self.scaler,
-            'feature_cols': self.feature_cols
+            'feature_cols': self.feature_cols,
+            'feature_version': self.feature_version
         }
         with open(self.model_path / 'multi_model_predictor.pkl', 'wb') as f:
             pickle.dump(model_data, f)
@@ -404,6 +204,8 @@ class MultiModelPredictor:
                 self.models = model_data['models']
                 self.scaler = model_data['scaler']
                 self.feature_cols = model_data['feature_cols']
+                self.feature_version = model_data.get('feature_version')
+                self._version_warnings = set()
         else:
             print("Models not found. Training new models...")
             self.train_all_models()
@@ -0,0 +1,207 @@
+"""
+Response cache for the dashboard and analytics endpoints
+The warehouse only changes when the ETL publishes a load, so responses are cached
+by endpoint, normalized filters and RBAC scope, and stamped with the load version
+the ETL writes at publish time: a new version invalidates every entry. Lookups go
+to an in-process LRU first, then to an optional shared tier (Redis, or a local
+stand-in), and only then to MySQL. The same key and version give each response an
+ETag and Last-Modified, so clients revalidating an unchanged load get a 304
+"""
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from flask import request, make_response, Response
+from flask_jwt_extended import get_jwt
+from config import (
+    RESPONSE_CACHE_ENABLED, RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_SHARED_URL, RESPONSE_CACHE_SHARED_TTL
+)
+from load_version import LoadVersion
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# JWT claims that decide what data a user may see
+SCOPE_CLAIMS = ['role', 'student_id', 'staff_id', 'department_id', 'faculty_id', 'access_number']
+
+
+class LocalSharedCache:
+    """In-memory stand-in for the shared tier (same interface as RedisSharedCache)"""
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                self._entries.pop(key, None)
+                return None
+            return entry[0]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+
+
+class RedisSharedCache:
+    """Shared tier in Redis; a failing Redis only costs cache hits"""
+    def __init__(self, url):
+        self.client = redis.Redis.from_url(url, socket_timeout=0.2)
+
+    def get(self, key):
+        try:
+            return self.client.get(key)
+        except redis.RedisError as e:
+            print(f"Shared response cache unavailable: {e}")
+            return None
+
+    def set(self, key, value, ttl):
+        try:
+            self.client.set(key, value, ex=ttl)
+        except redis.RedisError as e:
+            print(f"Shared response cache unavailable: {e}")
+
+
+def shared_cache_from_url(url):
+    """Shared tier for RESPONSE_CACHE_SHARED_URL: '' for none, 'local' or a redis:// URL"""
+    if not url:
+        return None
+    if url == 'local':
+        return LocalSharedCache()
+    if redis is None:
+        print("redis is not installed; response cache runs without a shared tier")
+        return None
+    return RedisSharedCache(url)
+
+
+class ResponseCache:
+    """LRU of (status, mimetype, body) per request key, invalidated by the load version"""
+    def __init__(self, max_entries=RESPONSE_CACHE_MAX_ENTRIES, shared=None, version=None,
+                 shared_ttl=RESPONSE_CACHE_SHARED_TTL):
+        self.max_entries = max_entries
+        self.shared = shared
+        self.version = version or LoadVersion()
+        self.shared_ttl = shared_ttl
+        self._entries = OrderedDict()
+        self._entries_version = None
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'shared_hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def _local(self, version):
+        """The LRU, emptied first if a new load was published"""
+        if self._entries_version != version:
+            self.counters['invalidations'] += len(self._entries)
+            self._entries.clear()
+            self._entries_version = version
+        return self._entries
+
+    def get(self, key, version):
+        """Cached (status, mimetype, body) for a key in a load version, or None"""
+        with self._lock:
+            entries = self._local(version)
+            entry = entries.get(key)
+            if entry is not None:
+                entries.move_to_end(key)
+                self.counters['hits'] += 1
+                return entry
+        if self.shared is not None:
+            value = self.shared.get(f"resp:{version}:{key}")
+            if value is not None:
+                header, body = value.split(b'\n', 1)
+                status, mimetype = header.decode('utf-8').split(' ', 1)
+                entry = (int(status), mimetype, body)
+                self._store(version, key, entry)
+                self._count('shared_hits')
+                return entry
+        self._count('misses')
+        return None
+
+    def put(self, key, version, status, mimetype, body):
+        """Cache a response computed from a load version in both tiers"""
+        self._store(version, key, (status, mimetype, body))
+        if self.shared is not None:
+            self.shared.set(f"resp:{version}:{key}", f"{status} {mimetype}\n".encode('utf-8') + body,
+                            self.shared_ttl)
+
+    def _store(self, version, key, entry):
+        with self._lock:
+            entries = self._local(version)
+            entries[key] = entry
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+                self.counters['evictions'] += 1
+
+    def metrics(self):
+        with self._lock:
+            lookups = self.counters['hits'] + self.counters['shared_hits'] + self.counters['misses']
+            hit_rate = (self.counters['hits'] + self.counters['shared_hits']) / lookups if lookups else 0.0
+            return {**self.counters, 'entries': len(self._entries), 'max_entries': self.max_entries,
+                    'hit_rate': round(hit_rate, 4), 'load_version': self._entries_version,
+                    'shared_tier': type(self.shared).__name__ if self.shared is not None else None}
+
+
+response_cache = ResponseCache(shared=shared_cache_from_url(RESPONSE_CACHE_SHARED_URL))
+
+
+def request_cache_key():
+    """Endpoint, normalized query filters and the caller's RBAC scope, hashed"""
+    claims = get_jwt()
+    filters = sorted((name, value.strip()) for name, value in request.args.items(multi=True) if value.strip())
+    scope = [(name, claims.get(name)) for name in SCOPE_CLAIMS]
+    return hashlib.sha256(repr((request.path, filters, scope)).encode('utf-8')).hexdigest()
+
+
+def _set_validators(response, etag, modified):
+    """ETag/Last-Modified of a load version; clients must revalidate, and only per user"""
+    response.set_etag(etag, weak=True)
+    response.last_modified = modified
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.vary.add('Authorization')
+    return response
+
+
+def _not_modified(etag, modified):
+    """Whether the client already holds the response for this key and load version"""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    return request.if_modified_since is not None and request.if_modified_since >= modified
+
+
+def cached_response(view):
+    """Serve a GET view from the response cache and answer revalidations with 304; goes under @jwt_required()"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request_cache_key()
+        # Read once: a load published while the view runs must not be stamped on its result
+        version = response_cache.version.current()
+        etag = None
+        if version is not None:
+            etag = hashlib.sha256(f"{version}:{key}".encode('utf-8')).hexdigest()[:32]
+            modified = response_cache.version.modified
+            if _not_modified(etag, modified):
+                return _set_validators(Response(status=304), etag, modified)
+        entry = response_cache.get(key, version) if RESPONSE_CACHE_ENABLED else None
+        if entry is not None:
+            status, mimetype, body = entry
+            response = Response(body, status=status, mimetype=mimetype)
+        else:
+            response = make_response(view(*args, **kwargs))
+            # Errors and permission denials are never cached
+            if response.status_code != 200:
+                return response
+            if RESPONSE_CACHE_ENABLED:
+                response_cache.put(key, version, response.status_code, response.mimetype, response.get_data())
+        if etag is not None:
+            _set_validators(response, etag, modified)
+        return response
+    return wrapper
@@ -0,0 +1,114 @@
+"""
+Run manifests for checkpointed, resumable ETL runs
+Each run records the bronze/silver files it wrote and every stage or load step
+it finished in data/runs/<run_id>.json, so a failed run can be resumed
+"""
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+from config import ETL_RUNS_PATH
+
+
+def _json_default(value):
+    # numpy scalars and timestamps from watermarks
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+class RunManifest:
+    """Checkpoint record of one ETL run"""
+    def __init__(self, run_id, options=None, root=ETL_RUNS_PATH, data=None):
+        self.run_id = run_id
+        self.path = Path(root) / f"{run_id}.json"
+        self._lock = threading.Lock()
+        self.data = data or {
+            'run_id': run_id,
+            'status': 'running',
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'options': dict(options or {}),
+            'files': {},
+            'steps': {},
+        }
+
+    @classmethod
+    def load(cls, run_id, root=ETL_RUNS_PATH):
+        """Manifest of an earlier run; raises FileNotFoundError if there is none"""
+        path = Path(root) / f"{run_id}.json"
+        if not path.exists():
+            raise FileNotFoundError(f"No manifest for run {run_id} in {root}")
+        return cls(run_id, root=root, data=json.loads(path.read_text(encoding='utf-8')))
+
+    @classmethod
+    def unfinished_files(cls, root=ETL_RUNS_PATH):
+        """Files written by runs that have not completed and may still be resumed"""
+        files = set()
+        for path in Path(root).glob('*.json'):
+            data = json.loads(path.read_text(encoding='utf-8'))
+            if data.get('status') != 'completed':
+                for tables in data.get('files', {}).values():
+                    files.update(p for paths in tables.values() for p in paths)
+        return files
+
+    @property
+    def options(self):
+        return self.data['options']
+
+    @property
+    def status(self):
+        return self.data['status']
+
+    def save(self):
+        """Write the manifest atomically"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.data['updated_at'] = datetime.now().isoformat(timespec='seconds')
+        tmp_path = self.path.with_suffix('.json.tmp')
+        tmp_path.write_text(json.dumps(self.data, indent=2, default=_json_default), encoding='utf-8')
+        tmp_path.replace(self.path)
+
+    def add_file(self, layer, table_name, path):
+        with self._lock:
+            self.data['files'].setdefault(layer, {}).setdefault(table_name, []).append(str(path))
+            self.save()
+
+    def reset_files(self, layer):
+        """Forget files from an unfinished attempt at writing a layer"""
+        with self._lock:
+            self.data['files'].pop(layer, None)
+            self.save()
+
+    def files(self, layer):
+        """{table_name: [paths]} written to a layer by this run"""
+        return self.data['files'].get(layer, {})
+
+    def start(self, step):
+        with self._lock:
+            self.data['steps'].setdefault(step, {})['status'] = 'started'
+            self.save()
+
+    def complete(self, step, **info):
+        with self._lock:
+            self.data['steps'][step] = dict(info, status='completed')
+            self.save()
+
+    def step(self, step):
+        return self.data['steps'].get(step, {})
+
+    def is_started(self, step):
+        return self.step(step).get('status') == 'started'
+
+    def is_complete(self, step):
+        return self.step(step).get('status') == 'completed'
+
+    def reset_steps(self, prefix):
+        """Forget every step whose name starts with prefix"""
+        with self._lock:
+            self.data['steps'] = {s: v for s, v in self.data['steps'].items() if not s.startswith(prefix)}
+            self.save()
+
+    def finish(self, status, error=None):
+        with self._lock:
+            self.data['status'] = status
+            self.data['error'] = error
+            self.save()
@@ -0,0 +1,76 @@
+"""
+Typed schema for the Silver layer
+Restores real dtypes on cleaned frames before they are written to parquet:
+nullable Int64/Float64/boolean for numbers and flags, datetimes for dates,
+category for low-cardinality labels and Arrow-backed strings for free text
+"""
+import pandas as pd
+
+STRING_DTYPE = 'string[pyarrow]'
+
+# Column name -> dtype; source (DB1) and silver column names are both covered
+SILVER_DTYPES = {
+    # Natural IDs stay text even when they look numeric
+    'RegNo': STRING_DTYPE, 'reg_no': STRING_DTYPE, 'student_id': STRING_DTYPE,
+    'AccessNumber': STRING_DTYPE, 'access_number': STRING_DTYPE,
+    'CourseCode': STRING_DTYPE, 'course_code': STRING_DTYPE,
+    # Identifiers and counts
+    'StudentID': 'Int64', 'CourseID': 'Int64', 'ProgramID': 'Int64', 'program_id': 'Int64',
+    'EnrollmentID': 'Int64', 'enrollment_id': 'Int64', 'AttendanceID': 'Int64',
+    'PaymentID': 'Int64', 'payment_id': 'Int64', 'GradeID': 'Int64', 'grade_id': 'Int64',
+    'YearOfStudy': 'Int64', 'year_of_study': 'Int64', 'CreditUnits': 'Int64', 'credits': 'Int64',
+    # Scores and amounts
+    'CourseworkScore': 'Float64', 'coursework_score': 'Float64', 'exam_score': 'Float64',
+    'TotalScore': 'Float64', 'grade': 'Float64', 'hours_attended': 'Float64',
+    'AmountPaid': 'Float64', 'Balance': 'Float64', 'amount': 'Float64',
+    # Flags
+    'FCW': 'boolean', 'fcw': 'boolean',
+    # Dates
+    'Date': 'datetime64[ns]', 'attendance_date': 'datetime64[ns]', 'enrollment_date': 'datetime64[ns]',
+    'payment_date': 'datetime64[ns]', 'exam_date': 'datetime64[ns]', 'admission_date': 'datetime64[ns]',
+    # Low-cardinality labels
+    'Status': 'category', 'status': 'category', 'gender': 'category', 'nationality': 'category',
+    'HighSchoolDistrict': 'category', 'high_school_district': 'category',
+    'ExamStatus': 'category', 'exam_status': 'category', 'GradeLetter': 'category',
+    'letter_grade': 'category', 'department': 'category', 'payment_method': 'category',
+    'AcademicYear': 'category',
+}
+
+
+def _to_dtype(column, dtype):
+    if dtype in ('Int64', 'Float64', 'boolean'):
+        numeric = pd.to_numeric(column, errors='coerce')
+        if dtype == 'Int64':
+            numeric = numeric.round()
+        return numeric.astype(dtype)
+    if dtype == 'datetime64[ns]':
+        return pd.to_datetime(column, errors='coerce')
+    return column.astype(dtype)
+
+
+def _infer_dtype(column):
+    """Numeric dtype for object columns that only hold numbers (or blanks), else Arrow strings"""
+    present = column[column.notna() & (column.astype(str) != '')]
+    numeric = pd.to_numeric(present, errors='coerce')
+    if len(present) and numeric.notna().all():
+        return 'Int64' if (numeric % 1 == 0).all() else 'Float64'
+    return STRING_DTYPE
+
+
+def enforce_silver_schema(df):
+    """Copy of df with the silver dtypes applied"""
+    typed = {}
+    for name, column in df.items():
+        dtype = SILVER_DTYPES.get(name)
+        if dtype is None:
+            if column.dtype != object:
+                typed[name] = column
+                continue
+            dtype = _infer_dtype(column)
+        typed[name] = _to_dtype(column, dtype)
+    return pd.DataFrame(typed, index=df.index)
+
+
+def memory_mb(df):
+    """Deep in-memory size of a frame in MB"""
+    return df.memory_usage(deep=True, index=False).sum() / (1024 * 1024)
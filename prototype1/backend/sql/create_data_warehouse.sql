@@ -1,12 +1,15 @@
 -- Data Warehouse: UCU_DataWarehouse
 -- Star Schema with Dimension and Fact Tables
+-- Facts join dimensions on INT surrogate keys (student_key, course_key, date_key
+-- as YYYYMMDD, semester_key); the ETL keeps them stable in etl_key_map
 
 CREATE DATABASE IF NOT EXISTS UCU_DataWarehouse;
 USE UCU_DataWarehouse;
 
 -- Dimension: Student
 CREATE TABLE IF NOT EXISTS dim_student (
-    student_id VARCHAR(20) PRIMARY KEY,
+    student_key INT PRIMARY KEY,
+    student_id VARCHAR(20) NOT NULL UNIQUE,
     reg_no VARCHAR(50),
     access_number VARCHAR(10) UNIQUE,
     first_name VARCHAR(50),
@@ -31,7 +34,8 @@ CREATE TABLE IF NOT EXISTS dim_student (
 
 -- Dimension: Course
 CREATE TABLE IF NOT EXISTS dim_course (
-    course_code VARCHAR(20) PRIMARY KEY,
+    course_key INT PRIMARY KEY,
+    course_code VARCHAR(20) NOT NULL UNIQUE,
     course_name VARCHAR(100),
     credits INT,
     department VARCHAR(50),
@@ -40,7 +44,7 @@ CREATE TABLE IF NOT EXISTS dim_course (
 
 -- Dimension: Time
 CREATE TABLE IF NOT EXISTS dim_time (
-    date_key VARCHAR(8) PRIMARY KEY,
+    date_key INT PRIMARY KEY,
     date DATE,
     year INT,
     quarter INT,
@@ -56,7 +60,8 @@ CREATE TABLE IF NOT EXISTS dim_time (
 
 -- Dimension: Semester
 CREATE TABLE IF NOT EXISTS dim_semester (
-    semester_id INT PRIMARY KEY,
+    semester_key INT PRIMARY KEY,
+    semester_id INT NOT NULL UNIQUE,
     semester_name VARCHAR(50),
     academic_year VARCHAR(20),
     INDEX idx_academic_year (academic_year)
@@ -96,52 +101,59 @@ CREATE TABLE IF NOT EXISTS dim_program (
 -- Fact: Enrollment
 CREATE TABLE IF NOT EXISTS fact_enrollment (
     enrollment_id VARCHAR(20) PRIMARY KEY,
+    student_key INT,
+    course_key INT,
+    date_key INT,
+    semester_key INT,
     student_id VARCHAR(20),
     course_code VARCHAR(20),
-    date_key VARCHAR(8),
     semester_id INT,
     status VARCHAR(20),
-    FOREIGN KEY (student_id) REFERENCES dim_student(student_id) ON DELETE CASCADE,
-    FOREIGN KEY (course_code) REFERENCES dim_course(course_code) ON DELETE CASCADE,
+    FOREIGN KEY (student_key) REFERENCES dim_student(student_key) ON DELETE CASCADE,
+    FOREIGN KEY (course_key) REFERENCES dim_course(course_key) ON DELETE CASCADE,
     FOREIGN KEY (date_key) REFERENCES dim_time(date_key) ON DELETE CASCADE,
-    FOREIGN KEY (semester_id) REFERENCES dim_semester(semester_id) ON DELETE CASCADE,
-    INDEX idx_student (student_id),
-    INDEX idx_course (course_code),
+    FOREIGN KEY (semester_key) REFERENCES dim_semester(semester_key) ON DELETE CASCADE,
+    INDEX idx_student (student_key),
+    INDEX idx_course (course_key),
     INDEX idx_date (date_key),
-    INDEX idx_semester (semester_id)
+    INDEX idx_semester (semester_key)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- Fact: Attendance
 CREATE TABLE IF NOT EXISTS fact_attendance (
     attendance_id INT AUTO_INCREMENT PRIMARY KEY,
+    student_key INT,
+    course_key INT,
+    date_key INT,
     student_id VARCHAR(20),
     course_code VARCHAR(20),
-    date_key VARCHAR(8),
     total_hours DECIMAL(10,2),
     days_present INT,
-    FOREIGN KEY (student_id) REFERENCES dim_student(student_id) ON DELETE CASCADE,
-    FOREIGN KEY (course_code) REFERENCES dim_course(course_code) ON DELETE CASCADE,
+    UNIQUE KEY uq_attendance_grain (student_key, course_key, date_key),
+    FOREIGN KEY (student_key) REFERENCES dim_student(student_key) ON DELETE CASCADE,
+    FOREIGN KEY (course_key) REFERENCES dim_course(course_key) ON DELETE CASCADE,
     FOREIGN KEY (date_key) REFERENCES dim_time(date_key) ON DELETE CASCADE,
-    INDEX idx_student (student_id),
-    INDEX idx_course (course_code),
+    INDEX idx_course (course_key),
     INDEX idx_date (date_key)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- Fact: Payment
 CREATE TABLE IF NOT EXISTS fact_payment (
     payment_id VARCHAR(20) PRIMARY KEY,
+    student_key INT,
+    date_key INT,
+    semester_key INT,
     student_id VARCHAR(20),
-    date_key VARCHAR(8),
     semester_id INT,
     amount DECIMAL(15,2),
     payment_method VARCHAR(50),
     status VARCHAR(20),
-    FOREIGN KEY (student_id) REFERENCES dim_student(student_id) ON DELETE CASCADE,
+    FOREIGN KEY (student_key) REFERENCES dim_student(student_key) ON DELETE CASCADE,
     FOREIGN KEY (date_key) REFERENCES dim_time(date_key) ON DELETE CASCADE,
-    FOREIGN KEY (semester_id) REFERENCES dim_semester(semester_id) ON DELETE CASCADE,
-    INDEX idx_student (student_id),
+    FOREIGN KEY (semester_key) REFERENCES dim_semester(semester_key) ON DELETE CASCADE,
+    INDEX idx_student (student_key),
     INDEX idx_date (date_key),
-    INDEX idx_semester (semester_id),
+    INDEX idx_semester (semester_key),
     INDEX idx_status (status)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
@@ -151,9 +163,12 @@ CREATE TABLE IF NOT EXISTS fact_payment (
 -- letter_grade: Letter grade (A, B+, B, C, D, F, MEX, FEX, FCW), calculated from grade and exam_status
 CREATE TABLE IF NOT EXISTS fact_grade (
     grade_id VARCHAR(20) PRIMARY KEY,
+    student_key INT,
+    course_key INT,
+    date_key INT,
+    semester_key INT,
     student_id VARCHAR(20),
     course_code VARCHAR(20),
-    date_key VARCHAR(8),
     semester_id INT,
     coursework_score DECIMAL(5,2) NOT NULL,  -- Coursework score (0-100)
     exam_score DECIMAL(5,2),                  -- Exam score (0-100), NULL if MEX
@@ -162,23 +177,23 @@ CREATE TABLE IF NOT EXISTS fact_grade (
     fcw BOOLEAN DEFAULT FALSE,                -- Failed Coursework flag
     exam_status VARCHAR(10),                  -- Completed, MEX, FEX, FCW
     absence_reason VARCHAR(200),
-    FOREIGN KEY (student_id) REFERENCES dim_student(student_id) ON DELETE CASCADE,
-    FOREIGN KEY (course_code) REFERENCES dim_course(course_code) ON DELETE CASCADE,
+    FOREIGN KEY (student_key) REFERENCES dim_student(student_key) ON DELETE CASCADE,
+    FOREIGN KEY (course_key) REFERENCES dim_course(course_key) ON DELETE CASCADE,
     FOREIGN KEY (date_key) REFERENCES dim_time(date_key) ON DELETE CASCADE,
-    FOREIGN KEY (semester_id) REFERENCES dim_semester(semester_id) ON DELETE CASCADE,
-    INDEX idx_student (student_id),
-    INDEX idx_course (course_code),
+    FOREIGN KEY (semester_key) REFERENCES dim_semester(semester_key) ON DELETE CASCADE,
+    INDEX idx_student (student_key),
+    INDEX idx_course (course_key),
     INDEX idx_date (date_key),
-    INDEX idx_semester (semester_id),
+    INDEX idx_semester (semester_key),
     INDEX idx_grade (grade)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- Insert default semester data
-INSERT INTO dim_semester (semester_id, semester_name, academic_year) VALUES
-(1, 'Fall 2023', '2023-2024'),
-(2, 'Spring 2024', '2023-2024'),
-(3, 'Fall 2024', '2024-2025'),
-(4, 'Spring 2025', '2024-2025')
+INSERT INTO dim_semester (semester_key, semester_id, semester_name, academic_year) VALUES
+(1, 1, 'Fall 2023', '2023-2024'),
+(2, 2, 'Spring 2024', '2023-2024'),
+(3, 3, 'Fall 2024', '2024-2025'),
+(4, 4, 'Spring 2025', '2024-2025')
 ON DUPLICATE KEY UPDATE 
     semester_name = VALUES(semester_name),
     academic_year = VALUES(academic_year);
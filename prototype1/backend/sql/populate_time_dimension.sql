@@ -31,7 +31,7 @@ INSERT INTO dim_time (
     is_weekend
 )
 SELECT 
-    DATE_FORMAT(date_value, '%Y%m%d') as date_key,
+    CAST(DATE_FORMAT(date_value, '%Y%m%d') AS UNSIGNED) as date_key,
     date_value as date,
     YEAR(date_value) as year,
     QUARTER(date_value) as quarter,
@@ -0,0 +1,86 @@
+"""
+Persistent surrogate key map for the Gold layer (Data Warehouse)
+Assigns compact INT keys to natural IDs (student IDs, course codes, semesters)
+and keeps them stable across runs in a key map table
+"""
+import logging
+from datetime import datetime
+import pandas as pd
+from sqlalchemy import text
+from config import ETL_KEY_MAP_TABLE
+
+
+def date_key(values):
+    """Integer YYYYMMDD date keys (e.g. 20240131); unparseable dates become <NA>"""
+    dates = pd.to_datetime(values, errors='coerce')
+    if not isinstance(dates, pd.Series):
+        dates = pd.Series(dates)
+    keys = dates.dt.year * 10000 + dates.dt.month * 100 + dates.dt.day
+    return keys.astype('Int64')
+
+
+class SurrogateKeyMap:
+    """Natural ID -> surrogate key lookups, backed by the persistent key map table"""
+    def __init__(self, engine, table_name=ETL_KEY_MAP_TABLE, logger=None):
+        self.engine = engine
+        self.table_name = table_name
+        self.logger = logger or logging.getLogger(__name__)
+        # key_type -> Series of surrogate keys indexed by natural key
+        self.maps = {}
+        self.load()
+
+    def _ensure_table(self, conn):
+        conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {self.table_name} (
+                key_type VARCHAR(20) NOT NULL,
+                natural_key VARCHAR(50) NOT NULL,
+                surrogate_key INT NOT NULL,
+                created_at DATETIME,
+                PRIMARY KEY (key_type, natural_key),
+                UNIQUE KEY uq_surrogate (key_type, surrogate_key)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """))
+
+    def load(self):
+        """Read every assigned key from the key map table"""
+        with self.engine.connect() as conn:
+            self._ensure_table(conn)
+            conn.commit()
+            rows = pd.read_sql_query(
+                text(f"SELECT key_type, natural_key, surrogate_key FROM {self.table_name}"), conn
+            )
+        self.maps = {
+            key_type: pd.Series(group['surrogate_key'].values, index=pd.Index(group['natural_key']))
+            for key_type, group in rows.groupby('key_type')
+        }
+
+    def assign(self, key_type, natural_keys):
+        """Surrogate keys for natural_keys, allocating and persisting keys for new IDs"""
+        natural_keys = pd.Series(natural_keys).astype(str)
+        current = self.maps.get(key_type, pd.Series(dtype='int64'))
+        new_ids = pd.Index(natural_keys.unique()).difference(current.index)
+        if len(new_ids):
+            start = int(current.max()) + 1 if len(current) else 1
+            new_keys = pd.Series(range(start, start + len(new_ids)), index=new_ids)
+            now = datetime.now()
+            with self.engine.connect() as conn:
+                conn.execute(text(f"""
+                    INSERT INTO {self.table_name} (key_type, natural_key, surrogate_key, created_at)
+                    VALUES (:key_type, :natural_key, :surrogate_key, :now)
+                """), [{'key_type': key_type, 'natural_key': natural_key, 'surrogate_key': int(key),
+                        'now': now} for natural_key, key in new_keys.items()])
+                conn.commit()
+            current = pd.concat([current, new_keys])
+            self.maps[key_type] = current
+            self.logger.info(f"  → Assigned {len(new_ids)} new {key_type} keys")
+        return self.lookup(key_type, natural_keys)
+
+    def lookup(self, key_type, natural_keys):
+        """Vectorized surrogate key lookup; unknown natural IDs become <NA>"""
+        natural_keys = pd.Series(natural_keys)
+        current = self.maps.get(key_type, pd.Series(dtype='int64'))
+        positions = current.index.get_indexer(natural_keys.astype(str))
+        keys = pd.Series(current.values.take(positions, mode='clip') if len(current) else 0,
+                         index=natural_keys.index, dtype='Int64')
+        keys[positions < 0] = pd.NA
+        return keys
@@ -0,0 +1,118 @@
+"""
+Dependency-aware task scheduler for ETL stages
+Runs every task whose dependencies have finished on a bounded thread pool,
+retries failed tasks, and reports per-task timings and the critical path
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class TaskFailedError(Exception):
+    """Raised when a task still fails after its retries"""
+
+
+class TaskDAG:
+    """A DAG of named tasks run concurrently under a worker (connection) budget"""
+    def __init__(self, workers, retries=0, retry_delay=0.0, logger=None):
+        self.workers = workers
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.logger = logger or logging.getLogger(__name__)
+        # name -> (callable, dependency names)
+        self.tasks = {}
+        # name -> {'start', 'end', 'attempts'}, seconds relative to the DAG start
+        self.timings = {}
+        self.wall_seconds = 0.0
+
+    def add(self, name, run, deps=()):
+        self.tasks[name] = (run, [d for d in deps if d != name])
+
+    def _check(self):
+        """Fail early on unknown dependencies and cycles"""
+        for name, (_, deps) in self.tasks.items():
+            missing = [d for d in deps if d not in self.tasks]
+            if missing:
+                raise ValueError(f"Task {name} depends on unknown tasks {missing}")
+        done, remaining = set(), dict(self.tasks)
+        while remaining:
+            ready = [n for n, (_, deps) in remaining.items() if set(deps) <= done]
+            if not ready:
+                raise ValueError(f"Dependency cycle between tasks {sorted(remaining)}")
+            for name in ready:
+                done.add(name)
+                del remaining[name]
+
+    def _attempt(self, name, started_at):
+        run, _ = self.tasks[name]
+        timing = self.timings.setdefault(name, {'start': time.perf_counter() - started_at, 'attempts': 0})
+        for attempt in range(self.retries + 1):
+            timing['attempts'] = attempt + 1
+            try:
+                run()
+                break
+            except Exception as e:
+                if attempt == self.retries:
+                    timing['end'] = time.perf_counter() - started_at
+                    raise TaskFailedError(f"Task {name} failed after {attempt + 1} attempts: {e}") from e
+                self.logger.warning(f"  → Task {name} failed ({e}); retrying in {self.retry_delay:.0f}s")
+                time.sleep(self.retry_delay)
+        timing['end'] = time.perf_counter() - started_at
+
+    def run(self):
+        """Run every task; raises TaskFailedError once running tasks have drained after a failure"""
+        self._check()
+        started_at = time.perf_counter()
+        done, failure = set(), None
+        pending = dict(self.tasks)
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='task') as pool:
+            running = {}
+            while pending or running:
+                if failure is None:
+                    for name in [n for n, (_, deps) in pending.items() if set(deps) <= done]:
+                        running[pool.submit(self._attempt, name, started_at)] = name
+                        del pending[name]
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        future.result()
+                        done.add(name)
+                    except TaskFailedError as e:
+                        # Stop scheduling; tasks already running are allowed to finish
+                        failure = failure or e
+        self.wall_seconds = time.perf_counter() - started_at
+        if failure is not None:
+            raise failure
+
+    def duration(self, name):
+        timing = self.timings.get(name, {})
+        return timing.get('end', 0.0) - timing.get('start', 0.0)
+
+    def critical_path(self):
+        """Longest chain of dependent tasks by run time: (task names, seconds)"""
+        longest = {}
+
+        def chain(name):
+            if name not in longest:
+                deps = self.tasks[name][1]
+                before = max((chain(d) for d in deps), key=lambda c: c[1], default=([], 0.0))
+                longest[name] = (before[0] + [name], before[1] + self.duration(name))
+            return longest[name]
+
+        return max((chain(name) for name in self.tasks), key=lambda c: c[1], default=([], 0.0))
+
+    def report(self):
+        """Log per-task timings and the critical path"""
+        serial = sum(self.duration(name) for name in self.timings)
+        self.logger.info(f"Task timings ({self.workers} workers):")
+        for name, timing in sorted(self.timings.items(), key=lambda item: item[1]['start']):
+            retried = f", {timing['attempts']} attempts" if timing['attempts'] > 1 else ""
+            self.logger.info(f"  → {name:<18} start {timing['start']:7.2f}s  "
+                             f"took {self.duration(name):7.2f}s{retried}")
+        path, seconds = self.critical_path()
+        self.logger.info(f"Critical path ({seconds:.2f}s): {' -> '.join(path)}")
+        self.logger.info(f"Wall time {self.wall_seconds:.2f}s vs {serial:.2f}s if run serially")
+        print(f"Critical path ({seconds:.2f}s of {self.wall_seconds:.2f}s wall): {' -> '.join(path)}")
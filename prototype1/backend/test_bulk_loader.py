@@ -0,0 +1,38 @@
+"""
+Test the CSV written for LOAD DATA LOCAL INFILE from typed (silver) columns
+"""
+import os
+import tempfile
+import pandas as pd
+from bulk_loader import write_load_data_csv
+
+
+def _csv_lines(df):
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    os.close(fd)
+    try:
+        write_load_data_csv(df, path)
+        with open(path, encoding='utf-8') as f:
+            return f.read().splitlines()
+    finally:
+        os.remove(path)
+
+
+def test_boolean_and_arrow_string_columns():
+    """Nullable flags load as 0/1/NULL and Arrow/category text has backslashes escaped"""
+    df = pd.DataFrame({
+        'fcw': pd.array([True, False, None], dtype='boolean'),
+        'reg_no': pd.array(['A\\1', 'B2', None], dtype='string[pyarrow]'),
+        'exam_status': pd.Series(['FEX\\x', 'Completed', 'MEX'], dtype='category'),
+        'passed': [True, False, True],
+    })
+    assert _csv_lines(df) == [
+        '1,A\\\\1,FEX\\\\x,1',
+        '0,B2,Completed,0',
+        '\\N,\\N,MEX,1',
+    ]
+
+
+if __name__ == "__main__":
+    test_boolean_and_arrow_string_columns()
+    print("OK")
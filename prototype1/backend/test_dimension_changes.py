@@ -0,0 +1,47 @@
+"""
+Test that dimension row hashes depend on the values, not on the silver dtypes
+"""
+import datetime
+import numpy as np
+import pandas as pd
+from dimension_changes import ROW_HASH_COLUMN, with_row_hash
+from silver_schema import enforce_silver_schema
+
+
+def test_typed_and_untyped_rows_hash_alike():
+    """Rows typed by enforce_silver_schema hash like the untyped streaming rows they came from"""
+    untyped = pd.DataFrame({
+        'student_id': ['1001', '1002', '1003'],
+        'program_id': [3, 4, np.nan],
+        'year_of_study': [1.0, 2.0, 3.0],
+        'gender': ['F', 'M', None],
+        'admission_date': [datetime.date(2021, 8, 1), datetime.date(2022, 1, 15), None],
+        'high_school': ['St. Mary\'s', '', 'Kings College'],
+    })
+    typed = enforce_silver_schema(untyped.copy())
+    assert not typed.dtypes.equals(untyped.dtypes)
+    assert (with_row_hash(typed)[ROW_HASH_COLUMN].tolist()
+            == with_row_hash(untyped)[ROW_HASH_COLUMN].tolist())
+
+
+def test_numeric_dtypes_hash_alike():
+    """int64, nullable Int64, float and numeric text of the same numbers give the same hashes"""
+    hashes = [
+        with_row_hash(pd.DataFrame({'credits': values}))[ROW_HASH_COLUMN].tolist()
+        for values in ([3, 4], pd.array([3, 4], dtype='Int64'), [3.0, 4.0], ['3', '4'])
+    ]
+    assert all(h == hashes[0] for h in hashes)
+
+
+def test_changed_value_changes_hash():
+    """A changed value still changes the row hash"""
+    before = with_row_hash(pd.DataFrame({'student_id': ['1001'], 'status': ['Active']}))
+    after = with_row_hash(pd.DataFrame({'student_id': ['1001'], 'status': ['Graduated']}))
+    assert before[ROW_HASH_COLUMN].iloc[0] != after[ROW_HASH_COLUMN].iloc[0]
+
+
+if __name__ == "__main__":
+    test_typed_and_untyped_rows_hash_alike()
+    test_numeric_dtypes_hash_alike()
+    test_changed_value_changes_hash()
+    print("OK")
@@ -0,0 +1,125 @@
+"""
+Blue/green publishing for the Gold layer (Data Warehouse)
+Loads go into shadow copies of the gold tables; a validated generation is published
+with one atomic RENAME TABLE and the replaced generation is kept for rollback
+"""
+import logging
+from sqlalchemy import text
+from config import (
+    GOLD_TABLES, GOLD_REQUIRED_TABLES, GOLD_SWAP_MIN_ROW_RATIO,
+    GOLD_SHADOW_SUFFIX, GOLD_PREVIOUS_SUFFIX
+)
+
+
+class SwapValidationError(Exception):
+    """Raised when a shadow generation is not fit to be published"""
+
+
+class WarehouseSwap:
+    """Manages the shadow, live and previous generations of the gold tables"""
+    def __init__(self, engine, tables=GOLD_TABLES, logger=None):
+        self.engine = engine
+        self.tables = list(tables)
+        self.logger = logger or logging.getLogger(__name__)
+
+    def shadow(self, table_name):
+        return f"{table_name}{GOLD_SHADOW_SUFFIX}"
+
+    def previous(self, table_name):
+        return f"{table_name}{GOLD_PREVIOUS_SUFFIX}"
+
+    def _existing_tables(self, conn):
+        return {row[0] for row in conn.execute(text("SHOW TABLES")).fetchall()}
+
+    def _row_count(self, conn, table_name):
+        return conn.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar()
+
+    def _drop_tables(self, conn, table_names):
+        conn.execute(text("SET FOREIGN_KEY_CHECKS=0"))
+        for table_name in table_names:
+            conn.execute(text(f"DROP TABLE IF EXISTS {table_name}"))
+        conn.execute(text("SET FOREIGN_KEY_CHECKS=1"))
+
+    def shadows_exist(self):
+        """Whether every shadow table of the generation being built is still in place"""
+        with self.engine.connect() as conn:
+            existing = self._existing_tables(conn)
+        return all(self.shadow(t) in existing for t in self.tables)
+
+    def drop_shadows(self):
+        """Discard shadow tables left behind by a failed or unpublished run"""
+        with self.engine.connect() as conn:
+            self._drop_tables(conn, [self.shadow(t) for t in reversed(self.tables)])
+            conn.commit()
+
+    def seed(self, table_name):
+        """Copy the live rows of a table into its (empty) shadow"""
+        shadow = self.shadow(table_name)
+        with self.engine.connect() as conn:
+            existing = self._existing_tables(conn)
+            if table_name not in existing:
+                return 0
+            live_cols = [row[0] for row in conn.execute(text(f"SHOW COLUMNS FROM {table_name}")).fetchall()]
+            shadow_cols = {row[0] for row in conn.execute(text(f"SHOW COLUMNS FROM {shadow}")).fetchall()}
+            # Tables created by older DDL may lack newer columns; those keep their defaults
+            col_list = ', '.join(f"`{c}`" for c in live_cols if c in shadow_cols)
+            conn.execute(text("SET FOREIGN_KEY_CHECKS=0"))
+            copied = conn.execute(text(
+                f"INSERT INTO {shadow} ({col_list}) SELECT {col_list} FROM {table_name}"
+            )).rowcount
+            conn.execute(text("SET FOREIGN_KEY_CHECKS=1"))
+            conn.commit()
+        self.logger.info(f"  → Seeded {shadow} with {copied} live rows")
+        return copied
+
+    def validate(self, required_tables=GOLD_REQUIRED_TABLES, min_row_ratio=GOLD_SWAP_MIN_ROW_RATIO):
+        """Check every shadow table before publishing; returns {table: (live_rows, shadow_rows)}"""
+        problems = []
+        report = {}
+        with self.engine.connect() as conn:
+            existing = self._existing_tables(conn)
+            for table_name in self.tables:
+                shadow = self.shadow(table_name)
+                if shadow not in existing:
+                    problems.append(f"{shadow} was not built")
+                    continue
+                new_rows = self._row_count(conn, shadow)
+                old_rows = self._row_count(conn, table_name) if table_name in existing else 0
+                report[table_name] = (old_rows, new_rows)
+                self.logger.info(f"  → {table_name}: {old_rows} live rows, {new_rows} in new generation")
+                if table_name in required_tables and new_rows == 0:
+                    problems.append(f"{shadow} is empty")
+                elif old_rows and new_rows < old_rows * min_row_ratio:
+                    problems.append(f"{shadow} shrank from {old_rows} to {new_rows} rows")
+        if problems:
+            raise SwapValidationError("; ".join(problems))
+        return report
+
+    def publish(self):
+        """Atomically swap the shadow tables live, keeping the old ones as the previous generation"""
+        with self.engine.connect() as conn:
+            existing = self._existing_tables(conn)
+            self._drop_tables(conn, [self.previous(t) for t in reversed(self.tables)])
+            # One RENAME TABLE statement is atomic: readers see the old or the new generation, never a mix
+            renames = [f"{t} TO {self.previous(t)}" for t in self.tables if t in existing]
+            renames += [f"{self.shadow(t)} TO {t}" for t in self.tables]
+            conn.execute(text("RENAME TABLE " + ", ".join(renames)))
+            conn.commit()
+        self.logger.info(f"Published new gold generation ({len(self.tables)} tables)")
+
+    def rollback(self):
+        """Swap the previous generation back live; returns False if there is none"""
+        with self.engine.connect() as conn:
+            existing = self._existing_tables(conn)
+            restorable = [t for t in self.tables if self.previous(t) in existing]
+            if not restorable:
+                self.logger.warning("No previous gold generation to roll back to")
+                return False
+            self._drop_tables(conn, [self.shadow(t) for t in reversed(self.tables)])
+            # The rolled-back generation is parked as the shadow and dropped by the next run
+            renames = [f"{t} TO {self.shadow(t)}" for t in restorable if t in existing]
+            renames += [f"{self.previous(t)} TO {t}" for t in restorable]
+            conn.execute(text("RENAME TABLE " + ", ".join(renames)))
+            conn.commit()
+        self.logger.info(f"Rolled back {len(restorable)} gold tables to the previous generation")
+        return True